@@ -0,0 +1,79 @@
+#! /usr/bin/env python3
+
+"""
+Approximate nearest-neighbour benchmark.
+
+For the real catalog and synthetic TF-IDF catalogs (see bench_similarity.py),
+builds each neighbour backend over a grid of its recall/latency knobs and
+reports build time, index size, recall@10 against the exact engine, mean
+candidates scored per query and queries per second. ANN fallbacks to exact
+scoring (too few candidates) are counted in the QPS, as in serving.
+
+Usage: python bench_ann.py [--sizes 100000] [--queries 200]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'webapp'))
+from ann import build_ann_index  # noqa: E402
+from bench_similarity import synthetic_tfidf  # noqa: E402
+from config import DATA_PATH, MAX_FEATURES  # noqa: E402
+from pipeline import build_engine, read_catalog  # noqa: E402
+from similarity import SimilarityEngine  # noqa: E402
+
+TOP_N = 10
+GRID = [
+    ('lsh', {'tables': 8, 'bits': 12, 'probes': 2}),
+    ('lsh', {'tables': 16, 'bits': 12, 'probes': 4}),
+    ('lsh', {'tables': 32, 'bits': 10, 'probes': 4}),
+    ('ivf', {'probes': 4}),
+    ('ivf', {'probes': 16}),
+    ('ivf', {'probes': 32}),
+    ('ivf', {'probes': 16, 'dims': 128}),
+]
+
+
+def run_queries(engine, queries):
+    start = time.perf_counter()
+    results = [engine.recommend(q, TOP_N)[0] for q in queries]
+    return results, len(queries) / (time.perf_counter() - start)
+
+
+def bench(name, engine, n_queries):
+    queries = np.random.default_rng(1).integers(0, engine.n_items, size=n_queries)
+    exact, exact_qps = run_queries(engine, queries)
+    print(f"{name:>10} {engine.n_items:>9} {'exact':>30} {'-':>8} {'-':>9} {1.0:>10.3f} {engine.n_items:>11} {exact_qps:>9.1f}")
+
+    for backend, knobs in GRID:
+        start = time.perf_counter()
+        ann = build_ann_index(engine.matrix, backend, **knobs)
+        build_s = time.perf_counter() - start
+        engine.attach_ann(ann)
+        approx, qps = run_queries(engine, queries)
+        engine.attach_ann(None)
+
+        recall = np.mean([np.isin(a, e).sum() / max(len(e), 1) for a, e in zip(approx, exact)])
+        candidates = np.mean([len(ann.candidates(engine.matrix[q])) for q in queries])
+        label = backend + ' ' + ','.join(f"{k}={v}" for k, v in knobs.items())
+        print(f"{name:>10} {engine.n_items:>9} {label:>30} {build_s:>8.2f} {ann.nbytes / 1e6:>9.1f} "
+              f"{recall:>10.3f} {candidates:>11.0f} {qps:>9.1f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[100000])
+    parser.add_argument('--queries', type=int, default=200)
+    args = parser.parse_args()
+
+    _, real_engine = build_engine(read_catalog(DATA_PATH), MAX_FEATURES)
+    engines = [('real', real_engine)] + [('synthetic', SimilarityEngine(synthetic_tfidf(n))) for n in args.sizes]
+
+    print(f"{'catalog':>10} {'items':>9} {'backend':>30} {'build s':>8} {'index MB':>9} "
+          f"{'recall@10':>10} {'candidates':>11} {'QPS':>9}")
+    for name, engine in engines:
+        bench(name, engine, args.queries)
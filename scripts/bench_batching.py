@@ -0,0 +1,76 @@
+#! /usr/bin/env python3
+
+"""
+Throughput / latency benchmark for micro-batched recommendations.
+
+Runs `--concurrency` simulated clients, each issuing recommend queries back to
+back, through the same MicroBatcher + ScoringExecutor path the app uses for
+/recommend/{title}, on a synthetic catalog with no precomputed neighbours (so
+every query needs a full scoring pass). For each batching window it reports
+queries per second, per-query latency percentiles and the mean batch size;
+window 0 scores every query on its own.
+
+Usage: python bench_batching.py [--items 20000] [--engine sparse|embedding] [--windows 0 1 2 5]
+                                [--concurrency 1 8 32] [--max-batch 32] [--queries 2000] [--top-n 10]
+                                [--workers 0]
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'webapp'))
+from batching import MicroBatcher  # noqa: E402
+from bench_similarity import synthetic_tfidf  # noqa: E402
+from embedding import EmbeddingEngine  # noqa: E402
+from execution import ScoringExecutor  # noqa: E402
+from similarity import SimilarityEngine  # noqa: E402
+
+
+async def run_clients(engine, executor, window, max_batch, concurrency, queries, top_n):
+    batcher = MicroBatcher(engine.recommend_many, executor.run, window / 1000, max_batch, executor.workers)
+    per_client = np.array_split(queries, concurrency)
+    latencies = []
+
+    async def client(rows):
+        for row in rows:
+            start = time.perf_counter()
+            await batcher.submit((int(row), top_n, None))
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*[client(rows) for rows in per_client])
+    elapsed = time.perf_counter() - start
+    return len(queries) / elapsed, np.percentile(latencies, [50, 99]) * 1000, batcher.stats()['mean_batch_size']
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--items', type=int, default=20000)
+    parser.add_argument('--engine', choices=['sparse', 'embedding'], default='sparse')
+    parser.add_argument('--dims', type=int, default=128, help="Embedding dimensions (--engine embedding)")
+    parser.add_argument('--windows', type=float, nargs='+', default=[0, 1, 2, 5], help="Batching windows in ms")
+    parser.add_argument('--concurrency', type=int, nargs='+', default=[1, 8, 32])
+    parser.add_argument('--max-batch', type=int, default=32)
+    parser.add_argument('--queries', type=int, default=2000)
+    parser.add_argument('--top-n', type=int, default=10)
+    parser.add_argument('--workers', type=int, default=0, help="Scoring threads (0: one per CPU)")
+    args = parser.parse_args()
+
+    matrix = synthetic_tfidf(args.items)
+    engine = SimilarityEngine(matrix) if args.engine == 'sparse' else EmbeddingEngine(matrix, args.dims)
+    executor = ScoringExecutor(args.workers)
+    queries = np.random.default_rng(1).integers(0, args.items, size=args.queries)
+    print(f"{args.items} items, {args.engine} engine, {executor.workers} scoring worker(s), max batch {args.max_batch}")
+
+    print(f"{'clients':>7} {'window ms':>9} {'queries/s':>10} {'p50 ms':>8} {'p99 ms':>8} {'batch':>6}")
+    for concurrency in args.concurrency:
+        for window in args.windows:
+            qps, (p50, p99), batch = asyncio.run(
+                run_clients(engine, executor, window, args.max_batch, concurrency, queries, args.top_n)
+            )
+            print(f"{concurrency:>7} {window:>9g} {qps:>10.0f} {p50:>8.2f} {p99:>8.2f} {batch:>6.1f}")
@@ -0,0 +1,74 @@
+#! /usr/bin/env python3
+
+"""
+Index build scaling benchmark.
+
+Generates a synthetic corpus (documents of words drawn Zipf-style from the
+real catalog's tags) and times the chunked build across worker counts:
+TF-IDF vectorising over the whole corpus, and top-k neighbour precomputation
+over its first --neighbour-items rows (exact neighbours are quadratic in the
+item count). Speedup is relative to the single-worker run of the same
+chunked pipeline.
+
+Usage: python bench_build.py [--docs 200000] [--neighbour-items 20000] [--workers 1 2 4 8]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'webapp'))
+from config import DATA_PATH, MAX_FEATURES, NEIGHBOURS_K  # noqa: E402
+from parallel_build import compute_neighbours_parallel, fit_tfidf_parallel  # noqa: E402
+from pipeline import TFIDF_PARAMS, read_catalog  # noqa: E402
+from similarity import SimilarityEngine  # noqa: E402
+
+WORDS_PER_DOC = 40
+
+
+def synthetic_corpus(real_tags, n_docs, seed=0):
+    """Documents of WORDS_PER_DOC words sampled with Zipf-like weights from the real tag vocabulary."""
+    rng = np.random.default_rng(seed)
+    words = np.array(sorted({w for t in real_tags for w in t.split()}), dtype=object)
+    rng.shuffle(words)
+    weights = 1.0 / np.arange(1, len(words) + 1)
+    picks = rng.choice(len(words), size=(n_docs, WORDS_PER_DOC), p=weights / weights.sum())
+    return [' '.join(row) for row in words[picks]]
+
+
+def default_workers():
+    counts, n = [], 1
+    while n < (os.cpu_count() or 1):
+        counts.append(n)
+        n *= 2
+    return counts + [os.cpu_count() or 1]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--docs', type=int, default=200000)
+    parser.add_argument('--neighbour-items', type=int, default=20000)
+    parser.add_argument('--workers', type=int, nargs='+', default=default_workers())
+    args = parser.parse_args()
+
+    corpus = synthetic_corpus(read_catalog(DATA_PATH)['tags'], args.docs)
+    print(f"\n{args.docs} documents, neighbours for {args.neighbour_items} items, {os.cpu_count()} CPUs\n")
+    print(f"{'workers':>8} {'vectorise s':>12} {'neighbours s':>13} {'total s':>8} {'speedup':>8}")
+
+    baseline = None
+    for workers in args.workers:
+        start = time.perf_counter()
+        _, matrix = fit_tfidf_parallel(corpus, MAX_FEATURES, TFIDF_PARAMS, workers)
+        vectorise_s = time.perf_counter() - start
+
+        engine = SimilarityEngine(matrix[:args.neighbour_items])
+        start = time.perf_counter()
+        compute_neighbours_parallel(engine, NEIGHBOURS_K, workers)
+        neighbours_s = time.perf_counter() - start
+
+        total = vectorise_s + neighbours_s
+        baseline = baseline or total
+        print(f"{workers:>8} {vectorise_s:>12.2f} {neighbours_s:>13.2f} {total:>8.2f} {baseline / total:>7.2f}x")
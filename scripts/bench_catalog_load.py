@@ -0,0 +1,116 @@
+#! /usr/bin/env python3
+
+"""
+Catalog load benchmark: CSV vs the columnar Parquet catalog.
+
+Tiles the real catalog --scales times over (with fresh ids), writes it as
+CSV and as Parquet, and loads each in a fresh process so resident memory
+is measured cleanly. For each file it reports:
+
+- read: the raw load (`pd.read_csv` vs `read_catalog_table`);
+- catalog: the server's full `read_catalog` (cleaning plus the `tags` text);
+
+plus `parquet-list`, a raw read projected to the list-view columns only.
+Memory is the resident (RSS) growth left by the step, its peak RSS growth
+while running, and the resulting DataFrame's deep memory usage. Linux only
+(reads /proc/self/status).
+
+Usage: python bench_catalog_load.py [--scales 10 100]
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'webapp'))
+from catalog_store import read_catalog_table, write_catalog  # noqa: E402
+from config import CSV_PATH  # noqa: E402
+from pipeline import read_catalog  # noqa: E402
+
+LIST_COLUMNS = ['id', 'title', 'type', 'poster_path', 'popularity']
+ID_STRIDE = 10_000_000 # Added to ids per tile so (id, type) stays unique
+
+
+def tiled_catalog(scale):
+    raw = pd.read_csv(CSV_PATH)
+    tiles = [raw.assign(id=raw['id'] + i * ID_STRIDE) for i in range(scale)]
+    return pd.concat(tiles, ignore_index=True)
+
+
+def memory_mb():
+    """(resident, peak resident) MB of this process from /proc (Linux)."""
+    fields = {}
+    with open('/proc/self/status') as f:
+        for line in f:
+            name, _, value = line.partition(':')
+            fields[name] = value
+    return int(fields['VmRSS'].split()[0]) / 1024, int(fields['VmHWM'].split()[0]) / 1024
+
+
+def reset_peak():
+    """Resets VmHWM to the current RSS, so the peak covers only what follows."""
+    with open('/proc/self/clear_refs', 'w') as f:
+        f.write('5')
+
+
+def measure(mode, path):
+    """Loads `path` in this process and returns the measurements (run via --child)."""
+    reset_peak()
+    baseline, _ = memory_mb()
+    start = time.perf_counter()
+    if mode == 'catalog':
+        sys.stdout = open(os.devnull, 'w') # read_catalog's progress line
+        df = read_catalog(path)
+        sys.stdout = sys.__stdout__
+    elif path.endswith('.parquet'):
+        df = read_catalog_table(path, LIST_COLUMNS if mode == 'list' else None)
+    else:
+        df = pd.read_csv(path)
+    seconds = time.perf_counter() - start
+    resident, peak = memory_mb()
+    return {'seconds': seconds, 'rss_mb': resident - baseline, 'peak_mb': peak - baseline,
+            'df_mb': df.memory_usage(deep=True).sum() / 1e6}
+
+
+def run_child(mode, path):
+    out = subprocess.run([sys.executable, os.path.abspath(__file__), '--child', mode, path],
+                         capture_output=True, text=True, check=True).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--scales', type=int, nargs='+', default=[10, 100])
+    parser.add_argument('--child', nargs=2, metavar=('MODE', 'PATH'), help=argparse.SUPPRESS) # Internal: one measurement
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(measure(*args.child)))
+        sys.exit(0)
+
+    print(f"{'':>30} {'------------ read ------------':>30} {'----------- catalog ------------':>32}")
+    print(f"{'scale':>6} {'format':>13} {'file MB':>8} {'s':>6} {'RSS MB':>7} {'peak MB':>8} {'df MB':>7} "
+          f"{'s':>6} {'RSS MB':>7} {'peak MB':>8} {'df MB':>7}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for scale in args.scales:
+            df = tiled_catalog(scale)
+            print(f"{scale}x the catalog: {len(df)} rows")
+            csv_path, parquet_path = os.path.join(tmp, 'content.csv'), os.path.join(tmp, 'content.parquet')
+            df.to_csv(csv_path, index=False)
+            write_catalog(df, parquet_path)
+            del df
+
+            for name, path, modes in [('csv', csv_path, ['read', 'catalog']),
+                                      ('parquet', parquet_path, ['read', 'catalog']),
+                                      ('parquet-list', parquet_path, ['list'])]:
+                cells = []
+                for mode in modes:
+                    r = run_child(mode, path)
+                    cells.append(f"{r['seconds']:>6.2f} {r['rss_mb']:>7.1f} {r['peak_mb']:>8.1f} {r['df_mb']:>7.1f}")
+                print(f"{scale:>5}x {name:>13} {os.path.getsize(path) / 1e6:>8.1f} {' '.join(cells)}")
@@ -0,0 +1,75 @@
+#! /usr/bin/env python3
+
+"""
+Dense SVD embedding report.
+
+Fits TF-IDF on the real catalog, then reduces it to dense embeddings of
+several sizes and compares each EmbeddingEngine with the sparse TF-IDF
+engine: build time, memory, per-query scoring latency and how many of the
+sparse engine's top-10 recommendations the embedding engine also returns
+(overlap@10). Synthetic catalogs (see bench_similarity.py) add latency and
+memory at larger sizes; their random terms have no shared topics, so their
+overlap only shows how much of raw TF-IDF the reduction keeps.
+
+Usage: python bench_embedding.py [--dims 64 128 256] [--sizes 100000] [--queries 200]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+from sklearn.feature_extraction.text import TfidfVectorizer
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'webapp'))
+from bench_similarity import synthetic_tfidf  # noqa: E402
+from config import DATA_PATH, MAX_FEATURES  # noqa: E402
+from embedding import EmbeddingEngine  # noqa: E402
+from pipeline import TFIDF_PARAMS, read_catalog  # noqa: E402
+from similarity import SimilarityEngine  # noqa: E402
+
+TOP_N = 10
+
+
+def time_recommend(engine, queries):
+    start = time.perf_counter()
+    results = [engine.recommend(q, TOP_N)[0] for q in queries]
+    return results, (time.perf_counter() - start) / len(queries) * 1000
+
+
+def bench(name, tfidf_matrix, dims_list, n_queries):
+    queries = np.random.default_rng(1).integers(0, tfidf_matrix.shape[0], size=n_queries)
+
+    start = time.perf_counter()
+    sparse = SimilarityEngine(tfidf_matrix)
+    build_s = time.perf_counter() - start
+    reference, sparse_ms = time_recommend(sparse, queries)
+    print(f"{name:>10} {sparse.n_items:>9} {'tf-idf':>8} {build_s:>8.2f} {sparse.nbytes / 1e6:>9.1f} "
+          f"{sparse_ms:>8.3f} {1.0:>11.3f}")
+
+    for dims in dims_list:
+        start = time.perf_counter()
+        engine = EmbeddingEngine(tfidf_matrix, dims)
+        build_s = time.perf_counter() - start
+        results, ms = time_recommend(engine, queries)
+        overlap = np.mean([len(np.intersect1d(a, b)) / max(len(b), 1) for a, b in zip(results, reference)])
+        print(f"{name:>10} {engine.n_items:>9} {f'svd-{engine.dims}':>8} {build_s:>8.2f} {engine.nbytes / 1e6:>9.1f} "
+              f"{ms:>8.3f} {overlap:>11.3f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--dims', type=int, nargs='+', default=[64, 128, 256])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[100000])
+    parser.add_argument('--queries', type=int, default=200)
+    args = parser.parse_args()
+
+    df = read_catalog(DATA_PATH)
+    real = TfidfVectorizer(max_features=MAX_FEATURES, **TFIDF_PARAMS).fit_transform(df['tags'])
+    catalogs = [('real', real)] + [('synthetic', synthetic_tfidf(n)) for n in args.sizes]
+
+    print(f"\n{'catalog':>10} {'items':>9} {'engine':>8} {'build s':>8} {'memory MB':>9} "
+          f"{'ms/query':>8} {'overlap@10':>11}")
+    for name, matrix in catalogs:
+        bench(name, matrix, args.dims, args.queries)
@@ -0,0 +1,95 @@
+#! /usr/bin/env python3
+
+"""
+Offline ingestion benchmark against the mock TMDB server (mock_tmdb.py).
+
+Runs three scenarios and reports pages, requests, retries, 429s and
+throughput:
+
+- serial: the original page-by-page fetcher (fixed delay, one 429 retry),
+  over a few pages so it finishes quickly;
+- async: the concurrent fetcher on a server with latency, random 5xx
+  errors and a request rate limit answered with Retry-After;
+- resume: an async run where some pages always fail, followed by a rerun
+  against a healthy server, which should only request the missing pages.
+
+Usage: python bench_fetch.py [--pages 100] [--serial-pages 10] [--concurrency 8] [--rate 40]
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import fetch_data  # noqa: E402
+from mock_tmdb import MockTMDB  # noqa: E402
+from tmdb_async import PageCheckpoint, TMDBClient, fetch_popular_pages_async  # noqa: E402
+
+
+def report(name, pages, seconds, server_stats, client_stats=None):
+    retries = '-' if client_stats is None else client_stats['retries']
+    print(f"{name:>8} {pages:>6} {server_stats['requests']:>9} {retries:>8} "
+          f"{server_stats['429']:>5} {server_stats['5xx']:>5} {seconds:>8.2f} {pages / seconds:>8.1f}")
+
+
+async def fetch_pages(base_url, pages, args, checkpoint_path):
+    async with TMDBClient(base_url, 'mock', args.concurrency, args.rate, args.retries, backoff=0.05) as client:
+        done, failed = await fetch_popular_pages_async(client, 'movie', pages, PageCheckpoint(checkpoint_path))
+    return done, failed, client.stats
+
+
+def run_quietly(fn, *fn_args):
+    """Runs `fn` with its per-page progress output suppressed."""
+    stdout = sys.stdout
+    sys.stdout = open(os.devnull, 'w')
+    try:
+        return fn(*fn_args)
+    finally:
+        sys.stdout.close()
+        sys.stdout = stdout
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--pages', type=int, default=100)
+    parser.add_argument('--serial-pages', type=int, default=10)
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--rate', type=float, default=40.0)
+    parser.add_argument('--retries', type=int, default=5)
+    parser.add_argument('--latency', type=float, default=0.05, help="Mock server seconds per response")
+    parser.add_argument('--error-rate', type=float, default=0.05, help="Mock server random 5xx probability")
+    parser.add_argument('--server-rate-limit', type=int, default=30, help="Mock server requests per second")
+    args = parser.parse_args()
+
+    print(f"{'run':>8} {'pages':>6} {'requests':>9} {'retries':>8} {'429':>5} {'5xx':>5} {'seconds':>8} {'pages/s':>8}")
+    with tempfile.TemporaryDirectory() as tmp:
+        with MockTMDB(pages=args.pages, latency=args.latency) as server:
+            start = time.perf_counter()
+            df = run_quietly(fetch_data.fetch_popular_content, 'movie', args.serial_pages, {28: 'Action'}, server.base_url)
+            report('serial', len(df) // 20, time.perf_counter() - start, server.stats)
+
+        with MockTMDB(pages=args.pages, latency=args.latency, error_rate=args.error_rate,
+                      rate_limit=args.server_rate_limit) as server:
+            start = time.perf_counter()
+            done, failed, stats = run_quietly(asyncio.run, fetch_pages(server.base_url, args.pages, args,
+                                                                       os.path.join(tmp, 'async.jsonl')))
+            report('async', len(done), time.perf_counter() - start, server.stats, stats)
+            if failed:
+                print(f"{'':>8} failed pages: {failed}")
+
+        checkpoint = os.path.join(tmp, 'resume.jsonl')
+        broken = set(range(5, args.pages + 1, 10))
+        with MockTMDB(pages=args.pages, latency=args.latency, fail_pages=broken) as server:
+            args.retries = 1
+            start = time.perf_counter()
+            done, failed, stats = run_quietly(asyncio.run, fetch_pages(server.base_url, args.pages, args, checkpoint))
+            report('partial', len(done), time.perf_counter() - start, server.stats, stats)
+        with MockTMDB(pages=args.pages, latency=args.latency) as server:
+            start = time.perf_counter()
+            done, failed, stats = run_quietly(asyncio.run, fetch_pages(server.base_url, args.pages, args, checkpoint))
+            report('resume', len(done), time.perf_counter() - start, server.stats, stats)
+            print(f"\nResume requested {server.stats['requests']} page(s) for the {len(broken)} that failed; "
+                  f"{len(done)}/{args.pages} pages complete, {len(failed)} failed.")
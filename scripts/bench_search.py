@@ -0,0 +1,94 @@
+#! /usr/bin/env python3
+
+"""
+Title search benchmark.
+
+Builds the TitleSearchIndex over the real catalog titles (~4k) and over
+synthetic catalogs of 100k and 1M titles assembled from the real title
+vocabulary, then reports build time, index size and per-query latency for a
+mix of prefix, multi-token and misspelled queries. The previous linear
+`str.contains` scan is timed alongside for comparison.
+
+Usage: python bench_search.py [--sizes 100000 1000000] [--queries 200]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'webapp'))
+from config import DATA_PATH  # noqa: E402
+from search_index import TOKEN_PATTERN, TitleSearchIndex  # noqa: E402
+
+
+def synthetic_titles(real_titles, n_items, seed=0):
+    """Titles of 1-5 words drawn from the real title vocabulary."""
+    rng = np.random.default_rng(seed)
+    words = np.array(sorted({w for t in real_titles for w in t.split()}), dtype=object)
+    lengths = rng.integers(1, 6, size=n_items)
+    picks = rng.integers(0, len(words), size=lengths.sum())
+    splits = np.split(words[picks], np.cumsum(lengths)[:-1])
+    return pd.Series([' '.join(ws) for ws in splits])
+
+
+def make_queries(titles, n_queries, seed=1):
+    """Prefixes, two-token queries and single-typo queries derived from catalog titles."""
+    rng = np.random.default_rng(seed)
+    queries = []
+    for title in titles.sample(n_queries, random_state=seed, replace=True).str.lower():
+        kind = rng.integers(3)
+        tokens = TOKEN_PATTERN.findall(title) or [title]
+        if kind == 0:
+            queries.append(title[:max(2, len(title) // 2)])
+        elif kind == 1:
+            queries.append(' '.join(tokens[:2]))
+        else:
+            word = max(tokens, key=len)
+            if len(word) > 3:
+                i = int(rng.integers(1, len(word) - 1))
+                word = word[:i] + word[i + 1:]
+            queries.append(word)
+    return queries
+
+
+def time_per_query(fn, queries):
+    start = time.perf_counter()
+    for q in queries:
+        fn(q)
+    return (time.perf_counter() - start) / len(queries) * 1000
+
+
+def bench(titles, n_queries, scan_limit):
+    popularity = np.random.default_rng(2).pareto(1.5, size=len(titles)) * 10
+    queries = make_queries(titles, n_queries)
+
+    start = time.perf_counter()
+    index = TitleSearchIndex(titles, popularity)
+    build_s = time.perf_counter() - start
+
+    indexed_ms = time_per_query(lambda q: index.search(q, 50), queries)
+    scan_ms = None
+    if len(titles) <= scan_limit:
+        scan_ms = time_per_query(lambda q: titles[titles.str.contains(q, case=False, regex=False)].head(50), queries)
+    return build_s, index.nbytes / 1e6, indexed_ms, scan_ms
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[100000, 1000000])
+    parser.add_argument('--queries', type=int, default=200)
+    parser.add_argument('--scan-limit', type=int, default=1000000, help="Largest size to also time the linear scan")
+    args = parser.parse_args()
+
+    real_titles = pd.read_csv(DATA_PATH)['title'].dropna().astype(str).reset_index(drop=True)
+    catalogs = [('real', real_titles)] + [('synthetic', synthetic_titles(real_titles, n)) for n in args.sizes]
+
+    print(f"{'catalog':>10} {'titles':>9} {'build s':>8} {'index MB':>9} {'index ms/q':>11} {'scan ms/q':>10}")
+    for name, titles in catalogs:
+        build_s, size_mb, indexed_ms, scan_ms = bench(titles, args.queries, args.scan_limit)
+        scan = '-' if scan_ms is None else f"{scan_ms:.3f}"
+        print(f"{name:>10} {len(titles):>9} {build_s:>8.2f} {size_mb:>9.1f} {indexed_ms:>11.3f} {scan:>10}")
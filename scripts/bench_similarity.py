@@ -0,0 +1,95 @@
+#! /usr/bin/env python3
+
+"""
+Catalog-size benchmark for the similarity engine.
+
+Builds synthetic TF-IDF matrices shaped like ours (MAX_FEATURES terms, a few
+dozen non-zero terms per title, Zipf-distributed term usage) and reports,
+per catalog size, the memory the dense N x N cosine matrix would need against
+what the sparse engine actually holds, plus per-request scoring latency.
+
+Usage: python bench_similarity.py [--sizes 4000 20000 100000] [--queries 200]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import scipy.sparse as sp
+from sklearn.metrics.pairwise import cosine_similarity
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'webapp'))
+from similarity import SimilarityEngine  # noqa: E402
+
+N_FEATURES = 5000
+TERMS_PER_ITEM = 35
+DENSE_LIMIT = 20000  # Only materialise the dense matrix up to this size
+
+
+def synthetic_tfidf(n_items, n_features=N_FEATURES, terms_per_item=TERMS_PER_ITEM, seed=0):
+    """Random sparse matrix with Zipf-like term frequencies, similar to real TF-IDF output."""
+    rng = np.random.default_rng(seed)
+    weights = 1.0 / np.arange(1, n_features + 1)
+    weights /= weights.sum()
+    cols = rng.choice(n_features, size=n_items * terms_per_item, p=weights)
+    rows = np.repeat(np.arange(n_items), terms_per_item)
+    data = rng.random(len(cols)).astype(np.float32) + 0.1
+    matrix = sp.csr_matrix((data, (rows, cols)), shape=(n_items, n_features))
+    matrix.sum_duplicates()
+    return matrix
+
+
+def time_queries(fn, queries):
+    start = time.perf_counter()
+    for q in queries:
+        fn(q)
+    return (time.perf_counter() - start) / len(queries) * 1000
+
+
+def bench(n_items, n_queries):
+    matrix = synthetic_tfidf(n_items)
+    queries = np.random.default_rng(1).integers(0, n_items, size=n_queries)
+
+    start = time.perf_counter()
+    engine = SimilarityEngine(matrix)
+    build_s = time.perf_counter() - start
+
+    result = {
+        'n_items': n_items,
+        'dense_mb': n_items * n_items * 8 / 1e6,
+        'sparse_mb': engine.nbytes / 1e6,
+        'sparse_build_s': build_s,
+        'sparse_ms': time_queries(engine.scores, queries),
+        'dense_build_s': None,
+        'dense_ms': None,
+    }
+
+    if n_items <= DENSE_LIMIT:
+        start = time.perf_counter()
+        dense = cosine_similarity(matrix, matrix)
+        result['dense_build_s'] = time.perf_counter() - start
+        result['dense_ms'] = time_queries(lambda i: dense[i].copy(), queries)
+        del dense
+
+    return result
+
+
+def fmt(value, spec):
+    return '-' if value is None else format(value, spec)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[4000, 20000, 100000])
+    parser.add_argument('--queries', type=int, default=200)
+    args = parser.parse_args()
+
+    print(f"{'items':>9} {'dense MB':>10} {'sparse MB':>10} {'dense build s':>14} "
+          f"{'sparse build s':>15} {'dense ms/q':>11} {'sparse ms/q':>12}")
+    for n in args.sizes:
+        r = bench(n, args.queries)
+        print(f"{r['n_items']:>9} {r['dense_mb']:>10.1f} {r['sparse_mb']:>10.1f} "
+              f"{fmt(r['dense_build_s'], '.2f'):>14} {r['sparse_build_s']:>15.2f} "
+              f"{fmt(r['dense_ms'], '.3f'):>11} {r['sparse_ms']:>12.3f}")
@@ -0,0 +1,213 @@
+#! /usr/bin/env python3
+
+"""
+Reproducible benchmark suite for the web app at growing catalog sizes.
+
+For each size, generates a synthetic catalog (synth_catalog.py, fixed seed)
+and runs a fresh child process that:
+  - builds the snapshot exactly as the app does at startup (timed per stage,
+    with peak RSS);
+  - microbenchmarks recommend (single and 32-query batches), search, genre
+    views, genre filters, deep pagination and response serialisation
+    against the live snapshot;
+  - replays the frontend traffic mix through the in-process ASGI load
+    driver (load_test.py).
+
+All results are written as one JSON document (with machine and git
+metadata). Pass a previous document as --compare to print the ratio of
+every timing to that run.
+
+Usage: python bench_suite.py [--sizes 10000 100000 1000000] [--out bench_results.json] [--compare OLD.json]
+                             [--queries 300] [--load-requests 3000] [--concurrency 32] [--seed 0] [--data-dir DIR]
+"""
+
+import argparse
+import asyncio
+import importlib.util
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+WEBAPP_DIR = os.path.join(SCRIPTS_DIR, '..', 'webapp')
+BATCH = 32 # Queries per call in the batched recommend benchmark
+
+
+def peak_rss_mb():
+    """Peak resident set size of this process (VmHWM), in MB."""
+    with open('/proc/self/status') as f:
+        for line in f:
+            if line.startswith('VmHWM:'):
+                return int(line.split()[1]) / 1024
+    return None
+
+
+def time_calls(fn, inputs):
+    """Calls `fn` on each input, returning latency stats in microseconds."""
+    latencies = []
+    for value in inputs:
+        start = time.perf_counter()
+        fn(value)
+        latencies.append(time.perf_counter() - start)
+    latencies = np.array(latencies) * 1e6
+    return {"calls": len(latencies), "mean_us": float(latencies.mean()),
+            "p50_us": float(np.percentile(latencies, 50)), "p99_us": float(np.percentile(latencies, 99))}
+
+
+# --- Child: one catalog size ---
+def run_size(data_path, queries, load_requests, concurrency, seed):
+    from load_test import CatalogSample, prepare_environment, run_load
+
+    prepare_environment(data_path)
+    sys.path.insert(0, WEBAPP_DIR)
+    os.chdir(WEBAPP_DIR)
+    start = time.perf_counter()
+    import app  # Builds the snapshot, as at server startup
+    build_s = time.perf_counter() - start
+
+    snapshot = app.catalog.current
+    sample = CatalogSample(snapshot, seed)
+    rng = np.random.default_rng(seed)
+    titles = [sample.title() for _ in range(queries)]
+    genres = [sample.genres[i] for i in rng.integers(0, len(sample.genres), size=queries)]
+    pairs = [(sample.genres[i], sample.genres[j]) for i, j in rng.integers(0, len(sample.genres), size=(queries, 2))]
+    searches = [sample.search_query() for _ in range(queries)]
+    all_view = snapshot.views['all']
+    deep_skips = rng.integers(0, max(1, len(all_view) - 24), size=queries)
+    cursors = []
+    for skip in deep_skips[:queries]:
+        _, cursor = all_view.page(int(skip), 24)
+        cursors.append(cursor)
+    pages = [rng.integers(0, len(all_view), size=24) for _ in range(queries)]
+
+    micro = {
+        "recommend": time_calls(lambda t: app.get_recommendations_logic(snapshot, t, 10), titles),
+        "recommend_batch32_per_query": {
+            key: (value / BATCH if key.endswith('_us') else value * BATCH) for key, value in time_calls(
+                lambda i: app.get_recommendations_many(snapshot, [(t, 10, None, None) for t in titles[i:i + BATCH]]),
+                range(0, max(1, len(titles) - BATCH), BATCH)).items()
+        },
+        "search": time_calls(lambda q: snapshot.search.search(q, limit=50), searches),
+        "genre_page": time_calls(lambda g: snapshot.genres.view([g]).page(0, 24), genres),
+        "genre_filter_all": time_calls(lambda p: snapshot.genres.view(list(p), 'all').page(0, 24), pairs),
+        "page_deep_skip": time_calls(lambda s: all_view.page(int(s), 24), deep_skips),
+        "page_cursor": time_calls(lambda c: all_view.page(0, 24, c), cursors),
+        "serialise_page": time_calls(lambda rows: snapshot.payloads.summary_list(rows), pages),
+    }
+    result = {
+        "items": len(snapshot.catalog),
+        "build": {"total_s": build_s, "peak_rss_mb": peak_rss_mb(),
+                  "stages": {f"{stage}_s": seconds for stage, seconds in (snapshot.update or {}).get('timings', {}).items()}},
+        "micro": micro,
+    }
+    if load_requests:
+        result["load"] = asyncio.run(run_load(app, concurrency, load_requests, seed=seed))
+    return result
+
+
+# --- Parent: generate, run, report ---
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=SCRIPTS_DIR, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def catalog_path(data_dir, rows, seed):
+    """A cached synthetic catalog for (rows, seed), generated on first use."""
+    from synth_catalog import write_synthetic
+    fmt = 'parquet' if importlib.util.find_spec('pyarrow') else 'csv'
+    path = os.path.join(data_dir, f"synthetic_{rows}_seed{seed}.{fmt}")
+    if not os.path.exists(path):
+        print(f"Generating {rows} synthetic items -> {path}")
+        write_synthetic(rows, path, fmt, seed)
+    return path
+
+
+def timings(result, prefix=''):
+    """Flattens a size result into {metric path: value} for the numeric timings worth comparing."""
+    flat = {}
+    for key, value in result.items():
+        path = f"{prefix}{key}"
+        if isinstance(value, dict):
+            flat.update(timings(value, path + '.'))
+        elif isinstance(value, (int, float)) and key.endswith(('_s', '_us', '_ms', '_rps', '_mb')):
+            flat[path] = value
+    return flat
+
+
+def print_summary(results, previous=None):
+    old = {str(r['rows']): timings(r) for r in (previous or {}).get('results', [])}
+    for result in results:
+        print(f"\n== {result['rows']} rows ==")
+        before = old.get(str(result['rows']), {})
+        for path, value in timings(result).items():
+            if '.endpoints.' in path and not path.endswith(('p50_ms', 'p99_ms')):
+                continue
+            line = f"{path:<60} {value:>12.2f}"
+            if path in before and before[path]:
+                line += f"   x{value / before[path]:.2f} vs previous"
+            print(line)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10000, 100000])
+    parser.add_argument('--out', default='bench_results.json')
+    parser.add_argument('--compare', help="Previous results JSON to compare against")
+    parser.add_argument('--queries', type=int, default=300, help="Calls per microbenchmark")
+    parser.add_argument('--load-requests', type=int, default=3000, help="Requests for the load test (0 skips it)")
+    parser.add_argument('--concurrency', type=int, default=32)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--data-dir', default=os.path.join(tempfile.gettempdir(), 'recommender_bench'),
+                        help="Where synthetic catalogs are generated and cached")
+    parser.add_argument('--worker', help=argparse.SUPPRESS) # Child mode: benchmark this catalog, print JSON
+    args = parser.parse_args()
+
+    if args.worker:
+        print(json.dumps(run_size(args.worker, args.queries, args.load_requests, args.concurrency, args.seed)))
+        sys.exit(0)
+
+    results = []
+    for rows in args.sizes:
+        path = catalog_path(args.data_dir, rows, args.seed)
+        print(f"Benchmarking {rows} rows...")
+        child = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), '--worker', path, '--queries', str(args.queries),
+             '--load-requests', str(args.load_requests), '--concurrency', str(args.concurrency),
+             '--seed', str(args.seed)],
+            capture_output=True, text=True,
+        )
+        if child.returncode != 0:
+            print(child.stderr[-2000:])
+            raise SystemExit(f"Benchmark for {rows} rows failed.")
+        results.append({"rows": rows, **json.loads(child.stdout.strip().splitlines()[-1])})
+
+    document = {
+        "meta": {
+            "timestamp": time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+            "git_commit": git_commit(),
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+            "args": {k: v for k, v in vars(args).items() if k != 'worker'},
+        },
+        "results": results,
+    }
+    with open(args.out, 'w') as f:
+        json.dump(document, f, indent=2)
+
+    previous = None
+    if args.compare:
+        with open(args.compare) as f:
+            previous = json.load(f)
+    print_summary(results, previous)
+    print(f"\nWrote {args.out}")
@@ -0,0 +1,50 @@
+#! /usr/bin/env python3
+
+"""
+Builds the prebuilt similarity index for the catalog.
+
+Fits TF-IDF on the content catalog (optionally reduced to dense SVD embeddings),
+precomputes every item's top-k neighbours and writes vocabulary, matrices
+and neighbour arrays to a versioned artifact under INDEX_DIR
+(data/index/<content hash>/). The web app memory-maps that artifact at
+startup instead of refitting, so all workers share one copy.
+
+Usage: python build_index.py [--data PATH] [--neighbours K] [--embedding-dims D] [--workers N]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'webapp'))
+from artifact import artifact_key, save_artifact  # noqa: E402
+from config import BUILD_WORKERS, DATA_PATH, EMBEDDING_DIMS, INDEX_DIR, LOG_LEVEL, MAX_FEATURES, NEIGHBOURS_K  # noqa: E402
+from log_config import configure_logging  # noqa: E402
+from pipeline import build_engine, index_params, read_catalog  # noqa: E402
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--data', default=DATA_PATH, help="Content catalog (CSV or Parquet) to index")
+    parser.add_argument('--index-dir', default=INDEX_DIR, help="Directory holding index artifacts")
+    parser.add_argument('--neighbours', type=int, default=NEIGHBOURS_K, help="Neighbours to precompute per item")
+    parser.add_argument('--embedding-dims', type=int, default=EMBEDDING_DIMS,
+                        help="Store dense SVD embeddings of this size instead of sparse TF-IDF (0 = sparse)")
+    parser.add_argument('--workers', type=int, default=BUILD_WORKERS,
+                        help="Processes for vectorising and neighbour precomputation (0 = every CPU)")
+    args = parser.parse_args()
+    configure_logging(LOG_LEVEL) # Progress messages from pipeline.py
+
+    start = time.perf_counter()
+    params = index_params(MAX_FEATURES, args.neighbours, args.embedding_dims)
+    key = artifact_key(args.data, params)
+
+    df = read_catalog(args.data)
+    vectorizer, engine = build_engine(df, MAX_FEATURES, args.neighbours, args.embedding_dims, args.workers)
+    path = save_artifact(args.index_dir, key, vectorizer, engine, df['id'].to_numpy(), params)
+
+    print(f"\nWrote index for {engine.n_items} items to {path} in {time.perf_counter() - start:.1f}s.")
+    if args.neighbours != NEIGHBOURS_K:
+        print(f"NOTE: the app looks for artifacts built with {NEIGHBOURS_K} neighbours (config.NEIGHBOURS_K).")
+    if args.embedding_dims != EMBEDDING_DIMS:
+        print(f"NOTE: the app looks for artifacts built with EMBEDDING_DIMS={EMBEDDING_DIMS}.")
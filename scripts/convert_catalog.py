@@ -0,0 +1,29 @@
+#! /usr/bin/env python3
+
+"""
+Converts an existing content CSV into the columnar Parquet catalog the web
+app prefers (see webapp/catalog_store.py), without refetching from TMDB.
+
+Usage: python convert_catalog.py [--csv ../data/content_raw.csv] [--out ../data/content.parquet]
+"""
+
+import argparse
+import os
+import sys
+
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'webapp'))
+from catalog_store import write_catalog  # noqa: E402
+from config import CSV_PATH, PARQUET_PATH  # noqa: E402
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--csv', default=CSV_PATH)
+    parser.add_argument('--out', default=PARQUET_PATH)
+    args = parser.parse_args()
+
+    df = pd.read_csv(args.csv)
+    write_catalog(df, args.out)
+    print(f"Wrote {len(df)} rows to {args.out} ({os.path.getsize(args.out) / 1e6:.1f} MB, "
+          f"CSV {os.path.getsize(args.csv) / 1e6:.1f} MB).")
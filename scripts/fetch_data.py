@@ -1,27 +1,45 @@
 #! /usr/bin/env python3
 
+"""
+Fetches popular movies and TV shows from TMDB into ../data/content_raw.csv
+and ../data/content.parquet (the columnar copy the server prefers; see
+webapp/catalog_store.py). --format limits the output to one of them.
+
+By default pages are fetched one at a time. With --async, pages are fetched
+concurrently over a pooled HTTP client with a token-bucket rate limit,
+retries with exponential backoff, and per-page checkpoints, so an
+interrupted or partly failed run resumes where it stopped (see
+tmdb_async.py). Point --base-url at mock_tmdb.py to run offline.
+
+Usage: python fetch_data.py [--async] [--movie-pages 100] [--tv-pages 100] [--concurrency 8] [--rate 40]
+                            [--format both|csv|parquet]
+"""
+
+import argparse
+import asyncio
 import requests
 import pandas as pd
 import os
+import sys
 import time
 from dotenv import load_dotenv
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'webapp'))
+from catalog_store import write_catalog  # noqa: E402
+
 # Load API key from .env file
 load_dotenv()
 TMDB_API_KEY = os.getenv("TMDB_API_KEY")
 
-if not TMDB_API_KEY:
-    raise ValueError("TMDB_API_KEY not found. Please set it in a .env file.")
-
 BASE_URL = "https://api.themoviedb.org/3"
 FETCH_DELAY = 0.5 # Seconds delay between API calls
 
-def get_genre_map(content_type='movie'):
+def get_genre_map(content_type='movie', base_url=BASE_URL):
     """Fetches the genre ID to name mapping for movies or TV from TMDB."""
     if content_type not in ['movie', 'tv']:
         raise ValueError("content_type must be 'movie' or 'tv'")
 
-    url = f"{BASE_URL}/genre/{content_type}/list?api_key={TMDB_API_KEY}&language=en-US"
+    url = f"{base_url}/genre/{content_type}/list?api_key={TMDB_API_KEY}&language=en-US"
     print(f"Fetching {content_type} genre map...")
     try:
         response = requests.get(url)
@@ -33,14 +51,44 @@ def get_genre_map(content_type='movie'):
         print(f"!!! Error fetching {content_type} genres: {e}")
         return {}
 
-def fetch_popular_content(content_type, num_pages, genre_map):
+def parse_results(results, content_type, genre_map):
+    """Standardizes raw TMDB list entries into catalog rows."""
+    rows = []
+    for item in results:
+        genre_names = [genre_map.get(gid) for gid in item.get('genre_ids', []) if genre_map.get(gid)]
+
+        # Standardize fields
+        item_id = item.get('id')
+        title = item.get('title') if content_type == 'movie' else item.get('name')
+        release_date = item.get('release_date') if content_type == 'movie' else item.get('first_air_date')
+        overview = item.get('overview')
+        vote_average = item.get('vote_average')
+        vote_count = item.get('vote_count')
+        popularity = item.get('popularity')
+        poster_path = item.get('poster_path')
+
+        rows.append({
+            'id': item_id,
+            'title': title,
+            'overview': overview,
+            'release_date': release_date,
+            'vote_average': vote_average,
+            'vote_count': vote_count,
+            'popularity': popularity,
+            'poster_path': poster_path,
+            'genre_names': ', '.join(genre_names),
+            'type': content_type # Add type column
+        })
+    return rows
+
+def fetch_popular_content(content_type, num_pages, genre_map, base_url=BASE_URL):
     """Fetches popular content (movies or TV) from TMDB API."""
     all_content = []
     content_path = 'movie' if content_type == 'movie' else 'tv' # API path segment
 
     print(f"\nAttempting to fetch {num_pages} pages of popular {content_type} shows...")
     for page in range(1, num_pages + 1):
-        url = f"{BASE_URL}/{content_path}/popular?api_key={TMDB_API_KEY}&language=en-US&page={page}"
+        url = f"{base_url}/{content_path}/popular?api_key={TMDB_API_KEY}&language=en-US&page={page}"
         try:
             response = requests.get(url)
             if response.status_code == 429:
@@ -55,31 +103,7 @@ def fetch_popular_content(content_type, num_pages, genre_map):
                  print(f"No results found on page {page} for {content_type}. Reached end.")
                  break
 
-            for item in results:
-                genre_names = [genre_map.get(gid) for gid in item.get('genre_ids', []) if genre_map.get(gid)]
-                
-                # Standardize fields
-                item_id = item.get('id')
-                title = item.get('title') if content_type == 'movie' else item.get('name')
-                release_date = item.get('release_date') if content_type == 'movie' else item.get('first_air_date')
-                overview = item.get('overview')
-                vote_average = item.get('vote_average')
-                vote_count = item.get('vote_count')
-                popularity = item.get('popularity')
-                poster_path = item.get('poster_path')
-
-                all_content.append({
-                    'id': item_id,
-                    'title': title,
-                    'overview': overview,
-                    'release_date': release_date,
-                    'vote_average': vote_average,
-                    'vote_count': vote_count,
-                    'popularity': popularity,
-                    'poster_path': poster_path,
-                    'genre_names': ', '.join(genre_names),
-                    'type': content_type # Add type column
-                })
+            all_content.extend(parse_results(results, content_type, genre_map))
             print(f"Successfully fetched page {page}/{num_pages} for {content_type}. Total {content_type} collected: {len(all_content)}")
             time.sleep(FETCH_DELAY)
 
@@ -94,13 +118,99 @@ def fetch_popular_content(content_type, num_pages, genre_map):
 
     return pd.DataFrame(all_content)
 
+async def fetch_all_async(content_pages, args):
+    """
+    Fetches every (content_type, num_pages) list concurrently through one
+    rate-limited client. Returns (DataFrames, {content_type: failed pages}).
+    """
+    # Imported here: only --async needs httpx
+    from tmdb_async import PageCheckpoint, TMDBClient, fetch_genre_map_async, fetch_popular_pages_async
+
+    async def fetch_one(client, content_type, num_pages):
+        genre_map = await fetch_genre_map_async(client, content_type)
+        if not genre_map:
+            print(f"\nCould not fetch {content_type} genre map. Skipping {content_type} fetch.")
+            return pd.DataFrame(), []
+        checkpoint = PageCheckpoint(os.path.join(args.checkpoint_dir, f"{content_type}.jsonl"))
+        if args.fresh:
+            checkpoint.clear()
+        pages, failed = await fetch_popular_pages_async(client, content_type, num_pages, checkpoint)
+        rows = []
+        for page in sorted(pages):
+            if not pages[page]:
+                break # Past the end of the list
+            rows.extend(parse_results(pages[page], content_type, genre_map))
+        return pd.DataFrame(rows), failed
+
+    async with TMDBClient(args.base_url, TMDB_API_KEY, args.concurrency, args.rate, args.retries) as client:
+        results = await asyncio.gather(*(fetch_one(client, t, n) for t, n in content_pages))
+    print(f"\nRequests: {dict(client.stats)}")
+    frames = [df for df, _ in results]
+    failed = {t: f for (t, _), (_, f) in zip(content_pages, results) if f}
+    return frames, failed
+
+def save_combined(all_dataframes, data_dir, formats=('csv', 'parquet')):
+    """
+    Combines the fetched frames and atomically replaces content_raw.csv and/or
+    content.parquet. Returns True on success.
+
+    The server prefers content.parquet when it exists, so Parquet is written
+    first (a failure leaves both old files in place) and a CSV written
+    without it removes any older content.parquet, which would otherwise keep
+    being served instead of the new data.
+    """
+    combined_df = pd.concat(all_dataframes, ignore_index=True)
+    print(f"\nCombined movies and TV shows. Total entries: {len(combined_df)}")
+
+    # Optional: Drop duplicates that might arise if an item is somehow fetched twice
+    combined_df = combined_df.drop_duplicates(subset=['id', 'type'])
+    print(f"Shape after dropping potential duplicates: {combined_df.shape}")
+
+    parquet_path = os.path.join(data_dir, 'content.parquet')
+    for file_format in sorted(formats, key=lambda f: f != 'parquet'):
+        output_path = os.path.join(data_dir, 'content_raw.csv') if file_format == 'csv' else parquet_path
+        print(f"\nAttempting to save combined data to: {output_path}")
+        try:
+            if file_format == 'csv':
+                # Write to a temporary file and rename it into place, so a server
+                # watching the file never reads a half-written CSV
+                tmp_path = output_path + '.tmp'
+                combined_df.to_csv(tmp_path, index=False)
+                os.replace(tmp_path, output_path)
+                if 'parquet' not in formats and os.path.exists(parquet_path):
+                    os.remove(parquet_path)
+                    print(f"Removed stale {parquet_path}")
+            else:
+                write_catalog(combined_df, output_path) # Same temp-file-and-rename
+            print(f"Successfully saved combined data to {output_path}")
+        except Exception as e:
+            print(f"\n!!! ERROR occurred while saving {output_path}: {e} !!!\n")
+            return False
+    print("\nFinal combined data - First 5 rows:")
+    print(combined_df.head())
+    return True
+
 if __name__ == "__main__":
     # --- Configuration ---
-    NUM_PAGES_MOVIES = 100 # Number of pages for movies (20 items/page)
-    NUM_PAGES_TV = 100     # Number of pages for TV shows
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--movie-pages', type=int, default=100, help="Number of pages for movies (20 items/page)")
+    parser.add_argument('--tv-pages', type=int, default=100, help="Number of pages for TV shows")
+    parser.add_argument('--async', dest='use_async', action='store_true', help="Concurrent, resumable fetching")
+    parser.add_argument('--concurrency', type=int, default=8, help="Requests in flight (--async)")
+    parser.add_argument('--rate', type=float, default=40.0, help="Requests per second (--async)")
+    parser.add_argument('--retries', type=int, default=5, help="Retries per request (--async)")
+    parser.add_argument('--checkpoint-dir', default=None, help="Page checkpoints (--async); default <data dir>/.fetch_checkpoint")
+    parser.add_argument('--fresh', action='store_true', help="Ignore existing checkpoints (--async)")
+    parser.add_argument('--base-url', default=BASE_URL, help="TMDB API root, e.g. a mock_tmdb.py server")
+    parser.add_argument('--data-dir', default='../data')
+    parser.add_argument('--format', choices=['both', 'csv', 'parquet'], default='both', help="Catalog file(s) to write")
+    args = parser.parse_args()
+
+    if not TMDB_API_KEY and args.base_url == BASE_URL:
+        raise ValueError("TMDB_API_KEY not found. Please set it in a .env file.")
 
     # --- Setup ---
-    data_dir = '../data'
+    data_dir = args.data_dir
     if not os.path.exists(data_dir):
         print(f"Creating directory: {data_dir}")
         try:
@@ -110,53 +220,44 @@ if __name__ == "__main__":
             print(f"!!! ERROR creating directory {data_dir}: {e} !!!")
             exit(1) # Exit if directory creation fails
 
-    # --- Fetch Genre Maps ---
-    movie_genre_map = get_genre_map('movie')
-    tv_genre_map = get_genre_map('tv')
-
+    content_pages = [('movie', args.movie_pages), ('tv', args.tv_pages)]
     all_dataframes = []
 
-    # --- Fetch Movies ---
-    if movie_genre_map:
-        movies_df = fetch_popular_content('movie', NUM_PAGES_MOVIES, movie_genre_map)
-        if not movies_df.empty:
-            print(f"\nFinished fetching movies. Collected {len(movies_df)} entries.")
-            all_dataframes.append(movies_df)
-        else:
-            print("\nNo movies were fetched.")
+    if args.use_async:
+        args.checkpoint_dir = args.checkpoint_dir or os.path.join(data_dir, '.fetch_checkpoint')
+        frames, failed = asyncio.run(fetch_all_async(content_pages, args))
+        if failed:
+            # Keep the previous CSV rather than publishing a catalog with holes;
+            # completed pages stay checkpointed, so a rerun only fetches these
+            for content_type, pages in failed.items():
+                print(f"!!! {content_type}: {len(pages)} page(s) failed: {pages}")
+            print("\nRerun the same command to resume. No file saved.")
+            exit(1)
+        all_dataframes = [df for df in frames if not df.empty]
     else:
-        print("\nCould not fetch movie genre map. Skipping movie fetch.")
-
-    # --- Fetch TV Shows ---
-    if tv_genre_map:
-        tv_df = fetch_popular_content('tv', NUM_PAGES_TV, tv_genre_map)
-        if not tv_df.empty:
-            print(f"\nFinished fetching TV shows. Collected {len(tv_df)} entries.")
-            all_dataframes.append(tv_df)
-        else:
-            print("\nNo TV shows were fetched.")
-    else:
-        print("\nCould not fetch TV genre map. Skipping TV fetch.")
+        for content_type, num_pages in content_pages:
+            label = 'movie' if content_type == 'movie' else 'TV'
+            # --- Fetch Genre Map ---
+            genre_map = get_genre_map(content_type, args.base_url)
+            if not genre_map:
+                print(f"\nCould not fetch {label} genre map. Skipping {label} fetch.")
+                continue
+            # --- Fetch Content ---
+            content_df = fetch_popular_content(content_type, num_pages, genre_map, args.base_url)
+            if not content_df.empty:
+                print(f"\nFinished fetching {label}s. Collected {len(content_df)} entries.")
+                all_dataframes.append(content_df)
+            else:
+                print(f"\nNo {label}s were fetched.")
 
     # --- Combine and Save ---
     if all_dataframes:
-        combined_df = pd.concat(all_dataframes, ignore_index=True)
-        print(f"\nCombined movies and TV shows. Total entries: {len(combined_df)}")
-
-        # Optional: Drop duplicates that might arise if an item is somehow fetched twice
-        combined_df = combined_df.drop_duplicates(subset=['id', 'type'])
-        print(f"Shape after dropping potential duplicates: {combined_df.shape}")
-
-        output_path = os.path.join(data_dir, 'content_raw.csv') # New filename
-        print(f"\nAttempting to save combined data to: {output_path}")
-        try:
-            combined_df.to_csv(output_path, index=False)
-            print(f"Successfully saved combined data to {output_path}")
-            print("\nFinal combined data - First 5 rows:")
-            print(combined_df.head())
-        except Exception as e:
-            print(f"\n!!! ERROR occurred during .to_csv(): {e} !!!\n")
+        formats = ('csv', 'parquet') if args.format == 'both' else (args.format,)
+        if save_combined(all_dataframes, data_dir, formats) and args.use_async:
+            from tmdb_async import PageCheckpoint
+            for content_type, _ in content_pages:
+                PageCheckpoint(os.path.join(args.checkpoint_dir, f"{content_type}.jsonl")).clear()
     else:
         print("\nNo data was fetched from either movies or TV shows. No file saved.")
 
-    print("\nScript finished.") 
\ No newline at end of file
+    print("\nScript finished.")
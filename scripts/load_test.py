@@ -0,0 +1,230 @@
+#! /usr/bin/env python3
+
+"""
+In-process ASGI load driver for the web app.
+
+Imports webapp/app.py against a catalog (an existing file, or a synthetic one
+generated with synth_catalog.py) and replays the frontend's traffic mix
+through httpx's ASGI transport: home page loads (/popular, /genres and a
+/recommend/batch of My List seeds), movie/show grids and genre pages
+followed through their cursors, searches, recommendations and item details.
+Titles are picked with probability proportional to popularity, so response
+cache hit rates resemble real traffic. No server or network is involved, so
+results measure the app itself (client overhead shares the same process).
+
+Prints per-endpoint latency percentiles and writes the full report as JSON.
+
+Usage: python load_test.py [--data PATH | --rows 100000] [--concurrency 32] [--requests 5000] [--duration 0]
+                           [--no-cache] [--seed 0] [--out load_results.json]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from urllib.parse import quote
+
+import numpy as np
+
+# (scenario, weight): how often a virtual user starts each kind of interaction
+TRAFFIC_MIX = [
+    ('home', 10),
+    ('browse', 20),
+    ('genre', 15),
+    ('search', 20),
+    ('recommend', 20),
+    ('item', 15),
+]
+PAGE_SIZE = 24
+
+
+def prepare_environment(data_path=None, no_cache=False):
+    """Points the app's config at `data_path` (if given); must run before `app` is imported."""
+    if data_path:
+        os.environ['DATA_PATH'] = data_path
+    os.environ['RELOAD_POLL_SECONDS'] = '0'
+    os.environ.setdefault('LOG_LEVEL', 'WARNING')
+    if no_cache:
+        os.environ['RESPONSE_CACHE_ENTRIES'] = '0'
+
+
+class CatalogSample:
+    """Titles, item keys and genres of the live snapshot to draw requests from."""
+
+    def __init__(self, snapshot, seed=0):
+        df = snapshot.content_df
+        # Cumulative popularity, so drawing a row is one binary search at any catalog size
+        self.cdf = np.cumsum(df['popularity'].to_numpy(dtype=np.float64))
+        self.titles = df['title'].astype(str).to_numpy(dtype=object)
+        self.types = df['type'].astype(str).to_numpy(dtype=object)
+        self.ids = df['id'].to_numpy()
+        self.genres = list(snapshot.genres.names)
+        self.rng = np.random.default_rng(seed)
+
+    def row(self):
+        return min(int(np.searchsorted(self.cdf, self.rng.random() * self.cdf[-1], side='right')), len(self.cdf) - 1)
+
+    def title(self):
+        return self.titles[self.row()]
+
+    def search_query(self):
+        title = self.title()
+        kind = self.rng.random()
+        if kind < 0.5 and len(title) > 3:
+            return title[:int(self.rng.integers(3, min(len(title), 10) + 1))] # Typed prefix
+        if kind < 0.7 and len(title) > 4:
+            i = int(self.rng.integers(1, len(title) - 1)) # One-character typo
+            return title[:i] + title[i + 1:]
+        return title
+
+
+class LoadDriver:
+    """Virtual users issuing the traffic mix; records (endpoint, status, latency) per request."""
+
+    def __init__(self, client, sample, seed=0):
+        self.client = client
+        self.sample = sample
+        self.random = random.Random(seed)
+        self.records = defaultdict(list) # endpoint -> [(status, seconds)]
+        self.sent = 0
+
+    async def request(self, endpoint, method, url, **kwargs):
+        start = time.perf_counter()
+        response = await self.client.request(method, url, **kwargs)
+        self.records[endpoint].append((response.status_code, time.perf_counter() - start))
+        self.sent += 1
+        return response
+
+    async def home(self):
+        await self.request('/popular', 'GET', '/popular?limit=10')
+        await self.request('/popular', 'GET', f'/popular?limit={PAGE_SIZE}')
+        await self.request('/genres', 'GET', '/genres')
+        seeds = [self.sample.title() for _ in range(self.random.randint(3, 5))]
+        await self.request('/recommend/batch', 'POST', '/recommend/batch', json={'titles': seeds, 'top_n': 10})
+
+    async def follow_pages(self, endpoint, url, pages):
+        response = await self.request(endpoint, 'GET', f'{url}?skip=0&limit={PAGE_SIZE}')
+        for _ in range(pages - 1):
+            cursor = response.json().get('next_cursor') if response.status_code == 200 else None
+            if not cursor:
+                break
+            response = await self.request(endpoint, 'GET', f'{url}?cursor={quote(cursor)}&limit={PAGE_SIZE}')
+
+    async def browse(self):
+        endpoint = self.random.choice(['/api/movies', '/api/shows'])
+        await self.follow_pages(endpoint, endpoint, self.random.randint(1, 5))
+
+    async def genre(self):
+        genre = self.random.choice(self.sample.genres)
+        await self.follow_pages('/genre/{genre_name}', f'/genre/{quote(genre, safe="")}', self.random.randint(1, 4))
+
+    async def search(self):
+        await self.request('/search', 'GET', '/search', params={'query': self.sample.search_query()})
+
+    async def recommend(self):
+        await self.request('/recommend/{title}', 'GET', f'/recommend/{quote(self.sample.title(), safe="")}')
+
+    async def item(self):
+        row = self.sample.row()
+        await self.request('/item/{type}/{id}', 'GET', f'/item/{self.sample.types[row]}/{self.sample.ids[row]}')
+
+    async def user(self, stop):
+        scenarios, weights = zip(*TRAFFIC_MIX)
+        while not stop():
+            await getattr(self, self.random.choices(scenarios, weights)[0])()
+
+
+def summarise(records, elapsed):
+    endpoints = {}
+    for endpoint, samples in sorted(records.items()):
+        statuses = defaultdict(int)
+        for status, _ in samples:
+            statuses[str(status)] += 1
+        latencies = np.array([seconds for _, seconds in samples]) * 1000
+        endpoints[endpoint] = {
+            "count": len(samples),
+            "statuses": dict(statuses),
+            "mean_ms": float(latencies.mean()),
+            "p50_ms": float(np.percentile(latencies, 50)),
+            "p95_ms": float(np.percentile(latencies, 95)),
+            "p99_ms": float(np.percentile(latencies, 99)),
+        }
+    total = sum(e["count"] for e in endpoints.values())
+    errors = sum(count for e in endpoints.values() for status, count in e["statuses"].items() if status >= '500')
+    return {"requests": total, "elapsed_s": elapsed, "throughput_rps": total / elapsed if elapsed else 0.0,
+            "errors": errors, "endpoints": endpoints}
+
+
+async def run_load(app_module, concurrency=32, requests=5000, duration=0.0, seed=0):
+    """Drives `app_module.app` with `concurrency` virtual users until `requests` are sent (or `duration` passes)."""
+    import httpx
+
+    sample = CatalogSample(app_module.catalog.current, seed)
+    transport = httpx.ASGITransport(app=app_module.app)
+    async with httpx.AsyncClient(transport=transport, base_url='http://load-test', timeout=60) as client:
+        driver = LoadDriver(client, sample, seed)
+        deadline = time.perf_counter() + duration if duration else None
+
+        def stop():
+            return driver.sent >= requests if deadline is None else time.perf_counter() >= deadline
+
+        start = time.perf_counter()
+        await asyncio.gather(*[driver.user(stop) for _ in range(concurrency)])
+        elapsed = time.perf_counter() - start
+        status = (await client.get('/admin/status', headers={'X-Admin-Token': os.getenv('ADMIN_TOKEN', '')})).json()
+
+    report = summarise(driver.records, elapsed)
+    report["config"] = {"concurrency": concurrency, "requests": requests, "duration": duration, "seed": seed,
+                        "items": len(sample.titles), "mix": dict(TRAFFIC_MIX)}
+    report["server"] = {key: status.get(key) for key in ('response_cache', 'scoring', 'recommend_batching', 'limits')}
+    return report
+
+
+def print_report(report):
+    print(f"{report['requests']} requests in {report['elapsed_s']:.1f}s: {report['throughput_rps']:.0f} req/s, "
+          f"{report['errors']} server errors")
+    print(f"{'endpoint':<22} {'count':>6} {'mean ms':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}  statuses")
+    for endpoint, stats in report['endpoints'].items():
+        print(f"{endpoint:<22} {stats['count']:>6} {stats['mean_ms']:>8.2f} {stats['p50_ms']:>8.2f} "
+              f"{stats['p95_ms']:>8.2f} {stats['p99_ms']:>8.2f}  {stats['statuses']}")
+    cache = report['server'].get('response_cache') or {}
+    if cache.get('hit_rate') is not None:
+        print(f"Response cache hit rate {cache['hit_rate']:.1%}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    source = parser.add_mutually_exclusive_group()
+    source.add_argument('--data', help="Catalog file to serve (default: the app's DATA_PATH)")
+    source.add_argument('--rows', type=int, help="Serve a synthetic catalog of this many rows instead")
+    parser.add_argument('--concurrency', type=int, default=32, help="Virtual users")
+    parser.add_argument('--requests', type=int, default=5000, help="Stop after this many requests")
+    parser.add_argument('--duration', type=float, default=0, help="Stop after this many seconds instead")
+    parser.add_argument('--no-cache', action='store_true', help="Disable the response cache")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--out', help="Write the JSON report here")
+    args = parser.parse_args()
+
+    data = args.data
+    if args.rows:
+        from synth_catalog import write_synthetic
+        data = os.path.join(tempfile.mkdtemp(prefix='load_test_'), f'synthetic_{args.rows}.csv')
+        write_synthetic(args.rows, data, seed=args.seed)
+    prepare_environment(data, args.no_cache)
+
+    sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'webapp'))
+    os.chdir(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'webapp')) # Static files and templates
+    import app  # noqa: E402
+
+    report = asyncio.run(run_load(app, args.concurrency, args.requests, args.duration, args.seed))
+    report["config"]["data"] = os.environ.get('DATA_PATH') or app.DATA_PATH
+    print_report(report)
+    if args.out:
+        with open(args.out, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"Wrote {args.out}")
@@ -0,0 +1,181 @@
+#! /usr/bin/env python3
+
+"""
+Local mock of the TMDB endpoints used by fetch_data.py, for testing
+ingestion throughput and retry behaviour offline.
+
+Serves /3/genre/{movie,tv}/list and /3/{movie,tv}/popular?page=N with
+deterministic items, and can inject latency, random 5xx errors, pages that
+always fail, and a server-side request rate limit answered with 429 and a
+`Retry-After` header. Request counts are kept in `MockTMDB.stats`.
+
+Usage: python mock_tmdb.py [--port 8765] [--pages 500] [--latency 0.05] [--error-rate 0.05] [--rate-limit 40]
+Then:  python fetch_data.py --async --base-url http://127.0.0.1:8765/3
+"""
+
+import argparse
+import json
+import random
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+PAGE_SIZE = 20
+GENRES = {
+    'movie': [(28, 'Action'), (12, 'Adventure'), (35, 'Comedy'), (18, 'Drama'), (27, 'Horror'), (878, 'Science Fiction')],
+    'tv': [(10759, 'Action & Adventure'), (35, 'Comedy'), (18, 'Drama'), (9648, 'Mystery'), (10765, 'Sci-Fi & Fantasy')],
+}
+
+
+def mock_item(content_type, page, position):
+    """A deterministic popular-list entry shaped like TMDB's."""
+    item_id = page * 1000 + position + (0 if content_type == 'movie' else 500)
+    genres = GENRES[content_type]
+    item = {
+        'id': item_id,
+        'overview': f"Mock {content_type} {item_id} overview about {genres[item_id % len(genres)][1].lower()}.",
+        'vote_average': round(5 + (item_id % 50) / 10, 1),
+        'vote_count': item_id % 5000,
+        'popularity': round(10000.0 / (page * PAGE_SIZE + position), 4),
+        'poster_path': f"/mock{item_id}.jpg",
+        'genre_ids': [genres[item_id % len(genres)][0], genres[(item_id // 7) % len(genres)][0]],
+    }
+    if content_type == 'movie':
+        item.update(title=f"Mock Movie {item_id}", release_date='2024-01-01')
+    else:
+        item.update(name=f"Mock Show {item_id}", first_air_date='2024-01-01')
+    return item
+
+
+class MockTMDB:
+    """
+    Threaded HTTP server imitating TMDB, started in a background thread.
+
+    Usable as a context manager; `base_url` is the API root to pass to the
+    fetcher. Failure injection: `latency` seconds per response,
+    `error_rate` probability of a random 500/503, `fail_pages` pages that
+    always answer 500, and `rate_limit` requests per second above which
+    requests get 429 with `Retry-After: retry_after`.
+    """
+
+    def __init__(self, port=0, pages=500, latency=0.0, error_rate=0.0, fail_pages=(), rate_limit=None,
+                 retry_after=1, seed=0):
+        self.pages = pages
+        self.latency = latency
+        self.error_rate = error_rate
+        self.fail_pages = set(fail_pages)
+        self.rate_limit = rate_limit
+        self.retry_after = retry_after
+        self.stats = Counter()
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._window_start, self._window_count = time.monotonic(), 0
+        self._server = ThreadingHTTPServer(('127.0.0.1', port), self._handler_class())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def base_url(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/3"
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, name='mock-tmdb', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def _count(self, key):
+        with self._lock:
+            self.stats[key] += 1
+
+    def _over_rate_limit(self):
+        """Fixed one-second window counter, like most API gateways."""
+        if not self.rate_limit:
+            return False
+        with self._lock:
+            now = time.monotonic()
+            if now - self._window_start >= 1.0:
+                self._window_start, self._window_count = now, 0
+            self._window_count += 1
+            return self._window_count > self.rate_limit
+
+    def _respond(self, path, query):
+        """Returns (status, headers, body dict) for one request."""
+        self._count('requests')
+        if self._over_rate_limit():
+            self._count('429')
+            return 429, {'Retry-After': str(self.retry_after)}, {'status_message': 'Request limit exceeded.'}
+        if self.latency:
+            time.sleep(self.latency)
+        with self._lock:
+            failed = self._random.random() < self.error_rate
+        if failed:
+            self._count('5xx')
+            return self._random.choice([500, 503]), {}, {'status_message': 'Internal error.'}
+
+        parts = path.strip('/').split('/')
+        if len(parts) == 4 and parts[:2] == ['3', 'genre'] and parts[2] in GENRES and parts[3] == 'list':
+            return 200, {}, {'genres': [{'id': i, 'name': n} for i, n in GENRES[parts[2]]]}
+        if len(parts) == 3 and parts[0] == '3' and parts[1] in GENRES and parts[2] == 'popular':
+            page = int(query.get('page', ['1'])[0])
+            if page in self.fail_pages:
+                self._count('5xx')
+                return 500, {}, {'status_message': 'Internal error.'}
+            self._count('pages')
+            results = [mock_item(parts[1], page, i) for i in range(PAGE_SIZE)] if page <= self.pages else []
+            return 200, {}, {'page': page, 'results': results, 'total_pages': self.pages,
+                             'total_results': self.pages * PAGE_SIZE}
+        return 404, {}, {'status_message': 'Not found.'}
+
+    def _handler_class(self):
+        mock = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1' # Keep-alive, so client connection pooling is exercised
+
+            def do_GET(self):
+                url = urlparse(self.path)
+                status, headers, body = mock._respond(url.path, parse_qs(url.query))
+                payload = json.dumps(body).encode()
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(payload)))
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--pages', type=int, default=500)
+    parser.add_argument('--latency', type=float, default=0.05)
+    parser.add_argument('--error-rate', type=float, default=0.0)
+    parser.add_argument('--rate-limit', type=int, default=None)
+    args = parser.parse_args()
+
+    with MockTMDB(args.port, args.pages, args.latency, args.error_rate, rate_limit=args.rate_limit) as server:
+        print(f"Mock TMDB serving at {server.base_url} (Ctrl+C to stop)")
+        try:
+            while True:
+                time.sleep(1)
+        except KeyboardInterrupt:
+            print(f"\nRequests served: {dict(server.stats)}")
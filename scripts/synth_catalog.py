@@ -0,0 +1,167 @@
+#! /usr/bin/env python3
+
+"""
+Synthetic content catalog generator.
+
+Writes a catalog with the same schema as content_raw.csv (id, title,
+overview, release_date, vote_average, vote_count, popularity, poster_path,
+genre_names, type) at any size, deterministically from a seed, so benchmarks
+can run at 10k, 100k or 1M rows without the TMDB API.
+
+The shape follows the real data: items belong to topics that share title
+and overview words (so similarity has structure to find), about 5% are
+sequels of an earlier title (near-duplicates), overview lengths, genre
+combinations per type and the long-tailed popularity match the fetched
+catalog, and about 5% of overviews are missing.
+
+Usage: python synth_catalog.py --rows 100000 [--out data/synthetic_100000.csv] [--format csv|parquet] [--seed 0]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'webapp'))
+from catalog_store import write_catalog  # noqa: E402
+
+MOVIE_GENRES = ['Action', 'Adventure', 'Animation', 'Comedy', 'Crime', 'Documentary', 'Drama', 'Family', 'Fantasy',
+                'History', 'Horror', 'Music', 'Mystery', 'Romance', 'Science Fiction', 'TV Movie', 'Thriller', 'War',
+                'Western']
+TV_GENRES = ['Action & Adventure', 'Animation', 'Comedy', 'Crime', 'Documentary', 'Drama', 'Family', 'Kids', 'Mystery',
+             'News', 'Reality', 'Sci-Fi & Fantasy', 'Soap', 'Talk', 'War & Politics', 'Western']
+SYLLABLES = ['ka', 'lo', 'mi', 'ra', 'ten', 'vor', 'sha', 'el', 'dun', 'bri', 'os', 'ty', 'gan', 'per', 'ul', 'zel',
+             'an', 'cor', 'fi', 'ham', 'ix', 'jor', 'ne', 'qua', 'sol', 'wen', 'ar', 'bel', 'dor', 'is']
+SEQUEL_SUFFIXES = np.array([' 2', ' 3', ' II', ': Part Two', ': Reloaded', ': The Return'], dtype=object)
+POSTER_CHARS = np.frombuffer(b'0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz', dtype='S1')
+VOCABULARY_SIZE = 20000
+TOPIC_WORDS = 40 # Words characteristic of each topic
+TOPIC_SHARE = 0.3 # Share of an overview's words drawn from its topic
+SEQUEL_SHARE = 0.05
+MISSING_OVERVIEW_SHARE = 0.05
+MOVIE_SHARE = 0.46
+
+
+def vocabulary(rng, size=VOCABULARY_SIZE):
+    """`size` distinct pseudo-words of 2-4 syllables."""
+    words = set()
+    syllables = np.array(SYLLABLES, dtype=object)
+    while len(words) < size:
+        lengths = rng.integers(2, 5, size=size)
+        parts = syllables[rng.integers(0, len(syllables), size=(size, 4))]
+        words.update(''.join(row[:length]) for row, length in zip(parts, lengths))
+    return np.array(sorted(words)[:size], dtype=object)
+
+
+def join_words(words, lengths):
+    """Joins consecutive runs of `words` (an object array) of the given `lengths` into strings."""
+    ends = np.cumsum(lengths)
+    return [' '.join(words[end - length:end]) for end, length in zip(ends.tolist(), lengths.tolist())]
+
+
+def genre_combinations(rng, genres, n_topics):
+    """One 1-3 genre combination per topic, as the comma-separated `genre_names` strings."""
+    counts = rng.choice([1, 2, 3], size=n_topics, p=[0.3, 0.45, 0.25])
+    weights = 1.0 / np.arange(1, len(genres) + 1) ** 0.8
+    weights /= weights.sum()
+    return np.array([', '.join(sorted(rng.choice(genres, size=c, replace=False, p=weights))) for c in counts],
+                    dtype=object)
+
+
+def synthetic_catalog(rows, seed=0):
+    """Builds a synthetic catalog DataFrame of `rows` items (see the module docstring)."""
+    rng = np.random.default_rng(seed)
+    words = vocabulary(rng)
+    capitalised = np.array([w.capitalize() for w in words], dtype=object)
+    zipf = 1.0 / np.arange(1, len(words) + 1) ** 1.07
+    zipf /= zipf.sum()
+
+    n_topics = max(8, int(np.sqrt(rows) * 2))
+    topic_words = rng.integers(0, len(words), size=(n_topics, TOPIC_WORDS))
+    topic = rng.integers(0, n_topics, size=rows)
+    types = np.where(rng.random(rows) < MOVIE_SHARE, 'movie', 'tv').astype(object)
+
+    # Overviews: a mix of topic words and Zipf-distributed background words
+    lengths = np.clip(rng.lognormal(3.8, 0.55, size=rows).astype(np.int64), 5, 400)
+    total = int(lengths.sum())
+    owner = np.repeat(topic, lengths)
+    from_topic = rng.random(total) < TOPIC_SHARE
+    ids = rng.choice(len(words), size=total, p=zipf)
+    ids[from_topic] = topic_words[owner[from_topic], rng.integers(0, TOPIC_WORDS, size=int(from_topic.sum()))]
+    tokens = words[ids]
+    ends = np.cumsum(lengths)
+    tokens[ends - lengths] = capitalised[ids[ends - lengths]]
+    tokens[ends - 1] = tokens[ends - 1] + '.'
+    overview = np.array(join_words(tokens, lengths), dtype=object)
+
+    # Titles: 1-4 capitalised topic words
+    title_lengths = rng.choice([1, 2, 3, 4], size=rows, p=[0.2, 0.35, 0.3, 0.15])
+    title_ids = topic_words[np.repeat(topic, title_lengths), rng.integers(0, TOPIC_WORDS, size=int(title_lengths.sum()))]
+    title = np.array(join_words(capitalised[title_ids], title_lengths), dtype=object)
+
+    # Sequels reuse an earlier item's title, topic, type and most of its overview
+    sequel = np.flatnonzero(rng.random(rows) < SEQUEL_SHARE)
+    sequel = sequel[sequel > 0]
+    original = (rng.random(len(sequel)) * sequel).astype(np.int64)
+    title[sequel] = title[original] + SEQUEL_SUFFIXES[rng.integers(0, len(SEQUEL_SUFFIXES), size=len(sequel))]
+    overview[sequel] = overview[original]
+    topic[sequel] = topic[original]
+    types[sequel] = types[original]
+    overview[rng.random(rows) < MISSING_OVERVIEW_SHARE] = np.nan
+
+    movie = types == 'movie'
+    genre_names = np.where(movie, genre_combinations(rng, MOVIE_GENRES, n_topics)[topic],
+                           genre_combinations(rng, TV_GENRES, n_topics)[topic])
+
+    # TMDB ids are unique per type; movie and TV ids overlap
+    item_id = np.empty(rows, dtype=np.int64)
+    for mask in (movie, ~movie):
+        count = int(mask.sum())
+        item_id[mask] = rng.choice(max(2 * rows, 100), size=count, replace=False) + 1
+
+    days = rng.integers(0, (pd.Timestamp('2025-12-31') - pd.Timestamp('1950-01-01')).days, size=rows)
+    release_date = (pd.Timestamp('1950-01-01') + pd.to_timedelta(days, unit='D')).strftime('%Y-%m-%d')
+    poster = POSTER_CHARS[rng.integers(0, len(POSTER_CHARS), size=(rows, 27))].view('S27').ravel().astype(str)
+
+    return pd.DataFrame({
+        'id': item_id,
+        'title': title,
+        'overview': overview,
+        'release_date': release_date,
+        'vote_average': np.round(np.clip(rng.normal(6.3, 1.6, size=rows), 0, 10), 3),
+        'vote_count': np.floor(rng.lognormal(5.0, 2.2, size=rows)).astype(np.int64),
+        'popularity': np.round(6.0 + rng.lognormal(3.3, 1.0, size=rows), 4),
+        'poster_path': np.char.add(np.char.add('/', poster), '.jpg').astype(object),
+        'genre_names': genre_names,
+        'type': types,
+    })
+
+
+def write_synthetic(rows, path, fmt='csv', seed=0):
+    """Generates `rows` items and writes them to `path` as CSV or Parquet."""
+    df = synthetic_catalog(rows, seed)
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    if fmt == 'parquet':
+        write_catalog(df, path)
+    else:
+        df.to_csv(path, index=False)
+    return df
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=100000)
+    parser.add_argument('--out', help="Output path (default data/synthetic_<rows>.<format>)")
+    parser.add_argument('--format', choices=['csv', 'parquet'], default='csv')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    out = args.out or os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'data',
+                                   f"synthetic_{args.rows}.{args.format}")
+    start = time.perf_counter()
+    df = write_synthetic(args.rows, out, args.format, args.seed)
+    print(f"Wrote {len(df)} synthetic items ({(df['type'] == 'movie').sum()} movies) to {os.path.normpath(out)} "
+          f"in {time.perf_counter() - start:.1f}s.")
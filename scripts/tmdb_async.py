@@ -0,0 +1,261 @@
+"""
+Asynchronous TMDB ingestion used by `fetch_data.py --async`.
+
+A pooled `httpx.AsyncClient` shared by a fixed number of worker tasks, a
+token-bucket rate limiter that every request passes through (and that a
+429's `Retry-After` pauses for everyone), exponential-backoff retries with
+jitter, and an append-only checkpoint of completed pages so an interrupted
+run resumes where it stopped.
+"""
+
+import asyncio
+import json
+import os
+import random
+import time
+from collections import Counter
+from email.utils import parsedate_to_datetime
+
+import httpx
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+class FetchError(Exception):
+    """A request still failing after every retry."""
+
+
+def parse_retry_after(value):
+    """Seconds to wait from a `Retry-After` header (delta-seconds or HTTP date), or None."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+# --- Rate Limiting ---
+class TokenBucket:
+    """
+    Token bucket allowing `rate` requests per second with bursts of `capacity`.
+
+    `pause` empties the bucket and blocks every caller until the given delay
+    has passed, which is how a server's `Retry-After` is honoured globally
+    rather than by the one request that received it.
+    """
+
+    def __init__(self, rate, capacity=None):
+        self.rate = rate
+        self.capacity = capacity or max(1.0, rate)
+        self.tokens = self.capacity
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = asyncio.Lock()
+
+    def _refill(self, now):
+        self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    async def acquire(self):
+        async with self._lock: # Waiters queue up in arrival order
+            while True:
+                now = time.monotonic()
+                if now < self._paused_until:
+                    await asyncio.sleep(self._paused_until - now)
+                    continue
+                self._refill(now)
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+    def pause(self, seconds):
+        now = time.monotonic()
+        self._paused_until = max(self._paused_until, now + seconds)
+        self._refill(now)
+        self.tokens = 0.0
+
+
+# --- HTTP Client ---
+class TMDBClient:
+    """
+    Pooled async TMDB client with rate limiting and retries.
+
+    Retries 429, 5xx, transport errors and 200s whose body is not JSON up
+    to `retries` times, waiting `Retry-After` when the server sends one and
+    otherwise an exponential backoff (`backoff` x 2^attempt, capped at
+    `max_backoff`) with full jitter. Other 4xx responses fail immediately. Counters are kept in
+    `stats`.
+    """
+
+    def __init__(self, base_url, api_key, concurrency=8, rate=40.0, retries=5, backoff=0.5, max_backoff=30.0,
+                 timeout=10.0):
+        self.base_url = base_url.rstrip('/')
+        self.api_key = api_key
+        self.concurrency = concurrency
+        self.bucket = TokenBucket(rate)
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.timeout = timeout
+        self.stats = Counter()
+        self._client = None
+
+    async def __aenter__(self):
+        limits = httpx.Limits(max_connections=self.concurrency, max_keepalive_connections=self.concurrency)
+        self._client = httpx.AsyncClient(limits=limits, timeout=self.timeout,
+                                         params={'api_key': self.api_key, 'language': 'en-US'})
+        return self
+
+    async def __aexit__(self, *exc):
+        await self._client.aclose()
+
+    def _backoff_delay(self, attempt):
+        return random.uniform(0, min(self.max_backoff, self.backoff * 2 ** attempt))
+
+    async def get_json(self, path, **params):
+        """GET `base_url + path` and return the decoded JSON, retrying transient failures."""
+        url = self.base_url + path
+        for attempt in range(self.retries + 1):
+            await self.bucket.acquire()
+            self.stats['requests'] += 1
+            try:
+                response = await self._client.get(url, params=params)
+            except httpx.TransportError as e:
+                self.stats['transport_errors'] += 1
+                problem, delay = f"{type(e).__name__}: {e}", self._backoff_delay(attempt)
+            else:
+                if response.status_code == 200:
+                    try:
+                        return response.json()
+                    except ValueError:
+                        # A truncated or non-JSON body (e.g. a proxy error page): retried, then a failed page
+                        self.stats['invalid_json'] += 1
+                        problem, delay = "response body is not JSON", self._backoff_delay(attempt)
+                elif response.status_code not in RETRY_STATUSES:
+                    raise FetchError(f"GET {path} {params} returned {response.status_code}: {response.text[:200]}")
+                else:
+                    self.stats[str(response.status_code)] += 1
+                    problem = f"status {response.status_code}"
+                    retry_after = parse_retry_after(response.headers.get('Retry-After'))
+                    if retry_after is not None:
+                        # The whole client is over the limit, not just this request
+                        self.bucket.pause(retry_after)
+                        delay = 0.0
+                    else:
+                        delay = self._backoff_delay(attempt)
+            if attempt == self.retries:
+                break
+            self.stats['retries'] += 1
+            await asyncio.sleep(delay)
+        raise FetchError(f"GET {path} {params} failed after {self.retries + 1} attempts ({problem}).")
+
+
+# --- Checkpoints ---
+class PageCheckpoint:
+    """
+    Append-only JSON-lines record of the pages already fetched for one list.
+
+    Each line holds a page number, its raw results and the reported total
+    page count. A line cut short by a crash is ignored on load, so that page
+    is simply fetched again.
+    """
+
+    def __init__(self, path):
+        self.path = path
+
+    def load(self):
+        """Returns ({page: results}, total_pages or None)."""
+        pages, total_pages = {}, None
+        if not os.path.exists(self.path):
+            return pages, total_pages
+        with open(self.path) as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                pages[entry['page']] = entry['results']
+                total_pages = entry.get('total_pages', total_pages)
+        return pages, total_pages
+
+    def record(self, page, results, total_pages):
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        with open(self.path, 'a') as f:
+            f.write(json.dumps({'page': page, 'total_pages': total_pages, 'results': results}) + '\n')
+            f.flush()
+            os.fsync(f.fileno())
+
+    def clear(self):
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+
+# --- Ingestion ---
+async def fetch_genre_map_async(client, content_type):
+    """Genre ID -> name mapping for movies or TV; empty on failure."""
+    print(f"Fetching {content_type} genre map...")
+    try:
+        data = await client.get_json(f"/genre/{content_type}/list")
+    except (FetchError, ValueError) as e:
+        print(f"!!! Error fetching {content_type} genres: {e}")
+        return {}
+    print(f"Successfully fetched {content_type} genre map.")
+    return {genre['id']: genre['name'] for genre in data.get('genres', [])}
+
+
+async def fetch_popular_pages_async(client, content_type, num_pages, checkpoint):
+    """
+    Fetches pages 1..num_pages of the popular list with `client.concurrency`
+    workers, skipping pages already in `checkpoint` and recording each page
+    as it completes.
+
+    Returns ({page: raw results}, failed pages). A failing page is retried
+    by the client and then reported, without stopping the other pages.
+    """
+    pages, total_pages = checkpoint.load()
+    if pages:
+        print(f"Resuming {content_type}: {len(pages)} page(s) already checkpointed.")
+    path = f"/{content_type}/popular"
+    failed = []
+
+    if total_pages is None and 1 not in pages:
+        # Page 1 reports how many pages exist, so later pages are never requested past the end
+        try:
+            data = await client.get_json(path, page=1)
+        except FetchError as e:
+            print(f"!!! Error fetching {content_type} page 1: {e}")
+            return pages, [1]
+        total_pages = data.get('total_pages')
+        pages[1] = data.get('results', [])
+        checkpoint.record(1, pages[1], total_pages)
+    last_page = min(num_pages, total_pages) if total_pages else num_pages
+
+    queue = asyncio.Queue()
+    for page in range(1, last_page + 1):
+        if page not in pages:
+            queue.put_nowait(page)
+
+    async def worker():
+        while True:
+            try:
+                page = queue.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+            try:
+                data = await client.get_json(path, page=page)
+            except FetchError as e:
+                print(f"!!! Error fetching {content_type} page {page}: {e}")
+                failed.append(page)
+                continue
+            pages[page] = data.get('results', [])
+            checkpoint.record(page, pages[page], data.get('total_pages', total_pages))
+            print(f"Fetched {content_type} page {page}/{last_page} ({len(pages)} done).")
+
+    await asyncio.gather(*(worker() for _ in range(client.concurrency)))
+    return pages, sorted(failed)
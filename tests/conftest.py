@@ -0,0 +1,55 @@
+import importlib
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+WEBAPP_DIR = os.path.join(ROOT, 'webapp')
+# The app and scripts import their modules flat, as when run from their own directories
+sys.path[:0] = [WEBAPP_DIR, os.path.join(ROOT, 'scripts')]
+
+from catalog_frame import compact_catalog  # noqa: E402
+from pipeline import build_engine, read_catalog  # noqa: E402
+from synth_catalog import write_synthetic  # noqa: E402
+
+CATALOG_ROWS = 800
+
+
+@pytest.fixture(scope='session')
+def catalog_csv(tmp_path_factory):
+    """A seeded synthetic catalog written as CSV, as fetch_data.py would."""
+    path = str(tmp_path_factory.mktemp('data') / 'content_raw.csv')
+    write_synthetic(CATALOG_ROWS, path, 'csv', seed=0)
+    return path
+
+
+@pytest.fixture(scope='session')
+def catalog_df(catalog_csv):
+    """The catalog as the app holds it: cleaned, with `tags`, compact dtypes."""
+    return compact_catalog(read_catalog(catalog_csv))
+
+
+@pytest.fixture(scope='session')
+def fitted(catalog_df):
+    """(vectorizer, SimilarityEngine) fitted on `catalog_df`."""
+    return build_engine(catalog_df, 5000)
+
+
+@pytest.fixture(scope='session')
+def app_module(catalog_csv):
+    """The web app, loaded from the synthetic catalog with reloads and log output off."""
+    os.environ.update(DATA_PATH=catalog_csv, RELOAD_POLL_SECONDS='0', LOG_LEVEL='CRITICAL')
+    cwd = os.getcwd()
+    os.chdir(WEBAPP_DIR) # Static files and templates are resolved relative to the app
+    try:
+        yield importlib.import_module('app')
+    finally:
+        os.chdir(cwd)
+
+
+@pytest.fixture
+def client(app_module):
+    from fastapi.testclient import TestClient
+    with TestClient(app_module.app, raise_server_exceptions=False) as client:
+        yield client
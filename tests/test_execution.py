@@ -0,0 +1,135 @@
+import asyncio
+
+import pytest
+
+from batching import MicroBatcher
+from execution import ConcurrencyLimiter, Overloaded
+
+
+async def run_inline(fn, items):
+    return fn(items)
+
+
+async def settle():
+    """Lets started tasks run until they block (on a slot, an event, ...)."""
+    for _ in range(10):
+        await asyncio.sleep(0)
+
+
+# --- ConcurrencyLimiter ---
+def test_limiter_sheds_when_queue_full():
+    async def scenario():
+        limiter = ConcurrencyLimiter('test', limit=1, max_queue=1, timeout=1.0)
+        release = asyncio.Event()
+
+        async def hold():
+            async with limiter.slot():
+                await release.wait()
+
+        holder = asyncio.ensure_future(hold())
+        waiter = asyncio.ensure_future(hold())
+        try:
+            await settle()
+            assert limiter.in_flight == 1 and limiter.waiting == 1
+            with pytest.raises(Overloaded, match='queue full'):
+                async with limiter.slot():
+                    pass
+        finally:
+            release.set()
+            await asyncio.gather(holder, waiter)
+        return limiter.stats()
+
+    stats = asyncio.run(scenario())
+    assert stats['admitted'] == 2 and stats['shed'] == 1 and stats['in_flight'] == 0
+
+
+def test_limiter_sheds_after_timeout():
+    async def scenario():
+        limiter = ConcurrencyLimiter('test', limit=1, max_queue=4, timeout=0.01)
+        release = asyncio.Event()
+
+        async def hold():
+            async with limiter.slot():
+                await release.wait()
+
+        holder = asyncio.ensure_future(hold())
+        try:
+            await settle()
+            with pytest.raises(Overloaded, match='no slot within'):
+                async with limiter.slot():
+                    pass
+            assert limiter.waiting == 0 # The timed-out request left the queue
+        finally:
+            release.set()
+            await holder
+        # The slot is free again
+        async with limiter.slot():
+            pass
+        return limiter.stats()
+
+    stats = asyncio.run(scenario())
+    assert stats['shed'] == 1 and stats['admitted'] == 2
+
+
+# --- MicroBatcher ---
+def test_batcher_coalesces_while_busy():
+    async def scenario():
+        batches = []
+        gate = asyncio.Event()
+
+        async def run(handler, items):
+            await gate.wait()
+            return handler(items)
+
+        def handler(items):
+            batches.append(list(items))
+            return [item * 10 for item in items]
+
+        batcher = MicroBatcher(handler, run, window=1.0, max_batch=3, max_in_flight=1)
+        first = asyncio.ensure_future(batcher.submit(0)) # Idle: dispatched at once
+        await settle()
+        rest = [asyncio.ensure_future(batcher.submit(i)) for i in range(1, 4)] # max_batch reached: flushed
+        await settle()
+        gate.set()
+        return await asyncio.gather(first, *rest), batches, batcher.stats()
+
+    results, batches, stats = asyncio.run(scenario())
+    assert results == [0, 10, 20, 30]
+    assert sorted(batches) == [[0], [1, 2, 3]]
+    assert stats['batches'] == 2 and stats['items'] == 4
+
+
+def test_batcher_errors_reach_only_their_caller():
+    async def scenario():
+        def handler(items):
+            return [ValueError(item) if item < 0 else item for item in items]
+
+        batcher = MicroBatcher(handler, run_inline, window=0)
+        return await asyncio.gather(batcher.submit(1), batcher.submit(-1), return_exceptions=True)
+
+    ok, error = asyncio.run(scenario())
+    assert ok == 1 and isinstance(error, ValueError)
+
+
+def test_batcher_handler_failure_fails_the_batch():
+    async def scenario():
+        def handler(items):
+            raise RuntimeError('scoring failed')
+
+        batcher = MicroBatcher(handler, run_inline, window=0)
+        return await asyncio.gather(batcher.submit(1), batcher.submit(2), return_exceptions=True)
+
+    assert all(isinstance(result, RuntimeError) for result in asyncio.run(scenario()))
+
+
+# --- Endpoints ---
+@pytest.mark.parametrize('limit, max_queue, reason', [(0, 0, 'queue full'), (0, 4, 'no slot')])
+def test_overloaded_endpoint_is_503(app_module, client, monkeypatch, limit, max_queue, reason):
+    monkeypatch.setitem(app_module.limiters, 'recommend', ConcurrencyLimiter('recommend', limit, max_queue, 0.01))
+    monkeypatch.setitem(app_module.limiters, 'search', ConcurrencyLimiter('search', limit, max_queue, 0.01))
+    app_module.response_cache.clear()
+    title = app_module.catalog.current.catalog.title(0)
+    for response in (client.get(f'/recommend/{title}'), client.get('/search', params={'query': title})):
+        assert response.status_code == 503
+        assert response.headers['Retry-After'] == '1'
+        assert reason in response.json()['detail']
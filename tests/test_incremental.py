@@ -0,0 +1,71 @@
+import numpy as np
+import pandas as pd
+
+from catalog_frame import compact_catalog
+from incremental import diff_catalogs, update_engine
+from similarity import compute_neighbours
+
+K = 10
+
+
+def engine_with_neighbours(fitted):
+    vectorizer, engine = fitted
+    fresh = type(engine)(engine.matrix)
+    fresh.attach_neighbours(*compute_neighbours(fresh, K))
+    return vectorizer, fresh
+
+
+def edited_catalog(df, rng):
+    """`df` with rows removed, overviews rewritten, popularity changed and new rows appended."""
+    new = df.copy()
+    new = new.drop(index=rng.choice(len(new), size=25, replace=False))
+    rewritten = rng.choice(new.index, size=20, replace=False)
+    donors = rng.choice(new.index, size=20, replace=False)
+    new.loc[rewritten, 'overview'] = new.loc[donors, 'overview'].to_numpy()
+    new.loc[rewritten, 'tags'] = new.loc[donors, 'tags'].to_numpy()
+    new.loc[rng.choice(new.index, size=30, replace=False), 'popularity'] *= 2
+    added = df.sample(30, random_state=1).copy()
+    added['id'] += int(df['id'].max()) + 1
+    added['tags'] = added['tags'].to_numpy()[rng.permutation(len(added))]
+    return compact_catalog(pd.concat([new, added], ignore_index=True))
+
+
+def test_diff_counts(catalog_df):
+    new = edited_catalog(catalog_df, np.random.default_rng(0))
+    diff = diff_catalogs(catalog_df, new)
+    assert diff.removed == 25
+    assert diff.added == 30
+    assert diff.text_changed <= 20 # A donor overview may equal the one it replaces
+    assert len(diff.df) == len(new)
+    # Surviving rows keep their old relative order, new rows come last
+    survived = diff.sources[diff.sources >= 0]
+    assert np.all(np.diff(survived) > 0)
+    assert np.all(diff.sources[-30:] == -1)
+
+
+def test_patched_neighbours_match_exact_rebuild(catalog_df, fitted):
+    vectorizer, engine = engine_with_neighbours(fitted)
+    diff = diff_catalogs(catalog_df, edited_catalog(catalog_df, np.random.default_rng(0)))
+    patched = update_engine(engine, vectorizer, diff)
+
+    # Same vectors as transforming the new catalog from scratch with the old vocabulary
+    expected = vectorizer.transform(diff.df['tags'])
+    expected = type(engine)(expected)
+    assert abs(patched.matrix - expected.matrix).max() < 1e-6
+
+    neighbours, scores = compute_neighbours(patched, K)
+    np.testing.assert_allclose(patched.neighbour_scores, scores, atol=1e-6)
+    # Lists may only differ where items with equal scores tie for a slot
+    for row, slot in np.argwhere(patched.neighbours != neighbours):
+        exact = patched.scores_batch([row])[0]
+        assert np.isclose(exact[patched.neighbours[row, slot]], scores[row, slot], atol=1e-6)
+
+
+def test_metadata_only_change_keeps_engine(catalog_df, fitted):
+    vectorizer, engine = engine_with_neighbours(fitted)
+    new = catalog_df.copy()
+    new['popularity'] = new['popularity'] + 1
+    diff = diff_catalogs(catalog_df, new)
+    assert diff.vectors_unchanged and diff.metadata_changed == len(new)
+    assert update_engine(engine, vectorizer, diff) is engine
+
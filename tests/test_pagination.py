@@ -0,0 +1,75 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from catalog_index import build_popularity_views
+
+
+def walk(view, limit, use_cursor):
+    """Every row of `view`, page by page, following `next_cursor` or `skip`."""
+    rows, cursor, skip = [], None, 0
+    while True:
+        page, cursor = view.page(skip, limit, cursor if use_cursor else None)
+        rows.extend(page.tolist())
+        skip += limit
+        if cursor is None:
+            return rows
+
+
+def test_cursor_walk_matches_popularity_order(catalog_df):
+    order, views = build_popularity_views(catalog_df)
+    expected = catalog_df.sort_values(['popularity', 'id'], ascending=[False, True], kind='stable').index.tolist()
+    assert walk(views['all'], 7, use_cursor=True) == expected
+    assert walk(views['all'], 7, use_cursor=False) == expected
+    for name in ('movie', 'tv'):
+        rows = walk(views[name], 11, use_cursor=True)
+        assert rows == [r for r in expected if catalog_df['type'].iloc[r] == name]
+
+
+def test_cursor_survives_reload_with_new_items():
+    df = pd.DataFrame({'id': np.arange(10), 'popularity': np.arange(10, 0, -1, dtype=np.float32), 'type': 'movie'})
+    _, views = build_popularity_views(df)
+    first, cursor = views['all'].page(0, 4)
+    assert first.tolist() == [0, 1, 2, 3]
+
+    # A reload adds items before and after the cursor's key and removes one after it
+    reloaded = pd.concat([df[df['id'] != 5], pd.DataFrame({'id': [100, 101], 'popularity': np.float32([50.0, 6.5]),
+                                                            'type': 'movie'})], ignore_index=True)
+    _, views = build_popularity_views(reloaded)
+    rows, _ = views['all'].page(0, 4, cursor)
+    assert reloaded['id'].iloc[rows].tolist() == [101, 4, 6, 7]
+
+
+def test_ties_are_ordered_by_id():
+    df = pd.DataFrame({'id': [9, 3, 7, 1], 'popularity': np.float32([2.0, 2.0, 2.0, 2.0]), 'type': 'tv'})
+    _, views = build_popularity_views(df)
+    assert df['id'].iloc[walk(views['tv'], 1, use_cursor=True)].tolist() == [1, 3, 7, 9]
+
+
+@pytest.mark.parametrize('cursor', ['garbage', '1.5', 'abc:12', '1.5:x'])
+def test_malformed_cursor_raises(catalog_df, cursor):
+    _, views = build_popularity_views(catalog_df)
+    with pytest.raises(ValueError):
+        views['all'].page(0, 10, cursor)
+
+
+@pytest.mark.parametrize('path', ['/all', '/api/movies', '/api/shows', '/popular', '/genre/Drama'])
+def test_bad_cursor_is_400(client, path):
+    response = client.get(path, params={'cursor': 'garbage'})
+    assert response.status_code == 400
+    # A current ETag must not turn the error into a 304
+    etag = client.get('/popular').headers['etag']
+    assert client.get(path, params={'cursor': 'garbage'}, headers={'If-None-Match': etag}).status_code == 400
+
+
+def test_endpoint_cursor_pages_are_contiguous(client):
+    first = client.get('/all', params={'limit': 5}).json()
+    second = client.get('/all', params={'limit': 5, 'cursor': first['next_cursor']}).json()
+    by_skip = client.get('/all', params={'limit': 10}).json()
+    ids = [item['id'] for item in first['results'] + second['results']]
+    assert ids == [item['id'] for item in by_skip['results']]
+
+
+@pytest.mark.parametrize('params', [{'skip': 10 ** 20}, {'limit': 10 ** 20}, {'limit': 101}])
+def test_out_of_range_paging_is_422(client, params):
+    assert client.get('/all', params=params).status_code == 422
@@ -0,0 +1,120 @@
+import numpy as np
+import pytest
+
+from profiles import EXACT_REBUILD_UPDATES, ProfileStore, build_profile, decay_factor, update_profile
+
+HALF_LIFE = 4.0
+
+
+@pytest.fixture(scope='module')
+def engine(fitted):
+    return fitted[1]
+
+
+@pytest.fixture(scope='module')
+def item_row(catalog_df):
+    rows = {(str(t), int(i)): row for row, (t, i) in enumerate(zip(catalog_df['type'], catalog_df['id']))}
+    return rows.get
+
+
+@pytest.fixture(scope='module')
+def keys(catalog_df):
+    return [(str(t), int(i)) for t, i in zip(catalog_df['type'][:12], catalog_df['id'][:12])]
+
+
+def exact_vector(engine, state):
+    """sum(decay ** age * item vector), summed from scratch."""
+    decay = decay_factor(state.half_life)
+    vector = np.zeros(engine.matrix.shape[1], dtype=np.float64)
+    for key, age in state.ages.items():
+        vector += decay ** age * engine.item_vectors([state.rows[key]])[0]
+    return vector
+
+
+def test_build_orders_by_recency(engine, item_row, keys):
+    state = build_profile(engine, 'v1', keys[:4], HALF_LIFE, item_row)
+    assert state.ages == {key: age for age, key in enumerate(keys[:4])}
+    np.testing.assert_allclose(state.vector, exact_vector(engine, state), atol=1e-5)
+
+
+def test_add_matches_build(engine, item_row, keys):
+    state = build_profile(engine, 'v1', keys[:4], HALF_LIFE, item_row)
+    state = update_profile(state, engine, 'v1', keys[4:6], [], item_row)
+    rebuilt = build_profile(engine, 'v1', keys[4:6] + keys[:4], HALF_LIFE, item_row)
+    assert state.ages == rebuilt.ages
+    assert state.updates == 1
+    np.testing.assert_allclose(state.vector, rebuilt.vector, atol=1e-5)
+
+
+def test_remove_and_readd(engine, item_row, keys):
+    state = build_profile(engine, 'v1', keys[:5], HALF_LIFE, item_row)
+    state = update_profile(state, engine, 'v1', [], [keys[1], keys[3]], item_row)
+    assert set(state.ages) == {keys[0], keys[2], keys[4]}
+    assert state.ages[keys[4]] == 4 # Removals do not change the others' ages
+    np.testing.assert_allclose(state.vector, exact_vector(engine, state), atol=1e-5)
+
+    # Re-adding an item already present moves it to the front
+    state = update_profile(state, engine, 'v1', [keys[4]], [], item_row)
+    assert state.ages[keys[4]] == 0 and state.ages[keys[0]] == 1
+    np.testing.assert_allclose(state.vector, exact_vector(engine, state), atol=1e-5)
+
+
+def test_unknown_keys_are_dropped(engine, item_row, keys):
+    unknown = ('movie', -1)
+    state = build_profile(engine, 'v1', [unknown] + keys[:2], HALF_LIFE, item_row)
+    assert len(state) == 2 and unknown not in state.ages
+    state = update_profile(state, engine, 'v1', [unknown], [], item_row)
+    assert len(state) == 2 and unknown not in state.ages
+
+
+def test_exact_resum_after_many_deltas(engine, item_row, keys):
+    state = build_profile(engine, 'v1', keys[:3], HALF_LIFE, item_row)
+    for i in range(EXACT_REBUILD_UPDATES - 1):
+        state = update_profile(state, engine, 'v1', [keys[3 + i % 9]], [], item_row)
+    assert state.updates == EXACT_REBUILD_UPDATES - 1
+    state = update_profile(state, engine, 'v1', [keys[0]], [], item_row)
+    assert state.updates == 0
+    np.testing.assert_allclose(state.vector, exact_vector(engine, state), atol=1e-5)
+
+
+def test_new_snapshot_drops_items_gone_from_catalog(engine, item_row, keys):
+    state = build_profile(engine, 'v1', keys[:4], HALF_LIFE, item_row)
+    gone = keys[2]
+    state = update_profile(state, engine, 'v2', [], [], lambda key: None if key == gone else item_row(key))
+    assert state.version == 'v2' and gone not in state.ages and state.updates == 0
+    np.testing.assert_allclose(state.vector, exact_vector(engine, state), atol=1e-5)
+
+
+def test_store_tokens_lru_and_ttl(engine, item_row, keys):
+    now = [0.0]
+    store = ProfileStore(max_entries=2, ttl=10.0, clock=lambda: now[0])
+    a, b, c = (build_profile(engine, 'v1', [key], HALF_LIFE, item_row) for key in keys[:3])
+    first, second = store.put(a), store.put(b)
+    assert first != second and store.get(first) is a
+    store.put(c) # Evicts `second`, the least recently used
+    assert store.get(second) is None and store.get(first) is a
+    now[0] = 11.0
+    assert store.get(first) is None
+    stats = store.stats()
+    assert stats['evictions'] == 1 and stats['expirations'] == 1 and stats['entries'] == 1
+
+
+def test_profile_endpoint_deltas(client, keys):
+    items = [{'type': t, 'id': i} for t, i in keys[:3]]
+    first = client.post('/recommend/profile', json={'items': items + [{'type': 'movie', 'id': -1}], 'top_n': 5})
+    assert first.status_code == 200
+    body = first.json()
+    assert body['items'] == 3 and body['not_found'] == [{'type': 'movie', 'id': -1}]
+    assert len(body['recommendations']) == 5
+
+    added = {'type': keys[3][0], 'id': keys[3][1]}
+    updated = client.post('/recommend/profile', json={'profile_token': body['profile_token'], 'added': [added],
+                                                       'top_n': 5}).json()
+    assert updated['items'] == 4 and updated['profile_token'] != body['profile_token']
+    # Adding gives the same recommendations as sending the resulting list in full
+    full = client.post('/recommend/profile', json={'items': [added] + items, 'top_n': 5}).json()
+    assert [r['id'] for r in updated['recommendations']] == [r['id'] for r in full['recommendations']]
+
+    removed = client.post('/recommend/profile', json={'profile_token': updated['profile_token'],
+                                                       'removed': items[:2], 'top_n': 5}).json()
+    assert removed['items'] == 2
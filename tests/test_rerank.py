@@ -0,0 +1,81 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from catalog_index import build_genre_index, build_popularity_views
+from rerank import ItemFeatures, RerankOptions, minmax, mmr, rerank
+
+
+class PoolEngine:
+    """Engine stand-in with a fixed item-item similarity matrix."""
+
+    def __init__(self, similarity):
+        self.similarity = np.asarray(similarity, dtype=np.float32)
+
+    def pool_similarity(self, rows):
+        block = self.similarity[np.ix_(rows, rows)]
+        return lambda i: block[i]
+
+
+@pytest.fixture
+def features():
+    df = pd.DataFrame({
+        'id': [1, 2, 3, 4],
+        'popularity': [10.0, 20.0, 30.0, 40.0],
+        'vote_average': [7.0, 7.0, 7.0, 7.0],
+        'vote_count': [100, 100, 100, 100],
+        'type': ['movie', 'tv', 'movie', 'tv'],
+        'genre_names': ['Drama', 'Drama, Crime', 'Comedy', 'Crime'],
+    })
+    order, _ = build_popularity_views(df)
+    return ItemFeatures(df, build_genre_index(df, order))
+
+
+def test_minmax():
+    np.testing.assert_allclose(minmax([0.04, 0.13, 0.085]), [0.0, 1.0, 0.5], atol=1e-6)
+    np.testing.assert_array_equal(minmax([0.2, 0.2]), [1.0, 1.0])
+    assert len(minmax([])) == 0
+
+
+def test_prior_weight_is_a_share_of_the_score(features):
+    engine = PoolEngine(np.eye(4))
+    candidates, scores = np.arange(4), np.float32([0.13, 0.11, 0.09, 0.04]) # A narrow cosine band
+    features.prior = np.float32([0.0, 0.3, 0.6, 1.0]) # Prior favours the least similar items
+
+    order, _ = rerank(engine, features, candidates, scores, 4, RerankOptions(prior_weight=0.1))
+    assert order.tolist() == [0, 1, 2, 3] # 10% of the score cannot overturn the similarity order
+    order, _ = rerank(engine, features, candidates, scores, 4, RerankOptions(prior_weight=1.0))
+    assert order.tolist() == [3, 2, 1, 0]
+    # Half and half: normalised similarity [1, .78, .56, 0] plus the prior gives [.5, .54, .58, .5]; ties keep retrieval order
+    order, relevance = rerank(engine, features, candidates, scores, 4, RerankOptions(prior_weight=0.5))
+    assert order.tolist() == [2, 1, 0, 3]
+    np.testing.assert_allclose(relevance, np.sort(relevance)[::-1])
+
+
+def test_diversity_does_not_promote_unrelated_items(features):
+    # 0 and 1 are related sequels (similarity 0.3); 2 shares nothing with either
+    similarity = [[1.0, 0.3, 0.0, 0.0], [0.3, 1.0, 0.0, 0.0], [0.0, 0.0, 1.0, 0.0], [0.0, 0.0, 0.0, 1.0]]
+    engine = PoolEngine(similarity)
+    candidates, scores = np.arange(3), np.float32([0.13, 0.10, 0.036])
+    order, _ = rerank(engine, features, candidates, scores, 2, RerankOptions(diversity=0.5))
+    assert order.tolist() == [0, 1]
+
+
+def test_diversity_skips_near_duplicates():
+    similarity = np.float32([[1.0, 0.95, 0.05], [0.95, 1.0, 0.05], [0.05, 0.05, 1.0]])
+    relevance = np.float32([1.0, 0.95, 0.7])
+    assert mmr(relevance, lambda i: similarity[i], 2, 0.0).tolist() == [0, 1]
+    assert mmr(relevance, lambda i: similarity[i], 2, 0.5).tolist() == [0, 2]
+
+
+@pytest.mark.parametrize('options, expected', [
+    (RerankOptions(content_type='tv'), [1, 3]),
+    (RerankOptions(genres=('drama', 'crime')), [0, 1, 3]),
+    (RerankOptions(genres=('drama', 'crime'), mode='all'), [1]),
+    (RerankOptions(content_type='movie', genres=('crime',)), []),
+    (RerankOptions(genres=('western',)), []),
+])
+def test_constraints(features, options, expected):
+    engine = PoolEngine(np.eye(4))
+    order, _ = rerank(engine, features, np.arange(4), np.float32([0.4, 0.3, 0.2, 0.1]), 4, options)
+    assert order.tolist() == expected
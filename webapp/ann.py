@@ -0,0 +1,152 @@
+import numpy as np
+import scipy.sparse as sp
+from sklearn.preprocessing import normalize
+
+BUILD_CHUNK = 65536 # Rows projected per chunk while building, bounding the dense temporaries
+KMEANS_SAMPLE = 50000 # Rows the IVF centroids are trained on
+
+
+def random_projection(n_features, dims, seed=0):
+    """Gaussian (n_features, dims) projection matrix for reducing sparse TF-IDF rows."""
+    return np.random.default_rng(seed).standard_normal((n_features, dims)).astype(np.float32)
+
+
+def _project(matrix, projection):
+    """Dense `matrix @ projection` computed in row chunks."""
+    out = np.empty((matrix.shape[0], projection.shape[1]), dtype=np.float32)
+    for start in range(0, matrix.shape[0], BUILD_CHUNK):
+        out[start:start + BUILD_CHUNK] = matrix[start:start + BUILD_CHUNK] @ projection
+    return out
+
+
+def _dense(block):
+    return block.toarray().astype(np.float32) if sp.issparse(block) else np.asarray(block, dtype=np.float32)
+
+
+def _postings(keys):
+    """Groups rows by key: (sorted unique keys, CSR offsets, rows ordered by key)."""
+    rows = np.argsort(keys, kind='stable')
+    unique_keys, offsets = np.unique(keys[rows], return_index=True)
+    return unique_keys, np.append(offsets, len(keys)), rows
+
+
+# --- Random-Projection LSH ---
+class LSHIndex:
+    """
+    Sign-random-projection LSH over the TF-IDF rows (SimHash).
+
+    Each of `tables` hash tables keys an item by the signs of `bits` random
+    projections, so items at a small angle tend to share a bucket. A query
+    collects the items of its own bucket in every table, plus `probes` more
+    buckets per table reached by flipping its least certain bits
+    (multi-probe). More tables or probes raise recall; more bits shrink the
+    buckets and cut the candidate count (and latency).
+    """
+
+    def __init__(self, matrix, tables=16, bits=12, probes=4, seed=0):
+        self.tables, self.bits, self.probes = tables, bits, probes
+        self.projection = random_projection(matrix.shape[1], tables * bits, seed)
+        self._weights = np.left_shift(np.int64(1), np.arange(bits, dtype=np.int64))
+
+        self.buckets = []
+        keys = np.empty((matrix.shape[0], tables), dtype=np.int64)
+        for start in range(0, matrix.shape[0], BUILD_CHUNK):
+            chunk = matrix[start:start + BUILD_CHUNK] @ self.projection
+            keys[start:start + BUILD_CHUNK] = self._keys(chunk.reshape(len(chunk), tables, bits) > 0)
+        for t in range(tables):
+            self.buckets.append(_postings(keys[:, t]))
+
+    def _keys(self, signs):
+        return (signs.astype(np.int64) * self._weights).sum(axis=-1)
+
+    @property
+    def nbytes(self):
+        return self.projection.nbytes + sum(a.nbytes for bucket in self.buckets for a in bucket)
+
+    def candidates(self, query):
+        """Positions of items sharing a (probed) bucket with the 1-row sparse `query`."""
+        projected = np.asarray(query @ self.projection).reshape(self.tables, self.bits)
+        keys = self._keys(projected > 0)
+        found = []
+        for t, (bucket_keys, offsets, rows) in enumerate(self.buckets):
+            probe_keys = [keys[t]]
+            # Multi-probe: neighbouring buckets across the bits closest to their hyperplane
+            for bit in np.argsort(np.abs(projected[t]))[:self.probes]:
+                probe_keys.append(keys[t] ^ self._weights[bit])
+            positions = np.searchsorted(bucket_keys, probe_keys)
+            for key, p in zip(probe_keys, positions):
+                if p < len(bucket_keys) and bucket_keys[p] == key:
+                    found.append(rows[offsets[p]:offsets[p + 1]])
+        return np.unique(np.concatenate(found)) if found else np.empty(0, dtype=np.intp)
+
+
+# --- Inverted-File (IVF) Index ---
+class IVFIndex:
+    """
+    Clustered (IVF) index over the TF-IDF rows.
+
+    Spherical k-means splits the items into `lists` clusters and each item
+    is filed under its nearest centroid. A query scans the items of its
+    `probes` nearest clusters: more probes raise recall at a linear cost in
+    latency. Clustering runs in the sparse TF-IDF space by default; with
+    `dims` > 0 the rows are first reduced by random projection, which is
+    cheaper to build but loses recall on short texts.
+    """
+
+    def __init__(self, matrix, lists=0, probes=32, dims=0, iterations=10, seed=0):
+        n_items = matrix.shape[0]
+        self.lists = max(1, min(lists or int(np.sqrt(n_items)), n_items))
+        self.probes = probes
+        self.projection = random_projection(matrix.shape[1], dims, seed) if dims else None
+        vectors = normalize(_project(matrix, self.projection), copy=False) if dims else matrix
+
+        rng = np.random.default_rng(seed)
+        sample = vectors[rng.choice(n_items, size=min(n_items, KMEANS_SAMPLE), replace=False)]
+        self._set_centroids(_dense(sample[rng.choice(sample.shape[0], size=self.lists, replace=False)]))
+        for _ in range(iterations):
+            assignment = self._nearest(sample)
+            members = sp.csr_matrix((np.ones(len(assignment), dtype=np.float32), (assignment, np.arange(len(assignment)))),
+                                    shape=(self.lists, sample.shape[0]))
+            sums = _dense(members @ sample)
+            empty = ~sums.any(axis=1)
+            self._set_centroids(normalize(np.where(empty[:, None], self.centroids, sums), copy=False))
+
+        assignment = np.concatenate([self._nearest(vectors[s:s + BUILD_CHUNK]) for s in range(0, n_items, BUILD_CHUNK)])
+        self.list_ids, self.offsets, self.rows = _postings(assignment)
+
+    def _set_centroids(self, centroids):
+        self.centroids = centroids
+        # Sparse @ dense is far faster against a C-contiguous right-hand side than a transposed view
+        self.centroids_t = np.ascontiguousarray(centroids.T)
+
+    def _nearest(self, vectors):
+        return np.asarray(np.argmax(vectors @ self.centroids_t, axis=1)).ravel()
+
+    @property
+    def nbytes(self):
+        arrays = [self.centroids, self.centroids_t, self.list_ids, self.offsets, self.rows]
+        if self.projection is not None:
+            arrays.append(self.projection)
+        return sum(a.nbytes for a in arrays)
+
+    def candidates(self, query):
+        """Positions (unsorted) of the items filed under the `probes` clusters nearest to the 1-row sparse `query`."""
+        if self.projection is not None:
+            query = query @ self.projection
+        nearest = np.argsort(-np.asarray(query @ self.centroids_t).ravel())[:self.probes]
+        positions = np.searchsorted(self.list_ids, nearest)
+        found = [self.rows[self.offsets[p]:self.offsets[p + 1]]
+                 for p, c in zip(positions, nearest) if p < len(self.list_ids) and self.list_ids[p] == c]
+        return np.concatenate(found) if found else np.empty(0, dtype=np.intp)
+
+
+ANN_BACKENDS = {'lsh': LSHIndex, 'ivf': IVFIndex}
+
+
+def build_ann_index(matrix, backend, **params):
+    """Builds the `backend` ('lsh' or 'ivf') index over the engine's normalised matrix; None for 'exact'."""
+    if backend == 'exact':
+        return None
+    if backend not in ANN_BACKENDS:
+        raise ValueError(f"Unknown neighbour backend {backend!r}; expected 'exact', 'lsh' or 'ivf'.")
+    return ANN_BACKENDS[backend](matrix, **params)
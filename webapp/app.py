@@ -1,75 +1,174 @@
+import inspect
+import logging
+
+import numpy as np
 import pandas as pd
-from fastapi import FastAPI, HTTPException, Request
+from fastapi import FastAPI, HTTPException, Query, Request
 from fastapi.templating import Jinja2Templates
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import HTMLResponse
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
-import os
-from typing import Optional # Import Optional
-
-# --- Configuration & Data Loading --- 
-DATA_PATH = "../data/content_raw.csv" # Path relative to app.py
-MAX_FEATURES = 5000 # For TF-IDF Vectorizer
-
-def load_and_prepare_data(path):
-    """Loads data, performs basic cleaning and TF-IDF calculation."""
-    if not os.path.exists(path):
-        raise FileNotFoundError(f"Data file not found at: {path}. Run the data fetching script first.")
-
-    print(f"Loading data from {path}...")
-    df = pd.read_csv(path)
-
-    # --- Basic Preprocessing (simplified version from notebook) ---
-    # Drop potential duplicates based on id and type
-    df = df.drop_duplicates(subset=['id', 'type'], keep='first')
-    # Drop rows with critical missing info
-    df.dropna(subset=['overview', 'genre_names', 'title'], inplace=True)
-    # Convert columns safely
-    for col in ['overview', 'genre_names', 'title', 'poster_path']: # Added poster_path
-        if col in df.columns:
-             df[col] = df[col].astype(str).fillna('') # Ensure string and fillna
-
-    # Combine features for TF-IDF
-    df['tags'] = df['overview'].str.lower() + ' ' + \
-                   df['genre_names'].str.replace(',', ' ').str.lower() + ' ' + \
-                   df['title'].str.lower()
-    df['tags'] = df['tags'].str.split().str.join(' ')
-    df['tags'] = df['tags'].fillna('')
-
-    # --- TF-IDF Calculation ---
-    print("Calculating TF-IDF matrix...")
-    tfidf_vectorizer = TfidfVectorizer(stop_words='english', max_features=MAX_FEATURES)
-    tfidf_matrix = tfidf_vectorizer.fit_transform(df['tags'])
-    print("TF-IDF calculation complete.")
-
-    # --- Cosine Similarity Calculation ---
-    print("Calculating Cosine Similarity matrix...")
-    cosine_sim = cosine_similarity(tfidf_matrix, tfidf_matrix)
-    print("Cosine Similarity calculation complete.")
-
-    # Reset index for mapping
-    df_indexed = df.reset_index(drop=True) # drop=True prevents old index becoming a column
-    indices_map = pd.Series(df_indexed.index, index=df_indexed['title'])
-
-    print("Data loading and preparation finished.")
-    return df_indexed, cosine_sim, indices_map
+from fastapi.responses import HTMLResponse, JSONResponse, PlainTextResponse, Response
+from typing import List, Optional # Import Optional
+from pydantic import BaseModel, conint
+from ann import build_ann_index
+from artifact import artifact_key, find_artifact, load_artifact
+from batching import MicroBatcher
+from catalog_frame import CatalogFrame, compact_catalog
+from catalog_index import build_genre_index, build_item_index, build_popularity_views
+from config import (
+    ADMIN_TOKEN, ANN_PARAMS, BUILD_WORKERS, DATA_PATH, EMBEDDING_DIMS, ENDPOINT_LIMITS, INCREMENTAL_REFIT_DRIFT,
+    INDEX_DIR, HTTP_CACHE_MAX_AGE, LOG_LEVEL, MAX_BATCH_SEEDS, MAX_BULK_ITEMS, MAX_FEATURES, MAX_PROFILE_ITEMS,
+    MAX_PAGE_SIZE, MAX_TOP_N, NEIGHBOUR_BACKEND, NEIGHBOURS_K, PROFILE_STORE_ENTRIES, PROFILE_TTL, PROFILING_ENABLED, QUEUE_TIMEOUT, RECOMMEND_BATCH_MAX, RECOMMEND_BATCH_WINDOW_MS, RELOAD_POLL_SECONDS,
+    RERANK_DIVERSITY, RERANK_POOL, RERANK_PRIOR_WEIGHT, RESPONSE_CACHE_ENTRIES, RESPONSE_CACHE_TTL, SCORING_WORKERS,
+)
+from execution import ConcurrencyLimiter, Overloaded, ScoringExecutor
+from incremental import incremental_update
+from log_config import configure_logging
+from metrics import REGISTRY, MetricsMiddleware, build_stage, collect_build_timings, timed
+from payloads import ItemPayloads, RawJSONResponse, dumps, json_response, render, render_list
+from pipeline import build_engine, index_params, read_catalog
+from response_cache import ResponseCache, etag_matches
+from profiler import folded, sample_stacks
+from profiles import ProfileStore, build_profile, update_profile
+from rerank import ItemFeatures, RerankOptions, rerank
+from search_index import TitleSearchIndex
+from similarity import top_k
+from snapshot import CatalogManager, CatalogSnapshot, file_signature
+
+# Log records are written by a background thread, never on the request path
+configure_logging(LOG_LEVEL)
+log = logging.getLogger(__name__)
+
+# --- Helper Function to Get Poster URL ---
+def get_poster_url(path, size="w300"):
+    base_url = "https://image.tmdb.org/t/p/"
+    if pd.isna(path) or path == '':
+        # Return path to our static placeholder
+        return "/static/placeholder.png" 
+    return f"{base_url}{size}{path}"
+
+# --- Data Loading ---
+def load_and_prepare_data(path, previous=None):
+    """
+    Loads data and performs basic cleaning, then loads the prebuilt similarity
+    index for this exact data file if one exists (see scripts/build_index.py).
+    Otherwise, on a reload, the new file is applied incrementally on top of
+    the `previous` snapshot (see incremental.py), and failing that TF-IDF is
+    fitted in-process. Returns a new CatalogSnapshot; the seconds spent in
+    each build stage are reported in its `update['timings']`.
+    """
+    with collect_build_timings() as timings:
+        signature = file_signature(path)
+        df_indexed = read_catalog(path)
+        with build_stage('compact'):
+            # Compact dtypes from the start, so incremental diffs compare like with like
+            df_indexed = compact_catalog(df_indexed)
+        version = artifact_key(path, index_params(MAX_FEATURES, NEIGHBOURS_K, EMBEDDING_DIMS))
+
+        engine = vectorizer = update = None
+        drift, lineage = 0.0, ''
+        artifact_path = find_artifact(INDEX_DIR, version)
+        if artifact_path:
+            log.info("Loading prebuilt index from %s...", artifact_path)
+            with build_stage('artifact'):
+                vectorizer, engine, row_ids = load_artifact(artifact_path)
+            if not np.array_equal(row_ids, df_indexed['id'].to_numpy()):
+                log.warning("Prebuilt index rows do not match the catalog; rebuilding in-process.")
+                engine = None
+            else:
+                update = {'mode': 'artifact'}
+        if engine is None and INCREMENTAL_REFIT_DRIFT > 0 and previous is not None and previous.vectorizer is not None:
+            with build_stage('incremental'):
+                result = incremental_update(previous, df_indexed, INCREMENTAL_REFIT_DRIFT)
+            if result is not None:
+                diff, engine, drift = result
+                df_indexed, vectorizer = diff.df, previous.vectorizer
+                update = {'mode': 'incremental', **diff.summary()}
+                lineage = previous.derived_lineage()
+        if engine is None:
+            vectorizer, engine = build_engine(df_indexed, MAX_FEATURES, embedding_dims=EMBEDDING_DIMS, workers=BUILD_WORKERS)
+            update = {'mode': 'full'}
+        if NEIGHBOUR_BACKEND != 'exact' and engine.ann is None:
+            log.info("Building %s neighbour index...", NEIGHBOUR_BACKEND)
+            with build_stage('ann'):
+                engine.attach_ann(build_ann_index(engine.matrix, NEIGHBOUR_BACKEND, **ANN_PARAMS.get(NEIGHBOUR_BACKEND, {})))
+
+        with build_stage('indexes'):
+            # `tags` only feeds the vectorizer; new rows on a reload are re-read from the file
+            df_indexed = df_indexed.drop(columns='tags')
+            catalog_frame = CatalogFrame(df_indexed)
+            items = build_item_index(df_indexed)
+            # Popularity orderings are computed once here; list endpoints only slice them
+            popularity, views = build_popularity_views(df_indexed)
+            genres = build_genre_index(df_indexed, popularity)
+            # Prior, type and genre arrays for re-ranking recommendation candidates
+            features = ItemFeatures(df_indexed, genres)
+            search = TitleSearchIndex(df_indexed['title'], df_indexed['popularity'])
+            # Item JSON (with poster_url resolved) is encoded once per snapshot
+            payloads = ItemPayloads(df_indexed, get_poster_url)
+
+    log.info("Data loading and preparation finished (%s).", timings)
+    return CatalogSnapshot(
+        content_df=df_indexed,
+        engine=engine,
+        catalog=catalog_frame,
+        version=version,
+        source_signature=signature,
+        popularity=popularity,
+        views=views,
+        genres=genres,
+        search=search,
+        payloads=payloads,
+        items=items,
+        features=features,
+        vectorizer=vectorizer,
+        drift=drift,
+        update={**update, 'timings': timings},
+        lineage=lineage,
+    )
 
 # --- Load data ONCE when the application starts ---
+# Later reloads (file watcher or POST /admin/reload) rebuild in the background
+# and swap in a new snapshot; handlers read `catalog.current` once per request.
+catalog = CatalogManager(load_and_prepare_data, DATA_PATH)
 try:
-    content_df, cosine_sim_matrix, indices = load_and_prepare_data(DATA_PATH)
-    print(f"Successfully loaded and processed {len(content_df)} items.")
+    catalog.reload(wait=True)
+    log.info("Successfully loaded and processed %d items.", len(catalog.current.content_df))
 except FileNotFoundError as e:
-    print(f"ERROR: {e}")
-    print("Please ensure 'content_raw.csv' exists in the '../data' directory relative to 'webapp/app.py'.")
+    log.error("%s", e)
+    log.error("Please ensure 'content_raw.csv' exists in the 'data' directory at the project root.")
     # You might want to exit or have fallback logic if data loading fails critically
-    content_df, cosine_sim_matrix, indices = pd.DataFrame(), None, pd.Series() # Empty defaults
+    # The catalog keeps its empty snapshot until a reload succeeds
 except Exception as e:
-    print(f"An unexpected error occurred during data loading: {e}")
-    content_df, cosine_sim_matrix, indices = pd.DataFrame(), None, pd.Series()
+    log.exception("An unexpected error occurred during data loading: %s", e)
+
+if RELOAD_POLL_SECONDS > 0:
+    catalog.watch(RELOAD_POLL_SECONDS)
+
+# Responses of the pure catalog endpoints, dropped whenever a new snapshot goes live
+response_cache = ResponseCache(RESPONSE_CACHE_ENTRIES, RESPONSE_CACHE_TTL)
+catalog.add_listener(lambda snapshot: response_cache.clear())
+
+# Aggregated My List profiles by token, so clients can send deltas (see profiles.py)
+profile_store = ProfileStore(PROFILE_STORE_ENTRIES, PROFILE_TTL)
+
+# Scoring (similarity top-k, fuzzy search) runs on its own thread pool, never on
+# the event loop; each scoring endpoint admits a bounded number of requests
+scoring = ScoringExecutor(SCORING_WORKERS)
+limiters = {
+    name: ConcurrencyLimiter(name, limit, max_queue, QUEUE_TIMEOUT)
+    for name, (limit, max_queue) in ENDPOINT_LIMITS.items()
+}
 
 # --- FastAPI App Instance ---
 app = FastAPI()
+# Request counts and latency per route, and the request context for stage timings
+app.add_middleware(MetricsMiddleware)
+
+@app.exception_handler(Overloaded)
+async def overloaded_handler(request: Request, exc: Overloaded):
+    """ Sheds load: the client should back off and retry rather than wait on a full queue. """
+    return JSONResponse(status_code=503, content={"detail": f"Server busy ({exc.reason}), retry shortly."},
+                        headers={"Retry-After": "1"})
 
 # --- Mount Static Files Directory --- 
 # This line tells FastAPI to serve files from the 'static' directory 
@@ -81,26 +180,99 @@ app.mount("/static", StaticFiles(directory="static"), name="static")
 # Make sure you have a 'templates' directory in the same level as app.py
 templates = Jinja2Templates(directory="templates")
 
-# --- Helper Function to Get Poster URL ---
-def get_poster_url(path, size="w300"):
-    base_url = "https://image.tmdb.org/t/p/"
-    if pd.isna(path) or path == '':
-        # Return path to our static placeholder
-        return "/static/placeholder.png" 
-    return f"{base_url}{size}{path}"
+# --- Helper Function for Popularity-Ordered Pages ---
+def select_view(snapshot, view_name, genres: Optional[str] = None, mode: str = 'any'):
+    """
+    Precomputed popularity view, optionally narrowed to a comma-separated list
+    of genres matched with `mode` 'any' (OR) or 'all' (AND).
+    """
+    view = snapshot.views[view_name]
+    if not genres:
+        return view
+    if mode not in ('any', 'all'):
+        raise HTTPException(status_code=400, detail="mode must be 'any' or 'all'.")
+    genre_list = [g for g in genres.split(',') if g.strip()]
+    return snapshot.genres.view(genre_list, mode, base=None if view_name == 'all' else view)
+
+def browse_page(snapshot, view_name, genres, mode, skip, limit, cursor):
+    """
+    One page of a (possibly genre-filtered) popularity view, as
+    (rows, next_cursor, total_items). Filtering merges posting lists, so
+    handlers run it on the scoring pool when `genres` is given.
+    """
+    with timed('lookup'):
+        view = select_view(snapshot, view_name, genres, mode)
+        rows, next_cursor = paginate_view(view, skip, limit, cursor)
+        return rows, next_cursor, len(view)
+
+async def browse(snapshot, view_name, genres, mode, skip, limit, cursor):
+    """`browse_page` on the loop for plain views; genre filters go through the 'browse' limiter and scoring pool."""
+    if genres:
+        return await offload('browse', browse_page, snapshot, view_name, genres, mode, skip, limit, cursor)
+    return browse_page(snapshot, view_name, genres, mode, skip, limit, cursor)
+
+def paginate_view(view, skip, limit, cursor=None):
+    """
+    Slices a popularity view, returning (rows, next_cursor).
+
+    `cursor` is the `next_cursor` of the previous page, a (popularity, id)
+    key that stays valid across catalog reloads; it takes precedence over `skip`.
+    """
+    try:
+        return view.page(skip, limit, cursor)
+    except ValueError:
+        raise HTTPException(status_code=400, detail=f"Invalid cursor '{cursor}'.")
+
+async def offload(endpoint, fn, *args):
+    """Runs `fn(*args)` on the scoring pool once `endpoint`'s limiter admits it (or raises Overloaded)."""
+    async with limiters[endpoint].slot():
+        return await scoring.run(fn, *args)
+
+async def cached_json(request, endpoint, params, build, scored=False):
+    """
+    Serves `build(snapshot)` (encoded JSON) for the live snapshot through the
+    response cache, keyed on (endpoint, params, snapshot tag).
+
+    The ETag is the snapshot tag (its version plus build lineage, so a full
+    fit and an incremental update of the same file never share one), so
+    browsers and CDNs revalidating with If-None-Match get a 304 until the
+    catalog is reloaded. If-None-Match is only honoured once a body exists
+    for the request: errors raised by `build` (unknown titles, bad cursors)
+    are neither cached nor tagged, so an invalid request gets its 4xx even
+    with a current ETag. With `scored`, a cache miss builds on the scoring
+    pool under the endpoint's limiter; cache hits never queue behind scoring
+    work. `build` may also return an awaitable (e.g. a coalesced request,
+    see batching.py).
+    """
+    snapshot = catalog.current
+    headers = {"ETag": f'"{snapshot.tag}"', "Cache-Control": f"public, max-age={HTTP_CACHE_MAX_AGE}"}
+    key = (endpoint, params, snapshot.tag)
+    body = response_cache.get(key)
+    if body is None:
+        body = await offload(endpoint, build, snapshot) if scored else build(snapshot)
+        if inspect.isawaitable(body):
+            body = await body
+        response_cache.put(key, body)
+    if etag_matches(request.headers.get("if-none-match"), headers["ETag"]):
+        return Response(status_code=304, headers=headers)
+    return RawJSONResponse(body, headers=headers)
+
+# Item IDs and offsets are int64 (and JSON-encoded as such); larger values in a request are rejected
+ID_MIN, ID_MAX = int(np.iinfo(np.int64).min), int(np.iinfo(np.int64).max)
 
 # --- API Endpoints --- 
 
 @app.get("/")
 def read_root_html(request: Request): # Inject Request object
     """ Serves the main HTML page with popular items. """
-    if content_df.empty:
+    snapshot = catalog.current
+    if snapshot.catalog.empty:
         return templates.TemplateResponse("error.html", {"request": request, "message": "Data could not be loaded."}) # Need an error template
 
-    # Get top N popular items (simple sort by popularity)
-    popular_items = content_df.sort_values(by='popularity', ascending=False).head(24)
+    # Get top N popular items from the precomputed popularity order
+    rows, _ = paginate_view(snapshot.views['all'], 0, 24)
     # Add poster URLs to the data passed to the template
-    popular_items_list = popular_items.to_dict("records")
+    popular_items_list = snapshot.catalog.records(rows)
     for item in popular_items_list:
         item['poster_url'] = get_poster_url(item.get('poster_path'))
 
@@ -111,134 +283,134 @@ def read_root_html(request: Request): # Inject Request object
     )
 
 @app.get("/popular")
-def get_popular(limit: int = 20):
+async def get_popular(request: Request, limit: int = 20, skip: int = 0, cursor: Optional[str] = None):
     """ API endpoint to get popular items (e.g., for dynamic loading) """
-    if content_df.empty:
-        raise HTTPException(status_code=503, detail="Content data not loaded.")
-    
-    popular = content_df.sort_values(by='popularity', ascending=False).head(limit)
-    popular_list = popular.to_dict("records")
-    for item in popular_list:
-        item['poster_url'] = get_poster_url(item.get('poster_path'))
-    return {"popular_items": popular_list}
+    skip, limit = max(skip, 0), max(limit, 0)
+
+    def build(snapshot):
+        if snapshot.catalog.empty:
+            raise HTTPException(status_code=503, detail="Content data not loaded.")
+        with timed('lookup'):
+            rows, next_cursor = paginate_view(snapshot.views['all'], skip, limit, cursor)
+        with timed('serialise'):
+            return render({"next_cursor": next_cursor}, {"popular_items": snapshot.payloads.summary_list(rows)})
+
+    return await cached_json(request, 'popular', (skip, limit, cursor), build)
 
 # --- NEW Search Endpoint --- 
 @app.get("/search")
-def search_content(query: str):
+async def search_content(request: Request, query: str, limit: int = 50):
     """
-    Searches for content items by title (case-insensitive substring match).
+    Searches for content items by title: exact, prefix and token matches,
+    with typo-tolerant trigram matching as a fallback, ranked by match
+    quality blended with popularity.
     
     - **query**: The search term (query parameter).
+    - **limit**: Maximum number of results (default 50).
     """
-    if content_df.empty:
-        raise HTTPException(status_code=503, detail="Content data not loaded.")
-    
-    if not query or len(query) < 2:
-        # Avoid overly broad searches or empty queries
-        return {"query": query, "results": []}
+    limit = max(1, min(limit, 50))
 
-    print(f"Performing search for query: '{query}'") # Log search query
-    try:
-        # Perform case-insensitive substring search on the title
-        # Using na=False to handle any potential unexpected NaNs in title column
-        matches = content_df[content_df['title'].str.contains(query, case=False, na=False)]
-        
-        # Limit number of results
-        max_results = 50 
-        results_df = matches.head(max_results)
-        
-        results_list = results_df[['id', 'title', 'type', 'poster_path']].to_dict("records")
-        
-        # Add poster URLs
-        for item in results_list:
-            item['poster_url'] = get_poster_url(item.get('poster_path'))
-            
-        print(f"Found {len(results_list)} matches for query: '{query}'") # Log result count
-        return {"query": query, "results": results_list}
-        
-    except Exception as e:
-        print(f"Error during search for '{query}': {e}")
-        raise HTTPException(status_code=500, detail="Internal server error during search.")
+    def build(snapshot):
+        if snapshot.catalog.empty:
+            raise HTTPException(status_code=503, detail="Content data not loaded.")
+
+        if not query or len(query) < 2:
+            # Avoid overly broad searches or empty queries
+            return render({"query": query, "results": []})
+
+        log.debug("Performing search for query: '%s'", query) # Log search query
+        try:
+            # Look the query up in the title search index built at load time
+            with timed('lookup'):
+                rows, _ = snapshot.search.search(query, limit=limit)
+
+            log.debug("Found %d matches for query: '%s'", len(rows), query) # Log result count
+            # Assemble the response from the precomputed item payloads
+            with timed('serialise'):
+                return render({"query": query}, {"results": snapshot.payloads.summary_list(rows)})
+
+        except Exception as e:
+            log.exception("Error during search for '%s': %s", query, e)
+            raise HTTPException(status_code=500, detail="Internal server error during search.")
+
+    # The query is echoed back verbatim, so it is keyed as given
+    return await cached_json(request, 'search', (query, limit), build, scored=True)
 
 # --- NEW: Endpoint to get unique genres ---
 @app.get("/genres")
-def get_unique_genres():
-    """ Returns a sorted list of unique genres from the dataset. """
-    if content_df.empty:
-        raise HTTPException(status_code=503, detail="Content data not loaded.")
-    
-    try:
-        # Split comma-separated genres, handle potential NaNs/empties, flatten list
-        all_genre_lists = content_df['genre_names'].dropna().str.split(',')
-        # Flatten the list of lists and strip whitespace
-        flat_genres = [genre.strip() for sublist in all_genre_lists for genre in sublist if genre.strip()]
-        # Get unique, sorted genres
-        unique_genres = sorted(list(set(flat_genres)))
-        return {"genres": unique_genres}
-    except Exception as e:
-        print(f"Error getting unique genres: {e}")
-        raise HTTPException(status_code=500, detail="Error processing genres.")
+async def get_unique_genres(request: Request):
+    """ Returns a sorted list of unique genres from the dataset, with item counts. """
+    def build(snapshot):
+        if snapshot.catalog.empty:
+            raise HTTPException(status_code=503, detail="Content data not loaded.")
+        # Names and counts come straight from the genre index built at load time
+        with timed('serialise'):
+            return dumps({"genres": snapshot.genres.names, "counts": snapshot.genres.counts()})
+
+    return await cached_json(request, 'genres', (), build)
 
 # --- NEW: Endpoint to get content by genre (with pagination) ---
 @app.get("/genre/{genre_name}")
-def get_content_by_genre(genre_name: str, skip: int = 0, limit: int = 20):
+async def get_content_by_genre(request: Request, genre_name: str, skip: int = Query(0, le=ID_MAX), limit: int = Query(20, le=MAX_PAGE_SIZE), cursor: Optional[str] = None):
     """
-    Gets content items belonging to a specific genre, with pagination.
+    Gets content items belonging to a specific genre, sorted by popularity, with pagination.
     
-    - **genre_name**: The genre to filter by (path parameter).
+    - **genre_name**: The genre to filter by (path parameter, exact case-insensitive match).
     - **skip**: Number of items to skip (for pagination).
     - **limit**: Maximum number of items to return.
+    - **cursor**: `next_cursor` from the previous page (overrides `skip`).
     """
-    if content_df.empty:
-        raise HTTPException(status_code=503, detail="Content data not loaded.")
-    
     if limit <= 0:
         limit = 20 # Default limit if invalid value provided
     if skip < 0:
         skip = 0
-        
-    try:
-        # Filter by genre (case-insensitive contains match)
-        # Adding word boundaries `\b` for more precise matching (e.g., prevent 'Action' matching 'Reaction')
-        # Regex requires escaping special characters in genre_name if they exist, but unlikely for genres
-        # Pandas `contains` needs regex=True for word boundaries
-        pattern = rf'\b{genre_name}\b' #  = word boundary
-        matches = content_df[content_df['genre_names'].str.contains(pattern, case=False, na=False, regex=True)]
-        
-        # Get total count for potential pagination UI later
-        total_matches = len(matches)
-        
-        # Apply pagination
-        paginated_matches = matches.iloc[skip : skip + limit]
-        
-        results_list = paginated_matches[['id', 'title', 'type', 'poster_path']].to_dict("records")
-        
-        # Add poster URLs
-        for item in results_list:
-            item['poster_url'] = get_poster_url(item.get('poster_path'))
-            
-        return {
-            "genre": genre_name, 
-            "skip": skip,
-            "limit": limit,
-            "total_matches": total_matches,
-            "results": results_list
-        }
-        
-    except Exception as e:
-        print(f"Error getting content for genre '{genre_name}': {e}")
-        raise HTTPException(status_code=500, detail=f"Internal server error processing genre '{genre_name}'.")
+
+    def build(snapshot):
+        if snapshot.catalog.empty:
+            raise HTTPException(status_code=503, detail="Content data not loaded.")
+        try:
+            # Posting list lookup in the genre index: exact match, no regex
+            with timed('lookup'):
+                view = snapshot.genres.view([genre_name])
+
+                # Get total count for potential pagination UI later
+                total_matches = len(view)
+
+                # Apply pagination
+                rows, next_cursor = paginate_view(view, skip, limit, cursor)
+
+            # Assemble the response from the precomputed item payloads
+            with timed('serialise'):
+                return render({
+                    "genre": genre_name,
+                    "skip": skip,
+                    "limit": limit,
+                    "total_matches": total_matches,
+                    "next_cursor": next_cursor,
+                }, {"results": snapshot.payloads.summary_list(rows)})
+
+        except HTTPException as e:
+            raise e
+        except Exception as e:
+            log.exception("Error getting content for genre '%s': %s", genre_name, e)
+            raise HTTPException(status_code=500, detail=f"Internal server error processing genre '{genre_name}'.")
+
+    return await cached_json(request, 'genre', (genre_name, skip, limit, cursor), build)
 
 # --- NEW Endpoint to get all content with pagination ---
 @app.get("/all")
-def get_all_content(skip: int = 0, limit: int = 24): # Default limit 24 for grid
+async def get_all_content(skip: int = Query(0, le=ID_MAX), limit: int = Query(24, le=MAX_PAGE_SIZE), cursor: Optional[str] = None, genres: Optional[str] = None, mode: str = 'any'): # Default limit 24 for grid
     """
     Gets all content items with pagination, sorted by popularity.
     
     - **skip**: Number of items to skip.
     - **limit**: Maximum number of items to return.
+    - **cursor**: `next_cursor` from the previous page; stable across data reloads (overrides `skip`).
+    - **genres**: Optional comma-separated genres to filter by, e.g. `Action,Comedy`.
+    - **mode**: `any` (default) matches items with at least one of `genres`; `all` requires every one.
     """
-    if content_df.empty:
+    snapshot = catalog.current
+    if snapshot.catalog.empty:
         raise HTTPException(status_code=503, detail="Content data not loaded.")
     
     if limit <= 0:
@@ -247,37 +419,38 @@ def get_all_content(skip: int = 0, limit: int = 24): # Default limit 24 for grid
         skip = 0
         
     try:
-        # Get subset sorted by popularity
-        sorted_df = content_df.sort_values(by='popularity', ascending=False)
-        total_items = len(sorted_df)
-        
-        # Apply pagination
-        paginated_matches = sorted_df.iloc[skip : skip + limit]
+        # Slice the precomputed popularity-ordered view
+        rows, next_cursor, total_items = await browse(snapshot, 'all', genres, mode, skip, limit, cursor)
         
-        results_list = paginated_matches[['id', 'title', 'type', 'poster_path']].to_dict("records")
-        
-        # Add poster URLs
-        for item in results_list:
-            item['poster_url'] = get_poster_url(item.get('poster_path'))
-            
-        return {
-            "skip": skip,
-            "limit": limit,
-            "total_items": total_items,
-            "results": results_list
-        }
+        # Assemble the response from the precomputed item payloads
+        with timed('serialise'):
+            return json_response({
+                "skip": skip,
+                "limit": limit,
+                "total_items": total_items,
+                "next_cursor": next_cursor,
+            }, results=snapshot.payloads.summary_list(rows))
         
+    except (HTTPException, Overloaded) as e:
+        raise e
     except Exception as e:
-        print(f"Error getting all content: {e}")
+        log.exception("Error getting all content: %s", e)
         raise HTTPException(status_code=500, detail="Internal server error processing request.")
 
 # --- NEW API Endpoint for Movies with Pagination ---
 @app.get("/api/movies")
-def get_movies(skip: int = 0, limit: int = 24):
+async def get_movies(skip: int = Query(0, le=ID_MAX), limit: int = Query(24, le=MAX_PAGE_SIZE), cursor: Optional[str] = None, genres: Optional[str] = None, mode: str = 'any'):
     """
     Gets Movie items with pagination, sorted by popularity.
+    
+    - **skip**: Number of items to skip.
+    - **limit**: Maximum number of items to return.
+    - **cursor**: `next_cursor` from the previous page; stable across data reloads (overrides `skip`).
+    - **genres**: Optional comma-separated genres to filter by, e.g. `Action,Comedy`.
+    - **mode**: `any` (default) matches items with at least one of `genres`; `all` requires every one.
     """
-    if content_df.empty:
+    snapshot = catalog.current
+    if snapshot.catalog.empty:
         raise HTTPException(status_code=503, detail="Content data not loaded.")
     
     if limit <= 0:
@@ -286,42 +459,38 @@ def get_movies(skip: int = 0, limit: int = 24):
         skip = 0
         
     try:
-        # Filter for Movies first
-        movies_df = content_df[content_df['type'].str.lower() == 'movie']
-        
-        # Sort by popularity
-        sorted_movies = movies_df.sort_values(by='popularity', ascending=False)
-        total_items = len(sorted_movies)
+        # Slice the precomputed popularity-ordered view
+        rows, next_cursor, total_items = await browse(snapshot, 'movie', genres, mode, skip, limit, cursor)
         
-        # Apply pagination
-        paginated_matches = sorted_movies.iloc[skip : skip + limit]
-        
-        results_list = paginated_matches[['id', 'title', 'type', 'poster_path']].to_dict("records")
-        
-        # Add poster URLs
-        for item in results_list:
-            item['poster_url'] = get_poster_url(item.get('poster_path'))
-            
-        return {
-            "skip": skip,
-            "limit": limit,
-            "total_items": total_items,
-            "results": results_list
-        }
+        # Assemble the response from the precomputed item payloads
+        with timed('serialise'):
+            return json_response({
+                "skip": skip,
+                "limit": limit,
+                "total_items": total_items,
+                "next_cursor": next_cursor,
+            }, results=snapshot.payloads.summary_list(rows))
         
+    except (HTTPException, Overloaded) as e:
+        raise e
     except Exception as e:
-        print(f"Error getting movies: {e}")
+        log.exception("Error getting movies: %s", e)
         raise HTTPException(status_code=500, detail="Internal server error processing movie request.")
 
 # --- NEW API Endpoint for TV Shows with Pagination ---
 @app.get("/api/shows")
-def get_shows(skip: int = 0, limit: int = 24):
+async def get_shows(skip: int = Query(0, le=ID_MAX), limit: int = Query(24, le=MAX_PAGE_SIZE), cursor: Optional[str] = None, genres: Optional[str] = None, mode: str = 'any'):
     """
-    Gets TV Show items with pagination, sorted by popularity.
-    NOTE: Assumes the type is stored as 'TV Show' in the data.
-          Adjust the .str.lower() == 'tv show' if needed.
+    Gets TV Show items (type 'tv') with pagination, sorted by popularity.
+    
+    - **skip**: Number of items to skip.
+    - **limit**: Maximum number of items to return.
+    - **cursor**: `next_cursor` from the previous page; stable across data reloads (overrides `skip`).
+    - **genres**: Optional comma-separated genres to filter by, e.g. `Action,Comedy`.
+    - **mode**: `any` (default) matches items with at least one of `genres`; `all` requires every one.
     """
-    if content_df.empty:
+    snapshot = catalog.current
+    if snapshot.catalog.empty:
         raise HTTPException(status_code=503, detail="Content data not loaded.")
     
     if limit <= 0:
@@ -330,118 +499,548 @@ def get_shows(skip: int = 0, limit: int = 24):
         skip = 0
         
     try:
-        # Filter for TV Shows first (using 'tv' as specified)
-        shows_df = content_df[content_df['type'].str.lower() == 'tv'] 
-        
-        # Sort by popularity
-        sorted_shows = shows_df.sort_values(by='popularity', ascending=False)
-        total_items = len(sorted_shows)
-        
-        # Apply pagination
-        paginated_matches = sorted_shows.iloc[skip : skip + limit]
-        
-        results_list = paginated_matches[['id', 'title', 'type', 'poster_path']].to_dict("records")
+        # Slice the precomputed popularity-ordered view
+        rows, next_cursor, total_items = await browse(snapshot, 'tv', genres, mode, skip, limit, cursor)
         
-        # Add poster URLs
-        for item in results_list:
-            item['poster_url'] = get_poster_url(item.get('poster_path'))
-            
-        return {
-            "skip": skip,
-            "limit": limit,
-            "total_items": total_items,
-            "results": results_list
-        }
+        # Assemble the response from the precomputed item payloads
+        with timed('serialise'):
+            return json_response({
+                "skip": skip,
+                "limit": limit,
+                "total_items": total_items,
+                "next_cursor": next_cursor,
+            }, results=snapshot.payloads.summary_list(rows))
         
+    except (HTTPException, Overloaded) as e:
+        raise e
     except Exception as e:
-        print(f"Error getting TV shows: {e}")
+        log.exception("Error getting TV shows: %s", e)
         raise HTTPException(status_code=500, detail="Internal server error processing TV show request.")
 
 # --- Recommendation Logic Function (adapted from notebook) ---
-def get_recommendations_logic(title: str, top_n: int = 10):
-    """Internal logic to get recommendations."""
-    if content_df.empty or cosine_sim_matrix is None:
-        raise HTTPException(status_code=503, detail="Recommendation data not loaded.")
-
-    if title not in indices:
-         # Basic check for close matches (case-insensitive substring)
-        possible_matches = [t for t in indices.index if title.lower() in t.lower()]
-        if not possible_matches:
+def resolve_title(snapshot, title: str):
+    """Maps a title to its row index, falling back to the best title search match."""
+    row = snapshot.catalog.row_for_title(title)
+    if row is None:
+        # Close matches (prefix, token or typo-tolerant) from the search index
+        best = snapshot.search.best_match(title)
+        if best is None:
             raise HTTPException(status_code=404, detail=f"Title '{title}' not found.")
-        else:
-            # In a real app, might return suggestions. Here, use the first match.
-            title = possible_matches[0]
-
-    idx = indices[title]
-    if isinstance(idx, pd.Series): # Handle potential duplicate titles mapping to multiple indices
-        idx = idx.iloc[0]
-
-    sim_scores = list(enumerate(cosine_sim_matrix[idx]))
-    sim_scores = sorted(sim_scores, key=lambda x: x[1], reverse=True)
-    top_indices = [i[0] for i in sim_scores[1:top_n + 1]]
-
-    # Return titles and maybe type/id for more usefulness
-    results = content_df.iloc[top_indices][['id', 'title', 'type', 'poster_path']].to_dict("records") # Added poster_path
-    # Add poster URLs to recommendations
-    for item in results:
-        item['poster_url'] = get_poster_url(item.get('poster_path'))
+        # In a real app, might return suggestions. Here, use the best match.
+        return best
+    return row
+
+def rows_for_ids(snapshot, item_ids):
+    """Row indices of all items whose ID is in `item_ids`."""
+    return snapshot.items.rows_for_ids(item_ids)
+
+def format_items(snapshot, rows):
+    """Pre-encoded JSON array of the list-view payloads (with poster URLs) for the given row indices."""
+    return snapshot.payloads.summary_list(rows)
+
+def get_recommendations_logic(snapshot, title: str, top_n: int = 10, exclude_ids: Optional[set] = None,
+                              options: Optional[RerankOptions] = None):
+    """
+    Internal logic to get recommendations.
+
+    `exclude_ids` is an optional set of item IDs (e.g. already-seen items) that
+    are filtered out inside the top-k selection. With active `options`, the
+    top RERANK_POOL candidates are re-ranked (see rerank.py) before the top N
+    are returned.
+    """
+    result = get_recommendations_many(snapshot, [(title, top_n, exclude_ids, options)])[0]
+    if isinstance(result, Exception):
+        raise result
+    return result
+
+def get_recommendations_many(snapshot, queries):
+    """
+    `get_recommendations_logic` for many (title, top_n, exclude_ids, options)
+    queries at once: the queries needing a full scoring pass share one matrix
+    product and one batched top-k (see `SimilarityEngine.recommend_many`).
+
+    Returns one result per query: its encoded recommendation list, or the
+    HTTPException that query alone would have raised.
+    """
+    if snapshot.empty:
+        return [HTTPException(status_code=503, detail="Recommendation data not loaded.")] * len(queries)
+
+    results = [None] * len(queries)
+    resolved = []
+    with timed('lookup'):
+        for i, (title, top_n, exclude_ids, options) in enumerate(queries):
+            try:
+                idx = resolve_title(snapshot, title)
+            except HTTPException as e:
+                results[i] = e
+                continue
+            exclude_rows = rows_for_ids(snapshot, exclude_ids) if exclude_ids else None
+            # Re-ranked queries retrieve a larger candidate pool to choose from
+            pool = max(top_n, RERANK_POOL) if options is not None and options.active else top_n
+            resolved.append((i, (idx, pool, exclude_rows)))
+
+    recommended = snapshot.engine.recommend_many([query for _, query in resolved])
+    for n, (i, _) in enumerate(resolved):
+        _, top_n, _, options = queries[i]
+        if options is not None and options.active:
+            recommended[n] = rerank(snapshot.engine, snapshot.features, *recommended[n], top_n, options)
+    with timed('serialise'):
+        for (i, _), (top_indices, _) in zip(resolved, recommended):
+            # Return titles and maybe type/id for more usefulness
+            results[i] = format_items(snapshot, top_indices)
+    return results
+
+def recommend_coalesced(requests):
+    """
+    MicroBatcher handler: (snapshot, title, top_n, exclude_ids, options,
+    render_body) requests -> encoded response bodies (or exceptions), one
+    per request.
+    Requests are grouped by snapshot, so a reload mid-batch is harmless.
+    """
+    results = [None] * len(requests)
+    groups = {}
+    for i, request in enumerate(requests):
+        groups.setdefault(id(request[0]), []).append(i)
+    for members in groups.values():
+        snapshot = requests[members[0]][0]
+        try:
+            lists = get_recommendations_many(snapshot, [requests[i][1:5] for i in members])
+        except Exception as e:
+            log.exception("Error during batched recommendation: %s", e)
+            lists = [HTTPException(status_code=500, detail="Internal server error during recommendation.")] * len(members)
+        for i, result in zip(members, lists):
+            results[i] = result if isinstance(result, Exception) else requests[i][5](result)
     return results
 
+# Concurrent /recommend/{title} cache misses are scored together in micro-batches
+recommend_batcher = MicroBatcher(
+    recommend_coalesced, scoring.run, RECOMMEND_BATCH_WINDOW_MS / 1000, RECOMMEND_BATCH_MAX, scoring.workers,
+    name='recommend_batching',
+)
+
+def rerank_options(content_type, genres, mode, diversity, prior_weight):
+    """RerankOptions from query parameters (unset weights take the configured defaults), or None if inactive."""
+    diversity = RERANK_DIVERSITY if diversity is None else diversity
+    prior_weight = RERANK_PRIOR_WEIGHT if prior_weight is None else prior_weight
+    if not (0.0 <= diversity <= 1.0 and 0.0 <= prior_weight <= 1.0):
+        raise HTTPException(status_code=400, detail="diversity and prior_weight must be between 0 and 1.")
+    if content_type is not None and content_type.lower() not in ('movie', 'tv'):
+        raise HTTPException(status_code=400, detail="type must be 'movie' or 'tv'.")
+    if mode not in ('any', 'all'):
+        raise HTTPException(status_code=400, detail="mode must be 'any' or 'all'.")
+    genre_list = tuple(sorted({g.strip().lower() for g in genres.split(',') if g.strip()})) if genres else ()
+    options = RerankOptions(diversity, prior_weight, content_type.lower() if content_type else None, genre_list, mode)
+    return options if options.active else None
+
+ItemId = conint(ge=ID_MIN, le=ID_MAX)
+TopN = conint(ge=1, le=MAX_TOP_N)
+
+class ItemKey(BaseModel):
+    type: str
+    id: ItemId
+
+def parse_id_list(value: Optional[str]):
+    """Parses a comma-separated list of numeric item IDs into a set of ints."""
+    if not value:
+        return None
+    try:
+        ids = {int(v) for v in value.split(',') if v.strip()}
+    except ValueError:
+        raise HTTPException(status_code=400, detail="IDs must be a comma-separated list of integers.")
+    if any(not ID_MIN <= i <= ID_MAX for i in ids):
+        raise HTTPException(status_code=400, detail="IDs must fit in a 64-bit signed integer.")
+    return ids
+
 # --- Recommendation API Endpoint --- 
 @app.get("/recommend/{title}")
-def recommend(title: str, top_n: int = 10):
+async def recommend(request: Request, title: str, top_n: int = Query(10, ge=1, le=MAX_TOP_N), exclude_ids: Optional[str] = None,
+                    content_type: Optional[str] = Query(None, alias='type'), genres: Optional[str] = None, mode: str = 'any',
+                    diversity: Optional[float] = None, prior_weight: Optional[float] = None):
     """
     Provides top N content recommendations for a given title.
     
     - **title**: The movie or TV show title (path parameter).
     - **top_n**: The number of recommendations to return (query parameter, default 10).
+    - **exclude_ids**: Optional comma-separated item IDs to leave out (e.g. items already in My List).
+    - **type** / **genres** / **mode**: Only return 'movie' or 'tv' items, or items with any / all of these genres.
+    - **diversity**: MMR penalty (0-1) on recommendations similar to ones already listed (default RERANK_DIVERSITY).
+    - **prior_weight**: Share (0-1) of popularity and vote average in the ranking (default RERANK_PRIOR_WEIGHT).
+
+    Constraints and weights re-rank the RERANK_POOL most similar items, so a
+    rare type or genre may return fewer than top_n.
     """
+    excluded = parse_id_list(exclude_ids)
+    options = rerank_options(content_type, genres, mode, diversity, prior_weight)
+
+    def render_body(recommendations):
+        return render({"input_title": title}, {"recommendations": recommendations})
+
+    async def build(snapshot):
+        # Admitted requests join the next micro-batch instead of scoring alone
+        async with limiters['recommend'].slot():
+            return await recommend_batcher.submit((snapshot, title, top_n, excluded, options, render_body))
+
+    # Exclusions are a set, so their order and duplicates do not split the cache
+    return await cached_json(request, 'recommend', (title, top_n, tuple(sorted(excluded or ())), options), build)
+
+# --- Batch Recommendation Endpoint ---
+class BatchRecommendRequest(BaseModel):
+    titles: List[str] = []
+    items: List[ItemKey] = []
+    ids: List[ItemId] = []
+    top_n: TopN = 10
+    blend: bool = False
+    exclude_ids: List[ItemId] = []
+
+def score_batch(snapshot, body):
+    """Resolves the seeds of a batch request and scores them together; runs on the scoring pool."""
     try:
-        recommendations = get_recommendations_logic(title, top_n)
-        return {"input_title": title, "recommendations": recommendations}
-    except HTTPException as e:
-        # Re-raise HTTPException to let FastAPI handle it
-        raise e
+        with timed('lookup'):
+            seeds, not_found, ambiguous = [], [], []
+            for title in body.titles:
+                try:
+                    seeds.append((title, resolve_title(snapshot, title)))
+                except HTTPException:
+                    not_found.append(title)
+            for key in body.items:
+                row = snapshot.items.row(key.type, key.id)
+                if row is not None:
+                    seeds.append(({"type": key.type, "id": key.id}, row))
+                else:
+                    not_found.append({"type": key.type, "id": key.id})
+            for item_id in body.ids:
+                rows = snapshot.items.rows_for_id(item_id)
+                if len(rows) == 1:
+                    seeds.append((item_id, rows[0]))
+                elif rows:
+                    # A movie and a show share this id; only a typed key in `items` can tell them apart
+                    ambiguous.append(item_id)
+                else:
+                    not_found.append(item_id)
+            extra = {"ambiguous": ambiguous} if ambiguous else {}
+            exclude_rows = rows_for_ids(snapshot, body.exclude_ids) if body.exclude_ids else None
+
+        if not seeds:
+            return json_response({"results": [], "not_found": not_found, **extra, **({"blended": []} if body.blend else {})})
+
+        per_seed, blended = snapshot.engine.recommend_batch(
+            [row for _, row in seeds], body.top_n, exclude=exclude_rows, blend=body.blend
+        )
+
+        # Each result object is rendered around its pre-encoded recommendation list
+        with timed('serialise'):
+            results = [
+                render({
+                    "input": seed,
+                    "input_title": snapshot.catalog.title(row),
+                    "input_id": snapshot.catalog.item_id(row),
+                }, {"recommendations": format_items(snapshot, positions)})
+                for (seed, row), (positions, _) in zip(seeds, per_seed)
+            ]
+            raw = {"results": render_list(results)}
+            if blended is not None:
+                raw["blended"] = format_items(snapshot, blended[0])
+            return json_response({"not_found": not_found, **extra}, **raw)
+
     except Exception as e:
-        # Catch unexpected errors during recommendation
-        print(f"Error during recommendation for '{title}': {e}") # Log the error server-side
-        raise HTTPException(status_code=500, detail="Internal server error during recommendation.")
+        log.exception("Error during batch recommendation: %s", e)
+        raise HTTPException(status_code=500, detail="Internal server error during batch recommendation.")
+
+@app.post("/recommend/batch")
+async def recommend_batch(body: BatchRecommendRequest):
+    """
+    Recommendations for several seed items in one request.
+
+    Seeds are scored together, one matrix product and batched top-k per
+    block of seeds.
+
+    - **titles** / **items** / **ids**: The seed items (at most MAX_BATCH_SEEDS), by title, by `{"type", "id"}`
+      key and/or by bare item ID. A bare ID shared by a movie and a show is listed in `ambiguous` instead.
+    - **top_n**: The number of recommendations per seed (default 10, at most MAX_TOP_N).
+    - **blend**: Also return one combined "because you liked these" list.
+    - **exclude_ids**: Item IDs to leave out of every list.
+    """
+    snapshot = catalog.current
+    if snapshot.empty:
+        raise HTTPException(status_code=503, detail="Recommendation data not loaded.")
+    if len(body.titles) + len(body.items) + len(body.ids) > MAX_BATCH_SEEDS:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_BATCH_SEEDS} seeds per request.")
+    return await offload('recommend_batch', score_batch, snapshot, body)
+
+# --- Profile Recommendation Endpoint ---
+class ProfileRecommendRequest(BaseModel):
+    items: List[ItemKey] = []
+    half_life: Optional[float] = None
+    profile_token: Optional[str] = None
+    added: List[ItemKey] = []
+    removed: List[ItemKey] = []
+    top_n: TopN = 10
+    exclude_ids: List[ItemId] = []
+    type: Optional[str] = None
+    genres: List[str] = []
+    mode: str = 'any'
+    diversity: Optional[float] = None
+    prior_weight: Optional[float] = None
+
+def profile_keys(keys):
+    """Hashable (type, id) tuples for ItemKeys, the form profiles.py stores."""
+    return [(key.type.lower(), key.id) for key in keys]
+
+def score_profile(snapshot, body, previous, options):
+    """Builds or updates the profile vector, scores the catalog with it once and encodes the response."""
+    try:
+        def row_of(key):
+            return snapshot.items.row(*key)
+
+        added, removed = profile_keys(body.added), profile_keys(body.removed)
+        with timed('profile'):
+            if previous is None:
+                state = build_profile(snapshot.engine, snapshot.tag, profile_keys(body.items) + added,
+                                      body.half_life, row_of)
+                if removed:
+                    state = update_profile(state, snapshot.engine, snapshot.tag, [], removed, row_of)
+            else:
+                state = update_profile(previous, snapshot.engine, snapshot.tag, added, removed, row_of)
+            token = profile_store.put(state)
+            profile_rows = list(state.rows.values())
+            not_found = [{"type": key.type, "id": key.id} for key in body.items + body.added
+                         if row_of((key.type.lower(), key.id)) is None]
+            norm = float(np.linalg.norm(state.vector))
+
+        fields = {"profile_token": token, "items": len(state), "not_found": not_found}
+        if not profile_rows or norm == 0.0:
+            return json_response(fields, recommendations=b'[]')
+
+        with timed('score'):
+            scores = snapshot.engine.vector_scores(state.vector / norm)
+        excluded = set(profile_rows)
+        if body.exclude_ids:
+            excluded.update(rows_for_ids(snapshot, body.exclude_ids).tolist())
+        with timed('topk'):
+            positions = top_k(scores, max(body.top_n, RERANK_POOL) if options else body.top_n, exclude=excluded)
+        if options:
+            positions, _ = rerank(snapshot.engine, snapshot.features, positions, scores[positions], body.top_n, options)
+        with timed('serialise'):
+            return json_response(fields, recommendations=format_items(snapshot, positions))
+
+    except Exception as e:
+        log.exception("Error during profile recommendation: %s", e)
+        raise HTTPException(status_code=500, detail="Internal server error during profile recommendation.")
+
+@app.post("/recommend/profile")
+async def recommend_profile(body: ProfileRecommendRequest):
+    """
+    One recommendation list for a whole profile (e.g. My List).
+
+    The items' vectors are summed into a single profile vector, the catalog
+    is scored against it once, and the profile's own items are left out.
+    The response carries a `profile_token`; later requests may send only
+    what changed (`added` / `removed`) with that token, and the stored
+    vector is updated from the changed items alone.
+
+    - **items**: The profile's `{"type", "id"}` keys, most recent first (without a token). Unknown keys are
+      listed in `not_found` and left out of the profile.
+    - **half_life**: Recency weighting: an item's weight halves for every `half_life` items added after it
+      (default: equal weights). Removing an item does not make the items before it newer.
+    - **profile_token** / **added** / **removed**: A delta of keys against a previous response; `added` is most
+      recent first.
+    - **top_n** / **exclude_ids**: As for `/recommend/{title}` (bare IDs in `exclude_ids` exclude every item with that ID).
+    - **type** / **genres** / **mode** / **diversity** / **prior_weight**: Re-ranking, as for `/recommend/{title}`.
+
+    An unknown or expired token gets a 404; the client then sends its full list again.
+    """
+    snapshot = catalog.current
+    if snapshot.empty:
+        raise HTTPException(status_code=503, detail="Recommendation data not loaded.")
+    if body.half_life is not None and body.half_life <= 0:
+        raise HTTPException(status_code=400, detail="half_life must be positive.")
+    options = rerank_options(body.type, ','.join(body.genres), body.mode, body.diversity, body.prior_weight)
+    previous = None
+    if body.profile_token is not None:
+        previous = profile_store.get(body.profile_token)
+        if previous is None:
+            raise HTTPException(status_code=404, detail="Unknown or expired profile token; send the full list of items.")
+    size = len(previous) if previous is not None else len(body.items)
+    if size + len(body.added) > MAX_PROFILE_ITEMS:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_PROFILE_ITEMS} items per profile.")
+    return await offload('recommend_profile', score_profile, snapshot, body, previous, options)
+
+# --- Item Details Endpoints ---
+class BulkItemsRequest(BaseModel):
+    items: List[ItemKey]
+
+@app.get("/item/{content_type}/{item_id}")
+async def get_item(content_type: str, item_id: int):
+    """
+    Get detailed information for one item by type and ID.
+
+    - **content_type**: 'movie' or 'tv' (TMDB movie and TV IDs overlap).
+    - **item_id**: The ID of the movie or TV show to retrieve.
+    """
+    snapshot = catalog.current
+    if snapshot.catalog.empty:
+        raise HTTPException(status_code=503, detail="Content data not loaded.")
+
+    with timed('lookup'):
+        row = snapshot.items.row(content_type, item_id)
+    if row is None:
+        raise HTTPException(status_code=404, detail=f"Item {content_type}/{item_id} not found.")
+    with timed('serialise'):
+        return RawJSONResponse(snapshot.payloads.detail(row))
+
+@app.post("/items")
+async def get_items(body: BulkItemsRequest):
+    """
+    Get detailed information for many items in one call.
+
+    - **items**: A list of `{"type": ..., "id": ...}` keys, at most MAX_BULK_ITEMS.
+
+    Found items are returned in request order; unknown keys are listed in `not_found`.
+    """
+    snapshot = catalog.current
+    if snapshot.catalog.empty:
+        raise HTTPException(status_code=503, detail="Content data not loaded.")
+    if len(body.items) > MAX_BULK_ITEMS:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_BULK_ITEMS} items per request.")
+
+    found, not_found = [], []
+    with timed('lookup'):
+        rows = [snapshot.items.row(key.type, key.id) for key in body.items]
+    with timed('serialise'):
+        for key, row in zip(body.items, rows):
+            if row is None:
+                not_found.append({"type": key.type, "id": key.id})
+            else:
+                found.append(snapshot.payloads.detail(row))
+        return json_response({"not_found": not_found}, items=render_list(found))
 
-# --- Item Details Endpoint ---
 @app.get("/item/{item_id}")
-def get_item_details(item_id: str):
+async def get_item_details(item_id: str):
     """
     Get detailed information for a specific content item by ID.
-    
+
+    Kept for older clients: when a movie and a TV show share the ID, the
+    first one in the catalog is returned. Prefer `/item/{type}/{id}`.
+
     - **item_id**: The ID of the movie or TV show to retrieve.
     """
-    if content_df.empty:
+    snapshot = catalog.current
+    if snapshot.catalog.empty:
         raise HTTPException(status_code=503, detail="Content data not loaded.")
-    
-    try:
-        # Convert string ID to proper type for comparison
-        if item_id.isdigit():
-            # Try both string and int comparisons for flexibility
-            item = content_df[(content_df['id'] == int(item_id)) | (content_df['id'] == item_id)]
-        else:
-            # For non-numeric IDs
-            item = content_df[content_df['id'] == item_id]
-        
-        if item.empty:
-            raise HTTPException(status_code=404, detail=f"Item with ID {item_id} not found.")
-        
-        # Convert to dict and add poster URL
-        item_dict = item.iloc[0].to_dict()
-        item_dict['poster_url'] = get_poster_url(item_dict.get('poster_path'))
-        
-        return item_dict
-        
-    except HTTPException as e:
-        # Re-raise HTTPException to let FastAPI handle it
-        raise e
-    except Exception as e:
-        print(f"Error retrieving item details for ID {item_id}: {e}")
-        raise HTTPException(status_code=500, detail=f"Internal server error retrieving item with ID {item_id}.")
+
+    with timed('lookup'):
+        rows = snapshot.items.rows_for_id(int(item_id)) if item_id.isdigit() else []
+    if not rows:
+        raise HTTPException(status_code=404, detail=f"Item with ID {item_id} not found.")
+    # Serve the memoised detail payload (all columns plus poster URL)
+    with timed('serialise'):
+        return RawJSONResponse(snapshot.payloads.detail(rows[0]))
+
+# --- Admin Endpoints ---
+def check_admin_token(request: Request):
+    """Rejects the request unless it carries ADMIN_TOKEN (when one is configured)."""
+    if ADMIN_TOKEN and request.headers.get("X-Admin-Token") != ADMIN_TOKEN:
+        raise HTTPException(status_code=403, detail="Invalid admin token.")
+
+@app.post("/admin/reload")
+def reload_catalog(request: Request, wait: bool = False):
+    """
+    Rebuilds the catalog and similarity index from DATA_PATH in the background
+    and swaps it in once ready. Requests keep being served from the current
+    snapshot meanwhile.
+
+    - **wait**: Block until the new snapshot is live (default false).
+    """
+    check_admin_token(request)
+    future = catalog.reload()
+    if wait:
+        try:
+            future.result()
+        except Exception:
+            raise HTTPException(status_code=500, detail=f"Catalog reload failed: {catalog.last_error}")
+    return catalog.status()
+
+@app.get("/admin/status")
+def catalog_status(request: Request):
+    """ Returns the live catalog version, reload state, response cache and scoring queue metrics. """
+    check_admin_token(request)
+    return {
+        **catalog.status(),
+        "response_cache": response_cache.stats(),
+        "scoring": scoring.stats(),
+        "recommend_batching": recommend_batcher.stats(),
+        "profiles": profile_store.stats(),
+        "limits": {name: limiter.stats() for name, limiter in limiters.items()},
+    }
+
+@app.get("/admin/memory")
+def catalog_memory(request: Request):
+    """ Returns the bytes held by each catalog column and index structure of the live snapshot. """
+    check_admin_token(request)
+    return catalog.current.memory_report()
+
+# --- Metrics & Profiling ---
+def collect_service_metrics():
+    """Gauges and counters read from live state at scrape time (see metrics.Registry)."""
+    snapshot = catalog.current
+    cache = response_cache.stats()
+    pool = scoring.stats()
+    batching = recommend_batcher.stats()
+    profiles = profile_store.stats()
+    limits = {name: limiter.stats() for name, limiter in limiters.items()}
+    return [
+        ('recommender_catalog_items', 'gauge', "Items in the live snapshot.", [({}, len(snapshot.catalog))]),
+        ('recommender_catalog_info', 'gauge', "Live snapshot version and how it was built.",
+         [({'version': snapshot.tag or '', 'mode': (snapshot.update or {}).get('mode', '')}, 1)]),
+        ('recommender_catalog_last_reload_seconds', 'gauge', "Duration of the last successful reload.",
+         [({}, catalog.last_reload_seconds)]),
+        ('recommender_catalog_drift', 'gauge', "Share of rows vectorised since the last full TF-IDF fit.",
+         [({}, snapshot.drift)]),
+        ('recommender_response_cache_entries', 'gauge', "Responses held by the response cache.", [({}, cache['entries'])]),
+        ('recommender_response_cache_bytes', 'gauge', "Bytes held by the response cache.", [({}, cache['bytes'])]),
+        ('recommender_response_cache_events_total', 'counter', "Response cache lookups and removals by outcome.",
+         [({'event': event}, cache[event]) for event in ('hits', 'misses', 'evictions', 'expirations', 'invalidations')]),
+        ('recommender_profile_store_entries', 'gauge', "Profile states held for delta updates.",
+         [({}, profiles['entries'])]),
+        ('recommender_profile_store_bytes', 'gauge', "Bytes of profile vectors held.", [({}, profiles['bytes'])]),
+        ('recommender_scoring_workers', 'gauge', "Threads in the scoring pool.", [({}, pool['workers'])]),
+        ('recommender_scoring_queue_depth', 'gauge', "Tasks waiting for a scoring thread.", [({}, pool['queued'])]),
+        ('recommender_scoring_running', 'gauge', "Tasks running on the scoring pool.", [({}, pool['running'])]),
+        ('recommender_scoring_tasks_total', 'counter', "Tasks completed by the scoring pool.", [({}, pool['completed'])]),
+        ('recommender_admission_in_flight', 'gauge', "Admitted requests per limited endpoint.",
+         [({'endpoint': name}, stats['in_flight']) for name, stats in limits.items()]),
+        ('recommender_admission_queued', 'gauge', "Requests waiting for admission per limited endpoint.",
+         [({'endpoint': name}, stats['queued']) for name, stats in limits.items()]),
+        ('recommender_admission_shed_total', 'counter', "Requests rejected with 503 per limited endpoint.",
+         [({'endpoint': name}, stats['shed']) for name, stats in limits.items()]),
+        ('recommender_recommend_batches_total', 'counter', "Micro-batches of recommend requests scored.",
+         [({}, batching['batches'])]),
+        ('recommender_recommend_batched_requests_total', 'counter', "Recommend requests scored in micro-batches.",
+         [({}, batching['items'])]),
+    ]
+
+REGISTRY.add_collector(collect_service_metrics)
+
+@app.get("/metrics")
+async def metrics():
+    """
+    Prometheus text-format metrics: request counts and latency per route,
+    per-stage request and build timings, queue waits, cache and queue gauges.
+    """
+    return PlainTextResponse(REGISTRY.render(), media_type="text/plain; version=0.0.4")
+
+@app.get("/admin/profile")
+def profile(request: Request, seconds: float = 5.0, interval_ms: float = 5.0):
+    """
+    Samples every thread's Python stack for `seconds` and returns folded
+    stacks (flamegraph.pl / speedscope input). Only served when
+    PROFILING_ENABLED is set.
+    """
+    check_admin_token(request)
+    if not PROFILING_ENABLED:
+        raise HTTPException(status_code=404, detail="Profiling is disabled (set PROFILING_ENABLED=1).")
+    seconds = min(max(seconds, 0.1), 60.0)
+    return PlainTextResponse(folded(sample_stacks(seconds, max(interval_ms, 1.0) / 1000)))
 
 # To run: uvicorn app:app --reload
 
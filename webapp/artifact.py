@@ -0,0 +1,135 @@
+import hashlib
+import json
+import os
+import shutil
+import time
+
+import numpy as np
+import scipy.sparse as sp
+from sklearn.feature_extraction.text import TfidfVectorizer
+
+from embedding import EmbeddingEngine
+from similarity import SimilarityEngine
+
+# Bump whenever the on-disk layout or the preprocessing changes, so stale
+# artifacts stop matching instead of being loaded
+ARTIFACT_VERSION = 2
+
+
+# --- Artifact Keys ---
+def artifact_key(data_path, params):
+    """
+    Content hash identifying the artifact for a data file and build parameters.
+
+    Any change to the CSV bytes, the parameters or ARTIFACT_VERSION yields a
+    new key, so a server never loads an index built from different inputs.
+    """
+    digest = hashlib.sha256()
+    digest.update(json.dumps({'version': ARTIFACT_VERSION, **params}, sort_keys=True).encode())
+    with open(data_path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()[:16]
+
+
+def find_artifact(index_dir, key):
+    """Returns the artifact directory for `key`, or None if it has not been built."""
+    path = os.path.join(index_dir, key)
+    return path if os.path.exists(os.path.join(path, 'meta.json')) else None
+
+
+# --- Save / Load ---
+def _save_csr(directory, name, matrix):
+    np.save(os.path.join(directory, f'{name}_data.npy'), matrix.data)
+    np.save(os.path.join(directory, f'{name}_indices.npy'), matrix.indices)
+    np.save(os.path.join(directory, f'{name}_indptr.npy'), matrix.indptr)
+
+
+def _load_csr(directory, name, shape, mmap_mode):
+    arrays = [np.load(os.path.join(directory, f'{name}_{part}.npy'), mmap_mode=mmap_mode)
+              for part in ('data', 'indices', 'indptr')]
+    return sp.csr_matrix(tuple(arrays), shape=shape, copy=False)
+
+
+def save_artifact(index_dir, key, vectorizer, engine, row_ids, params):
+    """
+    Writes the fitted vocabulary, the CSR matrices (or the dense embeddings
+    and SVD components) and the neighbour arrays to `index_dir/key`.
+
+    Files are written to a temporary directory and renamed into place, so
+    readers only ever see complete artifacts.
+    """
+    final_path = os.path.join(index_dir, key)
+    tmp_path = f"{final_path}.tmp-{os.getpid()}"
+    os.makedirs(tmp_path, exist_ok=True)
+
+    with open(os.path.join(tmp_path, 'vocabulary.json'), 'w') as f:
+        json.dump(vectorizer.get_feature_names_out().tolist(), f)
+    np.save(os.path.join(tmp_path, 'idf.npy'), vectorizer.idf_)
+    kind = 'embedding' if isinstance(engine, EmbeddingEngine) else 'sparse'
+    if kind == 'embedding':
+        np.save(os.path.join(tmp_path, 'embeddings.npy'), engine.matrix)
+        np.save(os.path.join(tmp_path, 'components.npy'), engine.components)
+    else:
+        _save_csr(tmp_path, 'matrix', engine.matrix)
+        _save_csr(tmp_path, 'term_index', engine.term_index)
+    np.save(os.path.join(tmp_path, 'row_ids.npy'), np.asarray(row_ids))
+    if engine.neighbours is not None:
+        np.save(os.path.join(tmp_path, 'neighbours.npy'), engine.neighbours)
+        np.save(os.path.join(tmp_path, 'neighbour_scores.npy'), engine.neighbour_scores)
+
+    meta = {
+        'version': ARTIFACT_VERSION,
+        'key': key,
+        'engine': kind,
+        'shape': list(engine.matrix.shape),
+        'params': params,
+        'has_neighbours': engine.neighbours is not None,
+        'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+    }
+    # meta.json is written last: its presence marks the artifact as complete
+    with open(os.path.join(tmp_path, 'meta.json'), 'w') as f:
+        json.dump(meta, f, indent=2)
+
+    if os.path.exists(final_path):
+        shutil.rmtree(final_path)
+    os.replace(tmp_path, final_path)
+    return final_path
+
+
+def load_artifact(path, mmap_mode='r'):
+    """
+    Loads an artifact written by `save_artifact`.
+
+    Arrays are memory-mapped by default, so every worker process on the host
+    shares the same page-cache pages instead of holding its own copy.
+    Returns (vectorizer, engine, row_ids).
+    """
+    with open(os.path.join(path, 'meta.json')) as f:
+        meta = json.load(f)
+    if meta['version'] != ARTIFACT_VERSION:
+        raise ValueError(f"Artifact at {path} has version {meta['version']}, expected {ARTIFACT_VERSION}.")
+
+    if meta['engine'] == 'embedding':
+        engine = EmbeddingEngine.from_arrays(
+            np.load(os.path.join(path, 'embeddings.npy'), mmap_mode=mmap_mode),
+            np.load(os.path.join(path, 'components.npy'), mmap_mode=mmap_mode),
+        )
+    else:
+        n_items, n_features = meta['shape']
+        matrix = _load_csr(path, 'matrix', (n_items, n_features), mmap_mode)
+        term_index = _load_csr(path, 'term_index', (n_features, n_items), mmap_mode)
+        engine = SimilarityEngine.from_arrays(matrix, term_index)
+    if meta['has_neighbours']:
+        engine.attach_neighbours(
+            np.load(os.path.join(path, 'neighbours.npy'), mmap_mode=mmap_mode),
+            np.load(os.path.join(path, 'neighbour_scores.npy'), mmap_mode=mmap_mode),
+        )
+
+    with open(os.path.join(path, 'vocabulary.json')) as f:
+        vocabulary = json.load(f)
+    vectorizer = TfidfVectorizer(vocabulary=vocabulary, **meta['params']['tfidf'])
+    vectorizer.idf_ = np.load(os.path.join(path, 'idf.npy'))
+
+    row_ids = np.load(os.path.join(path, 'row_ids.npy'), mmap_mode=mmap_mode)
+    return vectorizer, engine, row_ids
@@ -0,0 +1,95 @@
+import asyncio
+import time
+from collections import Counter
+
+from execution import WaitStats
+
+
+# --- Micro-Batching ---
+class MicroBatcher:
+    """
+    Coalesces concurrent requests into batches handled by one call.
+
+    `submit(item)` queues an item and waits for its result. The queue is
+    flushed by running `handler(items)` through `run` (e.g. the scoring
+    pool) as soon as fewer than `max_in_flight` batches are running, so an
+    idle server adds no delay; while all are busy, items accumulate until
+    the queue holds `max_batch` items or its first item has waited `window`
+    seconds. The handler returns one result per item, in order; a result
+    that is an Exception is raised to that item's caller only. A larger
+    window trades a bounded extra wait for bigger batches; with
+    `window <= 0` or `max_batch <= 1` every item is handled on its own.
+    Used from the event loop only.
+    """
+
+    def __init__(self, handler, run, window=0.002, max_batch=32, max_in_flight=1, name='batch'):
+        self.handler = handler
+        self.run = run
+        self.window = window
+        self.max_batch = max_batch
+        self.max_in_flight = max_in_flight
+        self._pending = [] # (item, future, queued_at)
+        self._timer = None
+        self._dispatching = set() # Keeps running dispatch tasks referenced
+        self.batches = 0
+        self.items = 0
+        self.sizes = Counter() # Batch size bucket (power of two) -> batches
+        self.waits = WaitStats(name) # Time from submit until the item's batch is dispatched
+
+    async def submit(self, item):
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append((item, future, time.perf_counter()))
+        if (self.window <= 0 or len(self._pending) >= self.max_batch
+                or len(self._dispatching) < self.max_in_flight):
+            self._flush()
+        elif self._timer is None:
+            self._timer = asyncio.get_running_loop().call_later(self.window, self._flush)
+        return await future
+
+    def _flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, []
+        if batch:
+            task = asyncio.ensure_future(self._dispatch(batch))
+            self._dispatching.add(task)
+            task.add_done_callback(self._dispatched)
+
+    def _dispatched(self, task):
+        self._dispatching.discard(task)
+        # A worker is free again: items that queued meanwhile go now, not at the window's end
+        if self._pending and len(self._dispatching) < self.max_in_flight:
+            self._flush()
+
+    async def _dispatch(self, batch):
+        now = time.perf_counter()
+        for _, _, queued_at in batch:
+            self.waits.record(now - queued_at)
+        self.batches += 1
+        self.items += len(batch)
+        self.sizes[1 << (len(batch) - 1).bit_length()] += 1
+        try:
+            results = await self.run(self.handler, [item for item, _, _ in batch])
+        except Exception as e:
+            results = [e] * len(batch)
+        for (_, future, _), result in zip(batch, results):
+            if future.done(): # Caller went away
+                continue
+            if isinstance(result, Exception):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
+
+    def stats(self):
+        return {
+            "window_ms": 1000 * self.window,
+            "max_batch": self.max_batch,
+            "max_in_flight": self.max_in_flight,
+            "pending": len(self._pending),
+            "batches": self.batches,
+            "items": self.items,
+            "mean_batch_size": self.items / self.batches if self.batches else 0.0,
+            "batch_sizes": {f"<={size}": count for size, count in sorted(self.sizes.items())},
+            "wait": self.waits.summary(),
+        }
@@ -0,0 +1,117 @@
+import importlib.util
+
+import numpy as np
+import pandas as pd
+
+# Arrow-backed text with NaN for missing, like `str`; pyarrow is optional, so plain objects without it
+STRING_DTYPE = pd.StringDtype('pyarrow', na_value=np.nan) if importlib.util.find_spec('pyarrow') else object
+CATEGORY_COLUMNS = ['type', 'genre_names'] # Few distinct values (genre_names holds whole genre combinations)
+STRING_COLUMNS = ['title', 'overview', 'release_date', 'poster_path']
+FLOAT_COLUMNS = ['popularity', 'vote_average']
+INT_COLUMNS = ['id', 'vote_count']
+
+
+# --- Compact Columns ---
+def compact_catalog(df):
+    """
+    The catalog with compact dtypes: categoricals for `type` and genre
+    combinations, Arrow-backed strings (Python objects without pyarrow) for
+    the other text, float32 and the smallest integer type that fits for
+    numerics. Any other column (such as
+    `tags`, still needed for vectorising) is left unchanged.
+    """
+    df = df.copy()
+    for column in CATEGORY_COLUMNS:
+        if column in df.columns and not isinstance(df[column].dtype, pd.CategoricalDtype):
+            df[column] = df[column].astype('category')
+    for column in STRING_COLUMNS:
+        if column in df.columns:
+            df[column] = df[column].astype(STRING_DTYPE)
+    for column in FLOAT_COLUMNS:
+        if column in df.columns:
+            df[column] = df[column].astype(np.float32)
+    for column in INT_COLUMNS:
+        if column in df.columns and not df[column].isna().any():
+            df[column] = pd.to_numeric(df[column], downcast='integer')
+    return df
+
+
+def column_nbytes(df):
+    """Deep bytes held by each column of `df`."""
+    return {column: int(df[column].memory_usage(index=False, deep=True)) for column in df.columns}
+
+
+# --- Title Lookup ---
+class TitleIndex:
+    """
+    Exact title -> row lookup in 12 bytes per item.
+
+    Stores 64-bit title hashes sorted together with their rows instead of a
+    title-indexed Series or dict, so no title strings are duplicated. A
+    lookup binary-searches the hash and confirms the candidate against the
+    catalog's own title column. Duplicate titles resolve to their first row.
+    """
+
+    def __init__(self, titles):
+        self._titles = titles
+        hashes = pd.util.hash_array(np.asarray(titles, dtype=object))
+        order = np.lexsort((np.arange(len(hashes)), hashes))
+        self.hashes = hashes[order]
+        self.rows = order.astype(np.int32)
+
+    @property
+    def nbytes(self):
+        return self.hashes.nbytes + self.rows.nbytes
+
+    def __contains__(self, title):
+        return self.row(title) is not None
+
+    def row(self, title):
+        """First row whose title is exactly `title`, or None."""
+        key = pd.util.hash_array(np.array([title], dtype=object))[0]
+        lo = np.searchsorted(self.hashes, key, side='left')
+        hi = np.searchsorted(self.hashes, key, side='right')
+        for row in self.rows[lo:hi]:
+            if self._titles.iat[row] == title:
+                return int(row)
+        return None
+
+
+# --- Catalog ---
+class CatalogFrame:
+    """
+    Typed, read-only access to the compact catalog of one snapshot.
+
+    Endpoints use the accessors here (`title(row)`, `item_id(row)`,
+    `row_for_title(title)`, ...) rather than indexing the DataFrame, which
+    keeps them independent of its column dtypes.
+    """
+
+    def __init__(self, df):
+        self.df = df
+        self.ids = df['id'].to_numpy() if 'id' in df.columns else np.empty(0, dtype=np.int64)
+        self.titles = TitleIndex(df['title'] if 'title' in df.columns else pd.Series([], dtype=object))
+
+    def __len__(self):
+        return len(self.df)
+
+    @property
+    def empty(self):
+        return self.df.empty
+
+    def title(self, row):
+        return str(self.df['title'].iat[row])
+
+    def item_id(self, row):
+        return int(self.ids[row])
+
+    def content_type(self, row):
+        return str(self.df['type'].iat[row])
+
+    def row_for_title(self, title):
+        """First row with exactly this title, or None."""
+        return self.titles.row(title)
+
+    def records(self, rows):
+        """Plain dicts (every column) for `rows`, e.g. for templates."""
+        return self.df.iloc[np.asarray(rows, dtype=np.intp)].to_dict('records')
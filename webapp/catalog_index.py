@@ -0,0 +1,238 @@
+from functools import reduce
+
+import numpy as np
+import pandas as pd
+
+
+# --- Popularity Ordering ---
+class PopularityOrder:
+    """
+    The catalog's rows ranked by (popularity desc, id asc), computed once per
+    snapshot.
+
+    A row's rank is its position in this order. Views over the catalog are
+    sorted arrays of ranks, so every view is popularity ordered by
+    construction and pages are plain slices.
+    """
+
+    def __init__(self, popularity, ids):
+        popularity = np.asarray(popularity)
+        if popularity.dtype.kind != 'f':
+            popularity = popularity.astype(np.float64)
+        # Kept in its own precision (float32 from Parquet) so cursors print its shortest decimal
+        popularity = np.nan_to_num(popularity, nan=-np.inf)
+        ids = np.asarray(ids, dtype=np.int64)
+        self.rows = np.lexsort((ids, -popularity)) # rank -> row
+        self.neg_popularity = -popularity[self.rows] # Ascending, for searchsorted
+        self.ids = ids[self.rows]
+        self.ranks = np.empty_like(self.rows) # row -> rank
+        self.ranks[self.rows] = np.arange(len(self.rows))
+
+    def __len__(self):
+        return len(self.rows)
+
+    @property
+    def nbytes(self):
+        return self.rows.nbytes + self.neg_popularity.nbytes + self.ids.nbytes + self.ranks.nbytes
+
+    def cursor_for_rank(self, rank):
+        """Opaque keyset cursor ("popularity:id") pointing just after `rank`."""
+        return f"{str(-self.neg_popularity[rank])}:{int(self.ids[rank])}" # str(): shortest repr in the array's precision
+
+    def rank_after(self, cursor):
+        """
+        First rank strictly after the (popularity, id) key encoded in `cursor`.
+
+        The key is located by binary search, so it costs O(log N) no matter
+        how deep the page is, and still lands in the right place after a
+        reload has added or removed items before it. Raises ValueError for a
+        malformed cursor.
+        """
+        popularity, item_id = cursor.rsplit(':', 1)
+        neg_popularity, item_id = self.neg_popularity.dtype.type(-float(popularity)), int(item_id)
+        lo = np.searchsorted(self.neg_popularity, neg_popularity, side='left')
+        hi = np.searchsorted(self.neg_popularity, neg_popularity, side='right')
+        return int(lo + np.searchsorted(self.ids[lo:hi], item_id, side='right'))
+
+
+class PopularityView:
+    """A popularity-ordered subset of the catalog, stored as a sorted array of ranks."""
+
+    def __init__(self, order, ranks):
+        self.order = order
+        self.ranks = np.asarray(ranks, dtype=np.intp)
+
+    @classmethod
+    def from_mask(cls, order, mask):
+        """View of the rows where the boolean `mask` (indexed by row) is set."""
+        return cls(order, np.flatnonzero(np.asarray(mask)[order.rows]))
+
+    def __len__(self):
+        return len(self.ranks)
+
+    @property
+    def nbytes(self):
+        return self.ranks.nbytes
+
+    def page(self, skip=0, limit=20, cursor=None):
+        """
+        Returns (rows, next_cursor) for one page of the view.
+
+        With a `cursor` the page starts right after the keyed item and `skip`
+        is ignored; otherwise it starts at offset `skip`. `next_cursor` is
+        None on the last page.
+        """
+        if cursor:
+            start = int(np.searchsorted(self.ranks, self.order.rank_after(cursor), side='left'))
+        else:
+            start = skip
+        ranks = self.ranks[start:start + limit]
+        next_cursor = None
+        if len(ranks) and start + len(ranks) < len(self.ranks):
+            next_cursor = self.order.cursor_for_rank(ranks[-1])
+        return self.order.rows[ranks], next_cursor
+
+
+# --- Genre Index ---
+class GenreIndex:
+    """
+    Inverted index from genre to a popularity-ordered posting list.
+
+    Postings are sorted arrays of popularity ranks, so AND / OR filters are
+    `np.intersect1d` / `np.union1d` and their results are already in
+    popularity order. Genres match exactly (case-insensitively) on the
+    comma-separated names in `genre_names`.
+    """
+
+    def __init__(self, order, genre_names):
+        exploded = genre_names.astype(str).fillna('').str.split(',').explode().str.strip()
+        exploded = exploded[exploded != '']
+        rows = exploded.index.to_numpy()
+        codes, names = pd.factorize(exploded.to_numpy())
+
+        # Group ranks by genre code with one sort instead of a Python loop per row
+        ranks = order.ranks[rows]
+        by_genre = np.lexsort((ranks, codes))
+        boundaries = np.flatnonzero(np.diff(codes[by_genre])) + 1
+        self.postings = {}
+        for code_block in np.split(by_genre, boundaries) if len(by_genre) else []:
+            self.postings[names[codes[code_block[0]]]] = np.unique(ranks[code_block])
+
+        self.order = order
+        self.names = sorted(self.postings)
+        self._canonical = {name.lower(): name for name in self.names}
+
+    @property
+    def nbytes(self):
+        return sum(p.nbytes for p in self.postings.values())
+
+    def canonical(self, genre):
+        """The indexed spelling of `genre` (case-insensitive), or None if unknown."""
+        return self._canonical.get(genre.strip().lower())
+
+    def counts(self):
+        return {name: len(self.postings[name]) for name in self.names}
+
+    def ranks(self, genres, mode='any'):
+        """
+        Sorted popularity ranks of items having any (`mode='any'`) or all
+        (`mode='all'`) of `genres`. Unknown genres match nothing.
+        """
+        postings = []
+        for genre in genres:
+            name = self.canonical(genre)
+            postings.append(self.postings[name] if name else np.empty(0, dtype=np.intp))
+        if not postings:
+            return np.empty(0, dtype=np.intp)
+        combine = np.intersect1d if mode == 'all' else np.union1d
+        return reduce(combine, postings)
+
+    def view(self, genres, mode='any', base=None):
+        """PopularityView of the matching items, optionally restricted to another view's items."""
+        ranks = self.ranks(genres, mode)
+        if base is not None:
+            ranks = np.intersect1d(ranks, base.ranks, assume_unique=True)
+        return PopularityView(self.order, ranks)
+
+
+# --- Item Lookup ---
+class ItemIndex:
+    """
+    Index from (type, id) to row, built once per snapshot.
+
+    TMDB movie and TV ids overlap, so an id alone can name two items; the
+    catalog is deduplicated on (type, id), which is the only unique key.
+    `rows_for_id` returns every row carrying an id, for callers that only
+    have ids (e.g. exclusion lists).
+
+    Stored as ids sorted with their rows plus one type code per row (13
+    bytes per item) rather than Python dicts of tuples; lookups binary
+    search the id and check the type of the (at most a few) rows sharing it.
+    """
+
+    def __init__(self, types, ids):
+        codes, names = pd.factorize(pd.Series(types).astype(str).str.lower())
+        self.type_codes = codes.astype(np.int8)
+        self._codes = {name: code for code, name in enumerate(names)}
+        ids = np.asarray(ids, dtype=np.int64)
+        order = np.lexsort((np.arange(len(ids)), ids)) # By id, then catalog order
+        self.sorted_ids = ids[order]
+        self.rows = order.astype(np.int32)
+
+    def __len__(self):
+        return len(self.rows)
+
+    @property
+    def nbytes(self):
+        return self.type_codes.nbytes + self.sorted_ids.nbytes + self.rows.nbytes
+
+    def _range(self, item_id):
+        return (np.searchsorted(self.sorted_ids, item_id, side='left'),
+                np.searchsorted(self.sorted_ids, item_id, side='right'))
+
+    def row(self, content_type, item_id):
+        """Row of the item with this (type, id), or None."""
+        code = self._codes.get(content_type.lower())
+        if code is None:
+            return None
+        lo, hi = self._range(item_id)
+        for row in self.rows[lo:hi]:
+            if self.type_codes[row] == code:
+                return int(row)
+        return None
+
+    def rows_for_id(self, item_id):
+        """Rows of all items with this id (one per type), in catalog order."""
+        lo, hi = self._range(item_id)
+        return self.rows[lo:hi].tolist()
+
+    def rows_for_ids(self, item_ids):
+        """Rows of all items whose id is in `item_ids`."""
+        ids = np.fromiter(item_ids, dtype=np.int64, count=len(item_ids))
+        lo = np.searchsorted(self.sorted_ids, ids, side='left')
+        hi = np.searchsorted(self.sorted_ids, ids, side='right')
+        if not len(ids) or not (hi - lo).any():
+            return np.empty(0, dtype=np.intp)
+        return np.concatenate([self.rows[l:h] for l, h in zip(lo, hi)]).astype(np.intp)
+
+
+def build_popularity_views(df):
+    """Popularity order plus the 'all', 'movie' and 'tv' views for a catalog DataFrame."""
+    order = PopularityOrder(df['popularity'].to_numpy(), df['id'].to_numpy())
+    content_type = df['type'].str.lower().to_numpy()
+    views = {
+        'all': PopularityView(order, np.arange(len(order))),
+        'movie': PopularityView.from_mask(order, content_type == 'movie'),
+        'tv': PopularityView.from_mask(order, content_type == 'tv'),
+    }
+    return order, views
+
+
+def build_genre_index(df, order):
+    """GenreIndex over the catalog's `genre_names` column."""
+    return GenreIndex(order, df['genre_names'])
+
+
+def build_item_index(df):
+    """ItemIndex over the catalog's `type` and `id` columns."""
+    return ItemIndex(df['type'], df['id'])
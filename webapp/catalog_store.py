@@ -0,0 +1,66 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError: # pyarrow is optional; without it only the CSV catalog can be read
+    pa = pq = None
+
+
+# --- Columnar Catalog Format ---
+# Parquet layout of the catalog: low-cardinality text is dictionary-encoded
+# (loaded as pandas categoricals), numerics are 32-bit, and the remaining
+# text loads as Arrow-backed strings instead of Python objects.
+CATALOG_COLUMNS = ['id', 'title', 'overview', 'release_date', 'vote_average', 'vote_count', 'popularity',
+                   'poster_path', 'genre_names', 'type']
+
+
+def catalog_schema():
+    return pa.schema([
+        ('id', pa.int64()),
+        ('title', pa.string()),
+        ('overview', pa.string()),
+        ('release_date', pa.string()),
+        ('vote_average', pa.float32()),
+        ('vote_count', pa.int32()),
+        ('popularity', pa.float32()),
+        ('poster_path', pa.string()),
+        ('genre_names', pa.dictionary(pa.int32(), pa.string())),
+        ('type', pa.dictionary(pa.int8(), pa.string())),
+    ])
+
+
+def _require_pyarrow():
+    if pa is None:
+        raise ImportError("Parquet catalogs need pyarrow (pip install pyarrow).")
+
+
+def _string_type(arrow_type):
+    """types_mapper for `to_pandas`: plain Arrow strings stay Arrow-backed, with NaN for missing like `str`."""
+    if arrow_type in (pa.string(), pa.large_string()):
+        return pd.StringDtype('pyarrow', na_value=np.nan)
+    return None
+
+
+def write_catalog(df, path):
+    """Writes the catalog columns of `df` to Parquet at `path`, atomically (temp file then rename)."""
+    _require_pyarrow()
+    df = df[CATALOG_COLUMNS].copy()
+    for column in ['title', 'overview', 'release_date', 'poster_path', 'genre_names', 'type']:
+        # CSV round trips and TMDB gaps leave NaN floats in text columns
+        df[column] = df[column].astype(object).where(df[column].notna(), None)
+    df['vote_count'] = df['vote_count'].fillna(0)
+    table = pa.Table.from_pandas(df, schema=catalog_schema(), preserve_index=False)
+    tmp_path = path + '.tmp'
+    pq.write_table(table, tmp_path, compression='zstd')
+    os.replace(tmp_path, path)
+
+
+def read_catalog_table(path, columns=None):
+    """Reads a Parquet catalog into a DataFrame, loading only `columns` (default: all)."""
+    _require_pyarrow()
+    table = pq.read_table(path, columns=columns)
+    return table.to_pandas(types_mapper=_string_type)
@@ -0,0 +1,77 @@
+import os
+
+# --- Configuration ---
+# Paths are resolved relative to this file so the app and the scripts agree
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+CSV_PATH = os.path.normpath(os.path.join(BASE_DIR, "..", "data", "content_raw.csv"))
+PARQUET_PATH = os.path.normpath(os.path.join(BASE_DIR, "..", "data", "content.parquet")) # Columnar copy (catalog_store.py)
+# The columnar catalog loads much faster than the CSV, so it is preferred when scripts/fetch_data.py has written it
+DATA_PATH = os.getenv("DATA_PATH") or (PARQUET_PATH if os.path.exists(PARQUET_PATH) else CSV_PATH)
+INDEX_DIR = os.path.normpath(os.path.join(BASE_DIR, "..", "data", "index")) # Prebuilt index artifacts (scripts/build_index.py)
+
+MAX_FEATURES = 5000 # For TF-IDF Vectorizer
+EMBEDDING_DIMS = int(os.getenv("EMBEDDING_DIMS", "0")) # Reduce TF-IDF to dense SVD embeddings of this size (e.g. 128-256); 0 keeps sparse TF-IDF
+NEIGHBOURS_K = 50 # Precomputed neighbours stored per item in the index artifact
+BUILD_WORKERS = int(os.getenv("BUILD_WORKERS", "1")) # Processes for vectorising and neighbour precomputation; 0 uses every CPU
+# Reloads diff the new file against the live catalog by (id, type) and only re-vectorise new or edited
+# rows with the fitted vocabulary; once that share of rows (since the last full fit) exceeds this, refit.
+# 0 always refits.
+INCREMENTAL_REFIT_DRIFT = float(os.getenv("INCREMENTAL_REFIT_DRIFT", "0.2"))
+MAX_BULK_ITEMS = 500 # Upper bound on keys per POST /items request
+MAX_BATCH_SEEDS = 100 # Upper bound on seeds per POST /recommend/batch request
+MAX_TOP_N = 100 # Upper bound on top_n for the recommendation endpoints
+MAX_PAGE_SIZE = 100 # Upper bound on limit for /all, /api/movies, /api/shows and /genre/{name}
+
+# Approximate neighbour search for very large catalogs (see ann.py): 'exact', 'lsh' or 'ivf'
+# 'exact', or an ANN index for very large catalogs: 'ivf' (defaults keep recall@10 >= 0.9 in scripts/bench_ann.py).
+# 'lsh' only reaches that recall on TF-IDF text when it proposes most of the catalog, so it is not recommended.
+NEIGHBOUR_BACKEND = os.getenv("NEIGHBOUR_BACKEND", "exact")
+ANN_PARAMS = {
+    'lsh': {
+        'tables': int(os.getenv("LSH_TABLES", "16")), # More tables: higher recall, more candidates
+        'bits': int(os.getenv("LSH_BITS", "12")), # More bits per key: smaller buckets, lower latency
+        'probes': int(os.getenv("LSH_PROBES", "4")), # Extra buckets probed per table
+    },
+    'ivf': {
+        'lists': int(os.getenv("IVF_LISTS", "0")), # Clusters; 0 picks ~sqrt(N)
+        'probes': int(os.getenv("IVF_PROBES", "32")), # Clusters scanned per query: higher recall, higher latency
+        'dims': int(os.getenv("IVF_DIMS", "0")), # Random-projection dimensions to cluster on; 0 uses the TF-IDF space
+    },
+}
+
+RELOAD_POLL_SECONDS = float(os.getenv("RELOAD_POLL_SECONDS", "0")) # Watch DATA_PATH and hot-reload on change; 0 disables
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN") # If set, /admin endpoints require a matching X-Admin-Token header
+
+# Response cache for /popular, /search, /genres, /genre/{name} and /recommend/{title} (see response_cache.py)
+RESPONSE_CACHE_ENTRIES = int(os.getenv("RESPONSE_CACHE_ENTRIES", "4096")) # 0 disables
+RESPONSE_CACHE_TTL = float(os.getenv("RESPONSE_CACHE_TTL", "300")) # Seconds an entry may be served
+HTTP_CACHE_MAX_AGE = int(os.getenv("HTTP_CACHE_MAX_AGE", "60")) # Cache-Control max-age for browsers / CDNs; they revalidate with the ETag after that
+
+# Execution model (see execution.py): scoring runs on its own thread pool behind per-endpoint admission limits
+SCORING_WORKERS = int(os.getenv("SCORING_WORKERS", "0")) # Scoring threads; 0 uses every CPU
+ENDPOINT_LIMITS = { # endpoint -> (concurrent requests, queued requests); beyond both, requests get 503
+    # Admitted recommend requests wait for a shared batch (see batching.py), so the limit also caps batch size
+    'recommend': (int(os.getenv("RECOMMEND_CONCURRENCY", "32")), int(os.getenv("RECOMMEND_QUEUE", "128"))),
+    'recommend_batch': (int(os.getenv("BATCH_CONCURRENCY", "2")), int(os.getenv("BATCH_QUEUE", "8"))),
+    'search': (int(os.getenv("SEARCH_CONCURRENCY", "8")), int(os.getenv("SEARCH_QUEUE", "64"))),
+    'recommend_profile': (int(os.getenv("PROFILE_CONCURRENCY", "4")), int(os.getenv("PROFILE_QUEUE", "32"))),
+    # Genre-filtered /all, /api/movies and /api/shows pages (unions / intersections of posting lists)
+    'browse': (int(os.getenv("BROWSE_CONCURRENCY", "8")), int(os.getenv("BROWSE_QUEUE", "64"))),
+}
+QUEUE_TIMEOUT = float(os.getenv("QUEUE_TIMEOUT", "1.0")) # Seconds a request may wait for a slot before a 503
+RECOMMEND_BATCH_WINDOW_MS = float(os.getenv("RECOMMEND_BATCH_WINDOW_MS", "2")) # Max wait to coalesce recommend requests; 0 disables
+RECOMMEND_BATCH_MAX = int(os.getenv("RECOMMEND_BATCH_MAX", "32")) # Recommend requests scored together at most
+
+# Re-ranking of /recommend/{title} candidates (see rerank.py); requests can override the weights
+RERANK_POOL = int(os.getenv("RERANK_POOL", "300")) # Candidates retrieved by similarity before re-ranking
+RERANK_DIVERSITY = float(os.getenv("RERANK_DIVERSITY", "0")) # MMR redundancy penalty in [0, 1]; 0 keeps similarity order
+RERANK_PRIOR_WEIGHT = float(os.getenv("RERANK_PRIOR_WEIGHT", "0")) # Share of the popularity / vote prior in [0, 1]
+
+# Profile recommendations (POST /recommend/profile, see profiles.py)
+MAX_PROFILE_ITEMS = 500 # Upper bound on item ids in one profile
+PROFILE_STORE_ENTRIES = int(os.getenv("PROFILE_STORE_ENTRIES", "1024")) # Profile states kept for delta updates; 0 disables
+PROFILE_TTL = float(os.getenv("PROFILE_TTL", "3600")) # Seconds a profile token stays valid
+
+# Observability (see metrics.py, log_config.py, profiler.py)
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO") # DEBUG also logs every search query
+PROFILING_ENABLED = os.getenv("PROFILING_ENABLED", "0") == "1" # Exposes GET /admin/profile (sampling profiler)
@@ -0,0 +1,84 @@
+import numpy as np
+from sklearn.decomposition import TruncatedSVD
+from sklearn.preprocessing import normalize
+
+from similarity import SimilarityEngine
+
+
+# --- Dense Embedding Engine ---
+class EmbeddingEngine(SimilarityEngine):
+    """
+    Answers cosine-similarity queries from compact dense item embeddings.
+
+    The TF-IDF rows are reduced to `dims` dimensions with randomized
+    truncated SVD, L2-normalised and stored as one C-contiguous float32
+    (n_items, dims) array. Scoring an item against the catalog is then a
+    single BLAS matrix-vector product, so its cost and the engine's memory
+    depend only on n_items x dims, not on the vocabulary size or on how many
+    terms each title has.
+    """
+
+    def __init__(self, tfidf_matrix, dims, seed=0):
+        matrix = normalize(tfidf_matrix.tocsr().astype(np.float32), norm='l2')
+        dims = max(1, min(dims, min(matrix.shape) - 1))
+        svd = TruncatedSVD(n_components=dims, algorithm='randomized', random_state=seed)
+        embeddings = svd.fit_transform(matrix)
+        # Projects further TF-IDF rows into the same space (see `transform`)
+        self.components = np.ascontiguousarray(svd.components_, dtype=np.float32)
+        self.matrix = np.ascontiguousarray(normalize(embeddings, norm='l2'), dtype=np.float32)
+        self.term_index = None
+        self.neighbours = None
+        self.neighbour_scores = None
+        self.ann = None
+
+    @classmethod
+    def from_arrays(cls, embeddings, components):
+        """Wraps already-normalised embeddings and the SVD components (e.g. memory-mapped) without copying."""
+        engine = cls.__new__(cls)
+        engine.matrix = embeddings
+        engine.components = components
+        engine.term_index = None
+        engine.neighbours = None
+        engine.neighbour_scores = None
+        engine.ann = None
+        return engine
+
+    @property
+    def dims(self):
+        return self.matrix.shape[1]
+
+    @property
+    def nbytes(self):
+        """Bytes held by the engine's arrays."""
+        total = self.matrix.nbytes + self.components.nbytes
+        if self.neighbours is not None:
+            total += self.neighbours.nbytes + self.neighbour_scores.nbytes
+        if self.ann is not None:
+            total += self.ann.nbytes
+        return total
+
+    def transform(self, tfidf_rows):
+        """Embeds TF-IDF rows fitted with the same vocabulary (e.g. items added after the SVD)."""
+        rows = normalize(tfidf_rows.astype(np.float32), norm='l2')
+        return normalize(np.asarray(rows @ self.components.T), norm='l2').astype(np.float32)
+
+    def scores(self, idx):
+        """Returns the cosine similarity of item `idx` against every item (one GEMV)."""
+        return self.matrix @ self.matrix[idx]
+
+    def scores_batch(self, rows):
+        """Returns a (len(rows), n_items) block of similarities (one GEMM)."""
+        return self.matrix[np.asarray(rows, dtype=np.intp)] @ self.matrix.T
+
+    def candidate_scores(self, rows, candidates):
+        """Returns a (len(rows), len(candidates)) block of similarities against `candidates` only."""
+        return self.matrix[np.asarray(rows, dtype=np.intp)] @ self.matrix[candidates].T
+
+    def item_vectors(self, rows):
+        """Returns the (len(rows), dims) block of the items' embeddings."""
+        return self.matrix[np.asarray(rows, dtype=np.intp)]
+
+    def pool_similarity(self, rows):
+        """Returns a function mapping a position in `rows` to its similarities against all of `rows` (one GEMV)."""
+        block = self.matrix[np.asarray(rows, dtype=np.intp)]
+        return lambda i: block @ block[i]
@@ -0,0 +1,173 @@
+import asyncio
+import contextvars
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+
+import numpy as np
+
+from metrics import QUEUE_WAIT
+
+WAIT_SAMPLES = 1024 # Recent wait times kept per queue for percentiles
+
+
+class Overloaded(Exception):
+    """Raised when a request is shed instead of queued; the app answers 503 with Retry-After."""
+
+    def __init__(self, name, reason):
+        super().__init__(f"{name}: {reason}")
+        self.name = name
+        self.reason = reason
+
+
+class WaitStats:
+    """
+    Count, total, max and recent percentiles of queue wait times (seconds),
+    also observed into the `queue` series of the Prometheus wait histogram.
+    """
+
+    def __init__(self, queue):
+        self.queue = queue
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.recent = deque(maxlen=WAIT_SAMPLES)
+
+    def record(self, seconds):
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+        self.recent.append(seconds)
+        QUEUE_WAIT.observe(seconds, queue=self.queue)
+
+    def summary(self):
+        recent = np.fromiter(self.recent, dtype=np.float64, count=len(self.recent))
+        p50, p99 = np.percentile(recent, [50, 99]) if len(recent) else (0.0, 0.0)
+        return {
+            "count": self.count,
+            "mean_ms": 1000 * self.total / self.count if self.count else 0.0,
+            "p50_ms": 1000 * float(p50),
+            "p99_ms": 1000 * float(p99),
+            "max_ms": 1000 * self.max,
+        }
+
+
+# --- Admission Control ---
+class ConcurrencyLimiter:
+    """
+    Caps how many requests of one endpoint run at once.
+
+    Up to `limit` requests hold a slot; up to `max_queue` more wait for one.
+    A request arriving with the queue full, or still waiting after
+    `timeout` seconds, is shed with `Overloaded` instead of piling up, so
+    an overloaded endpoint fails fast rather than slowing every other one.
+    Used from the event loop only, so the counters need no lock.
+    """
+
+    def __init__(self, name, limit, max_queue, timeout=1.0):
+        self.name = name
+        self.limit = limit
+        self.max_queue = max_queue
+        self.timeout = timeout
+        self.in_flight = 0
+        self.waiting = 0
+        self.max_waiting = 0
+        self.admitted = 0
+        self.shed = 0
+        self.waits = WaitStats(name)
+        self._semaphore = asyncio.Semaphore(limit)
+
+    @asynccontextmanager
+    async def slot(self):
+        if self.in_flight + self.waiting >= self.limit + self.max_queue:
+            self.shed += 1
+            raise Overloaded(self.name, "queue full")
+        self.waiting += 1
+        self.max_waiting = max(self.max_waiting, self.waiting)
+        start = time.perf_counter()
+        try:
+            await asyncio.wait_for(self._semaphore.acquire(), self.timeout)
+        except asyncio.TimeoutError:
+            self.shed += 1
+            raise Overloaded(self.name, f"no slot within {self.timeout:g}s")
+        finally:
+            self.waiting -= 1
+        self.waits.record(time.perf_counter() - start)
+        self.admitted += 1
+        self.in_flight += 1
+        try:
+            yield
+        finally:
+            self.in_flight -= 1
+            self._semaphore.release()
+
+    def stats(self):
+        return {
+            "limit": self.limit,
+            "max_queue": self.max_queue,
+            "in_flight": self.in_flight,
+            "queued": self.waiting,
+            "max_queued": self.max_waiting,
+            "admitted": self.admitted,
+            "shed": self.shed,
+            "wait": self.waits.summary(),
+        }
+
+
+# --- Scoring Executor ---
+class ScoringExecutor:
+    """
+    Dedicated thread pool for CPU-bound scoring, kept apart from the server's
+    default thread pool and event loop.
+
+    Threads share the snapshot's (memory-mapped) index with no copies; the
+    sparse and BLAS kernels release the GIL for most of their work. Tracks
+    queue depth and the time tasks wait before a worker picks them up.
+    """
+
+    def __init__(self, workers=0):
+        self.workers = workers or os.cpu_count() or 1
+        self._pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='scoring')
+        self._lock = threading.Lock()
+        self.queued = 0
+        self.running = 0
+        self.max_queued = 0
+        self.completed = 0
+        self.waits = WaitStats('scoring')
+
+    async def run(self, fn, *args):
+        """Runs `fn(*args)` on the pool and awaits its result."""
+        submitted = time.perf_counter()
+        with self._lock:
+            self.queued += 1
+            self.max_queued = max(self.max_queued, self.queued)
+
+        def task():
+            with self._lock:
+                self.queued -= 1
+                self.running += 1
+                self.waits.record(time.perf_counter() - submitted)
+            try:
+                return fn(*args)
+            finally:
+                with self._lock:
+                    self.running -= 1
+                    self.completed += 1
+
+        # Copies the request context, so stage timings in `fn` are attributed to its endpoint
+        context = contextvars.copy_context()
+        return await asyncio.wrap_future(self._pool.submit(context.run, task))
+
+    def stats(self):
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "queued": self.queued,
+                "running": self.running,
+                "max_queued": self.max_queued,
+                "completed": self.completed,
+                "wait": self.waits.summary(),
+            }
@@ -0,0 +1,197 @@
+import logging
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+from sklearn.preprocessing import normalize
+
+from embedding import EmbeddingEngine
+from similarity import SimilarityEngine, neighbour_block
+
+log = logging.getLogger(__name__)
+
+KEY_COLUMNS = ['id', 'type']
+TEXT_COLUMNS = ['overview', 'genre_names', 'title'] # Inputs of `tags`; a change here needs new vectors
+BLOCK_SIZE = 1024 # Rows recomputed per block while patching neighbour lists
+MERGE_BLOCK = 128 # Changed items scored against the catalog per block (MERGE_BLOCK x n_items floats)
+
+
+# --- Catalog Diff ---
+@dataclass
+class CatalogDiff:
+    """
+    How a new catalog dump relates to the live one, keyed by (id, type).
+
+    `df` is the new catalog with rows that survived kept in their old order
+    (then new rows), so unchanged items keep their vector positions.
+    `sources[i]` is row i's position in the old catalog, or -1 if it is new.
+    `dirty` marks rows whose vectors must be (re)computed: new rows and rows
+    whose overview, genres or title changed.
+    """
+    df: pd.DataFrame
+    sources: np.ndarray
+    dirty: np.ndarray
+    removed: int
+    metadata_changed: int
+
+    @property
+    def added(self):
+        return int((self.sources < 0).sum())
+
+    @property
+    def text_changed(self):
+        return int(self.dirty.sum()) - self.added
+
+    @property
+    def vectors_unchanged(self):
+        """True when every surviving row keeps its position and vector."""
+        return not self.dirty.any() and not self.removed
+
+    def summary(self):
+        return {'added': self.added, 'removed': self.removed, 'text_changed': self.text_changed,
+                'metadata_changed': self.metadata_changed}
+
+
+def _differs(new, old):
+    """Element-wise inequality of two aligned columns, treating missing == missing."""
+    new, old = np.asarray(new, dtype=object), np.asarray(old, dtype=object)
+    return (new != old) & ~(pd.isna(new) & pd.isna(old))
+
+
+def diff_catalogs(old_df, new_df):
+    """Diffs `new_df` against `old_df` by (id, type); see CatalogDiff."""
+    old_keys = pd.MultiIndex.from_frame(old_df[KEY_COLUMNS])
+    new_keys = pd.MultiIndex.from_frame(new_df[KEY_COLUMNS])
+    found = old_keys.get_indexer(new_keys)
+
+    # Surviving rows in their old order, then new rows in file order
+    kept = np.flatnonzero(found >= 0)
+    order = np.concatenate([kept[np.argsort(found[kept], kind='stable')], np.flatnonzero(found < 0)])
+    df = new_df.iloc[order].reset_index(drop=True)
+    sources = found[order]
+
+    survived = sources >= 0
+    dirty = ~survived
+    old_rows = old_df.iloc[sources[survived]]
+    metadata_changed = np.zeros(int(survived.sum()), dtype=bool)
+    for column in df.columns:
+        if column not in old_df.columns or column in KEY_COLUMNS or column == 'tags':
+            continue
+        changed = _differs(df[column].to_numpy()[survived], old_rows[column].to_numpy())
+        if column in TEXT_COLUMNS:
+            dirty[survived] |= changed
+        else:
+            metadata_changed |= changed
+    metadata_changed &= ~dirty[survived]
+
+    return CatalogDiff(df=df, sources=sources, dirty=dirty, removed=len(old_df) - int(survived.sum()),
+                       metadata_changed=int(metadata_changed.sum()))
+
+
+# --- Engine Update ---
+def update_engine(engine, vectorizer, diff):
+    """
+    A new engine for `diff.df`, reusing the old vectors of clean rows and
+    transforming only dirty rows with the fitted `vectorizer` (vocabulary and
+    IDF unchanged). Neighbour lists, when present, are patched rather than
+    recomputed. Returns `engine` itself when no vector changed.
+    """
+    if diff.vectors_unchanged:
+        return engine
+
+    clean_rows = np.flatnonzero(~diff.dirty)
+    dirty_rows = np.flatnonzero(diff.dirty)
+    # Position of each aligned row in [old clean vectors; new dirty vectors]
+    stacked = np.empty(len(diff.sources), dtype=np.intp)
+    stacked[clean_rows] = np.arange(len(clean_rows))
+    stacked[dirty_rows] = len(clean_rows) + np.arange(len(dirty_rows))
+
+    tfidf = vectorizer.transform(diff.df['tags'].iloc[dirty_rows])
+    old_positions = diff.sources[clean_rows]
+    if isinstance(engine, EmbeddingEngine):
+        vectors = np.vstack([engine.matrix[old_positions], engine.transform(tfidf)])
+        new_engine = EmbeddingEngine.from_arrays(np.ascontiguousarray(vectors[stacked]), engine.components)
+    else:
+        dirty_vectors = normalize(tfidf.astype(np.float32), norm='l2')
+        new_engine = SimilarityEngine(sp.vstack([engine.matrix[old_positions], dirty_vectors], format='csr')[stacked])
+
+    if engine.neighbours is not None:
+        new_engine.attach_neighbours(*patch_neighbours(engine, new_engine, diff))
+    return new_engine
+
+
+def patch_neighbours(old_engine, engine, diff):
+    """
+    Neighbour lists for `engine` derived from `old_engine`'s.
+
+    Rows that are dirty, or whose list referenced an item that was removed
+    or re-vectorised, are recomputed exactly. Every other list stays valid
+    except that a dirty item may now belong in it, so the dirty items are
+    scored against all rows and merged into the lists they beat.
+    """
+    k = old_engine.neighbours.shape[1]
+    n_items = engine.n_items
+    clean_rows = np.flatnonzero(~diff.dirty)
+    dirty_rows = np.flatnonzero(diff.dirty)
+
+    # Old position -> new position, with -1 for rows removed or re-vectorised
+    old_to_new = np.full(old_engine.n_items + 1, -1, dtype=np.intp) # Last slot maps -1 padding to -1
+    old_to_new[diff.sources[clean_rows]] = clean_rows
+    old_lists = np.asarray(old_engine.neighbours[diff.sources[clean_rows]])
+    remapped = old_to_new[old_lists]
+    affected = ((remapped < 0) & (old_lists >= 0)).any(axis=1)
+
+    neighbours = np.full((n_items, k), -1, dtype=np.int32)
+    neighbour_scores = np.zeros((n_items, k), dtype=np.float32)
+    neighbours[clean_rows] = remapped
+    neighbour_scores[clean_rows] = old_engine.neighbour_scores[diff.sources[clean_rows]]
+
+    recompute = np.union1d(dirty_rows, clean_rows[affected])
+    for start in range(0, len(recompute), BLOCK_SIZE):
+        rows = recompute[start:start + BLOCK_SIZE]
+        neighbours[rows], neighbour_scores[rows] = neighbour_block(engine, rows, k)
+
+    # Merge dirty items into the remaining (still valid) lists they beat
+    merge_rows = clean_rows[~affected]
+    if not len(dirty_rows) or not len(merge_rows) or not k:
+        return neighbours, neighbour_scores
+    full = neighbours[merge_rows, -1] >= 0
+    threshold = np.where(full, neighbour_scores[merge_rows, -1], -np.inf)
+    for start in range(0, len(dirty_rows), MERGE_BLOCK):
+        candidates = dirty_rows[start:start + MERGE_BLOCK]
+        scores = engine.candidate_scores(candidates, merge_rows) # (candidates, merge_rows), symmetric
+        beats = np.flatnonzero((scores > threshold).any(axis=0))
+        if not len(beats):
+            continue
+        rows = merge_rows[beats]
+        merged = np.hstack([neighbours[rows], np.broadcast_to(candidates, (len(rows), len(candidates)))])
+        merged_scores = np.hstack([neighbour_scores[rows], scores[:, beats].T]).astype(np.float32)
+        merged_scores[merged < 0] = -np.inf
+        order = np.lexsort((merged, -merged_scores), axis=-1)[:, :k]
+        best = np.take_along_axis(merged, order, axis=1)
+        best_scores = np.take_along_axis(merged_scores, order, axis=1)
+        best[~np.isfinite(best_scores)] = -1
+        neighbours[rows] = best
+        neighbour_scores[rows] = np.where(np.isfinite(best_scores), best_scores, 0)
+        threshold[beats] = np.where(neighbours[rows, -1] >= 0, neighbour_scores[rows, -1], -np.inf)
+    return neighbours, neighbour_scores
+
+
+# --- Snapshot Update ---
+def incremental_update(previous, df, max_drift):
+    """
+    Applies the freshly read catalog `df` on top of the `previous` snapshot.
+
+    Returns (diff, engine, drift), or None when a full refit is due instead.
+    `drift` is the share of catalog rows vectorised against a vocabulary
+    and IDF fitted without them, accumulated across incremental updates
+    since the last full fit; crossing `max_drift` triggers the refit.
+    """
+    diff = diff_catalogs(previous.content_df, df)
+    drift = previous.drift + int(diff.dirty.sum()) / max(1, len(diff.df))
+    if drift > max_drift:
+        log.info("Vocabulary drift %.1f%% exceeds %.1f%%; refitting from scratch.", 100 * drift, 100 * max_drift)
+        return None
+    log.info("Incremental update: %s, drift %.1f%%.", diff.summary(), 100 * drift)
+    return diff, update_engine(previous.engine, previous.vectorizer, diff), drift
@@ -0,0 +1,29 @@
+import atexit
+import logging
+import logging.handlers
+import queue
+
+LOG_FORMAT = '%(asctime)s %(levelname)s %(name)s: %(message)s'
+
+_listener = None
+
+
+def configure_logging(level='INFO'):
+    """
+    Routes the root logger through a queue: callers (request handlers
+    included) only enqueue records, and a background thread formats them
+    and writes them to stderr. Safe to call more than once; later calls
+    just change the level.
+    """
+    global _listener
+    root = logging.getLogger()
+    root.setLevel(level.upper() if isinstance(level, str) else level)
+    if _listener is not None:
+        return
+    records = queue.SimpleQueue()
+    stream = logging.StreamHandler()
+    stream.setFormatter(logging.Formatter(LOG_FORMAT))
+    _listener = logging.handlers.QueueListener(records, stream, respect_handler_level=True)
+    _listener.start()
+    atexit.register(_listener.stop) # Flushes queued records on shutdown
+    root.addHandler(logging.handlers.QueueHandler(records))
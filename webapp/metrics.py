@@ -0,0 +1,221 @@
+import bisect
+import contextvars
+import threading
+import time
+from contextlib import contextmanager
+
+# Upper bounds (seconds) of the histogram buckets
+LATENCY_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+BUILD_BUCKETS = (0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0)
+
+
+# --- Metric Types ---
+def _label_text(names, values):
+    if not names:
+        return ''
+    pairs = ','.join(f'{name}="{_escape(value)}"' for name, value in zip(names, values))
+    return '{' + pairs + '}'
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _number(value):
+    return repr(float(value)) if value not in (float('inf'), float('-inf')) else ('+Inf' if value > 0 else '-Inf')
+
+
+class Counter:
+    """A monotonically increasing count per label set."""
+
+    kind = 'counter'
+
+    def __init__(self, name, help, labelnames=()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1, **labels):
+        key = tuple(labels[name] for name in self.labelnames)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def samples(self):
+        with self._lock:
+            values = dict(self._values)
+        return [(self.name, _label_text(self.labelnames, key), value) for key, value in sorted(values.items())]
+
+
+class Histogram:
+    """Cumulative-bucket histogram (Prometheus semantics) per label set."""
+
+    kind = 'histogram'
+
+    def __init__(self, name, help, labelnames=(), buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets)
+        self._values = {} # labels -> [per-bucket counts (+Inf last), sum]
+        self._lock = threading.Lock()
+
+    def observe(self, value, **labels):
+        key = tuple(labels[name] for name in self.labelnames)
+        slot = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            entry = self._values.get(key)
+            if entry is None:
+                entry = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0]
+            entry[0][slot] += 1
+            entry[1] += value
+
+    def samples(self):
+        with self._lock:
+            values = {key: (list(counts), total) for key, (counts, total) in self._values.items()}
+        samples = []
+        for key, (counts, total) in sorted(values.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float('inf'),), counts):
+                cumulative += count
+                labels = _label_text(self.labelnames + ('le',), key + (_number(bound),))
+                samples.append((self.name + '_bucket', labels, cumulative))
+            labels = _label_text(self.labelnames, key)
+            samples.append((self.name + '_sum', labels, total))
+            samples.append((self.name + '_count', labels, cumulative))
+        return samples
+
+
+class Registry:
+    """
+    Metrics rendered by `/metrics` in the Prometheus text format.
+
+    Besides Counters and Histograms updated on the hot path, `collectors`
+    are callables returning (name, kind, help, [(labels dict, value)]) for
+    gauges read from live state (cache, queues, snapshot) at scrape time.
+    """
+
+    def __init__(self):
+        self.metrics = []
+        self.collectors = []
+
+    def counter(self, name, help, labelnames=()):
+        metric = Counter(name, help, labelnames)
+        self.metrics.append(metric)
+        return metric
+
+    def histogram(self, name, help, labelnames=(), buckets=LATENCY_BUCKETS):
+        metric = Histogram(name, help, labelnames, buckets)
+        self.metrics.append(metric)
+        return metric
+
+    def add_collector(self, collect):
+        self.collectors.append(collect)
+
+    def render(self):
+        lines = []
+        for metric in self.metrics:
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(f"{name}{labels} {_number(value)}" for name, labels, value in metric.samples())
+        for collect in self.collectors:
+            for name, kind, help, samples in collect():
+                lines.append(f"# HELP {name} {help}")
+                lines.append(f"# TYPE {name} {kind}")
+                for labels, value in samples:
+                    if value is None:
+                        continue
+                    text = _label_text(tuple(labels), tuple(labels.values()))
+                    lines.append(f"{name}{text} {_number(value)}")
+        return '\n'.join(lines) + '\n'
+
+
+REGISTRY = Registry()
+HTTP_REQUESTS = REGISTRY.counter(
+    'recommender_http_requests_total', "HTTP requests by route, method and status.", ['endpoint', 'method', 'status'])
+HTTP_DURATION = REGISTRY.histogram(
+    'recommender_http_request_duration_seconds', "HTTP request latency by route.", ['endpoint'])
+REQUEST_STAGE = REGISTRY.histogram(
+    'recommender_request_stage_seconds', "Time in each stage (lookup, profile, neighbours, score, topk, rerank, serialise) of a request.",
+    ['endpoint', 'stage'])
+QUEUE_WAIT = REGISTRY.histogram(
+    'recommender_queue_wait_seconds', "Time requests wait in each admission, batching and scoring queue.", ['queue'])
+BUILD_STAGE = REGISTRY.histogram(
+    'recommender_build_stage_seconds', "Time in each stage of building a catalog snapshot.", ['stage'], BUILD_BUCKETS)
+
+
+# --- Stage Timing ---
+_scope = contextvars.ContextVar('request_scope', default=None) # ASGI scope of the request being served
+_build_timings = contextvars.ContextVar('build_timings', default=None)
+
+
+def endpoint_label(scope):
+    """Route template of a request (e.g. '/recommend/{title}'), so labels stay low-cardinality."""
+    if scope is None:
+        return 'none'
+    route = scope.get('route')
+    return getattr(route, 'path', None) or 'unmatched'
+
+
+@contextmanager
+def timed(stage):
+    """Adds the time spent in the block to the current request's `stage` histogram."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        REQUEST_STAGE.observe(time.perf_counter() - start, endpoint=endpoint_label(_scope.get()), stage=stage)
+
+
+@contextmanager
+def build_stage(stage):
+    """Times one stage of a snapshot build (also recorded into an active `collect_build_timings`)."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        BUILD_STAGE.observe(elapsed, stage=stage)
+        timings = _build_timings.get()
+        if timings is not None:
+            timings[stage] = round(timings.get(stage, 0.0) + elapsed, 4)
+
+
+@contextmanager
+def collect_build_timings():
+    """Yields a dict that collects {stage: seconds} from every `build_stage` inside the block."""
+    timings = {}
+    token = _build_timings.set(timings)
+    try:
+        yield timings
+    finally:
+        _build_timings.reset(token)
+
+
+# --- ASGI Middleware ---
+class MetricsMiddleware:
+    """Counts and times every HTTP request, and makes its scope visible to `timed`."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            return await self.app(scope, receive, send)
+        token = _scope.set(scope)
+        status = [500]
+
+        async def send_status(message):
+            if message['type'] == 'http.response.start':
+                status[0] = message['status']
+            await send(message)
+
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_status)
+        finally:
+            endpoint = endpoint_label(scope)
+            HTTP_DURATION.observe(time.perf_counter() - start, endpoint=endpoint)
+            HTTP_REQUESTS.inc(endpoint=endpoint, method=scope['method'], status=status[0])
+            _scope.reset(token)
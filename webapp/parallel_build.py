@@ -0,0 +1,113 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+from sklearn.feature_extraction.text import CountVectorizer, TfidfVectorizer
+from threadpoolctl import threadpool_limits
+
+from similarity import neighbour_block
+
+CHUNK_ROWS = 20000 # Documents per tokenising / vectorising task
+
+
+def resolve_workers(workers):
+    """Worker count to use: `workers`, or every CPU when it is 0 or negative."""
+    return workers if workers and workers > 0 else (os.cpu_count() or 1)
+
+
+_worker_engine = None # Engine shared by a neighbour worker's tasks (set once per process)
+
+
+def _init_worker(engine=None):
+    global _worker_engine
+    _worker_engine = engine
+    # One process per core already; stop BLAS from also spawning a thread per core in each
+    threadpool_limits(1)
+
+
+def make_pool(workers, engine=None):
+    return ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(engine,))
+
+
+def _chunks(texts, size):
+    return [texts[start:start + size] for start in range(0, len(texts), size)]
+
+
+# --- Parallel TF-IDF ---
+def _count_terms(texts, tfidf_params):
+    """Per-chunk term statistics: (terms, term frequency, document frequency)."""
+    vectorizer = CountVectorizer(**tfidf_params)
+    counts = vectorizer.fit_transform(texts)
+    return (vectorizer.get_feature_names_out(),
+            np.asarray(counts.sum(axis=0)).ravel(),
+            np.diff(counts.tocsc().indptr))
+
+
+def _transform_chunk(texts, vocabulary, idf, tfidf_params):
+    vectorizer = TfidfVectorizer(vocabulary=vocabulary, **tfidf_params)
+    vectorizer.idf_ = idf
+    return vectorizer.transform(texts).astype(np.float32)
+
+
+def fit_tfidf_parallel(texts, max_features, tfidf_params, workers, chunk_rows=CHUNK_ROWS):
+    """
+    Fits TF-IDF over `texts` in row chunks across a process pool.
+
+    Pass 1 counts term and document frequencies per chunk and merges them,
+    keeping the `max_features` most frequent terms. Pass 2 vectorises the
+    chunks with that shared vocabulary and the merged IDF. Returns
+    (vectorizer, matrix) matching `TfidfVectorizer.fit_transform` whatever
+    the chunking.
+    """
+    texts = pd.Series(texts).tolist()
+    chunks = _chunks(texts, chunk_rows)
+    with make_pool(workers) as pool:
+        stats = list(pool.map(_count_terms, chunks, [tfidf_params] * len(chunks)))
+
+        merged = pd.DataFrame({
+            'term': np.concatenate([s[0] for s in stats]),
+            'tf': np.concatenate([s[1] for s in stats]),
+            'df': np.concatenate([s[2] for s in stats]),
+        }).groupby('term', sort=True).sum()
+        # Same selection as TfidfVectorizer: argsort of -tf over the alphabetically sorted terms
+        keep = np.sort(np.argsort(-merged['tf'].to_numpy())[:max_features])
+        top = merged.iloc[keep]
+        vocabulary = top.index.tolist()
+        # Same smoothed IDF as TfidfVectorizer: ln((1 + n) / (1 + df)) + 1
+        idf = np.log((1 + len(texts)) / (1 + top['df'].to_numpy(dtype=np.float64))) + 1
+
+        n = len(chunks)
+        blocks = list(pool.map(_transform_chunk, chunks, [vocabulary] * n, [idf] * n, [tfidf_params] * n))
+
+    vectorizer = TfidfVectorizer(vocabulary=vocabulary, **tfidf_params)
+    vectorizer.idf_ = idf
+    return vectorizer, sp.vstack(blocks, format='csr')
+
+
+# --- Parallel Neighbours ---
+def _neighbour_task(start, stop, k):
+    return start, neighbour_block(_worker_engine, np.arange(start, stop), k)
+
+
+def compute_neighbours_parallel(engine, k, workers, block_size=1024):
+    """
+    `similarity.compute_neighbours` with the blocks spread over a process pool.
+
+    The engine is sent to each worker once; tasks only carry block bounds.
+    Peak memory is bounded by `workers` x `block_size` x n_items scores plus
+    the (n_items, k) result.
+    """
+    n_items = engine.n_items
+    k = max(0, min(k, n_items - 1))
+    neighbours = np.full((n_items, k), -1, dtype=np.int32)
+    neighbour_scores = np.zeros((n_items, k), dtype=np.float32)
+    starts = range(0, n_items, block_size)
+    with make_pool(workers, engine) as pool:
+        futures = [pool.submit(_neighbour_task, start, min(start + block_size, n_items), k) for start in starts]
+        for future in futures:
+            start, (block, block_scores) = future.result()
+            neighbours[start:start + len(block)] = block
+            neighbour_scores[start:start + len(block)] = block_scores
+    return neighbours, neighbour_scores
@@ -0,0 +1,98 @@
+import json
+import math
+
+import numpy as np
+from fastapi.responses import Response
+
+try:
+    import orjson
+except ImportError: # orjson is optional; the stdlib encoder produces the same JSON, just slower
+    orjson = None
+
+SUMMARY_FIELDS = ['id', 'title', 'type', 'poster_path'] # List-view fields; poster_url is appended
+
+
+def _plain(value):
+    """Converts NumPy scalars to Python ones and NaN to None, so both encoders emit valid JSON."""
+    if isinstance(value, np.floating) and value.dtype.itemsize < 8:
+        value = float(str(value)) # Shortest decimal for the float32, not its float64 expansion
+    elif isinstance(value, np.generic):
+        value = value.item()
+    if isinstance(value, float) and math.isnan(value):
+        return None
+    return value
+
+
+def dumps(obj):
+    """Encodes `obj` as compact JSON bytes."""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_SERIALIZE_NUMPY)
+    return json.dumps(obj, separators=(',', ':'), default=_plain).encode()
+
+
+def render(fields, raw=None):
+    """
+    Encodes a JSON object from plain `fields` plus `raw` members whose values
+    are already-encoded JSON bytes (spliced in without re-encoding).
+    """
+    members = [dumps(key) + b':' + dumps(value) for key, value in fields.items()]
+    if raw:
+        members += [dumps(key) + b':' + value for key, value in raw.items()]
+    return b'{' + b','.join(members) + b'}'
+
+
+def render_list(fragments):
+    """Joins already-encoded JSON values into a JSON array."""
+    return b'[' + b','.join(fragments) + b']'
+
+
+class RawJSONResponse(Response):
+    """Response for bodies that are already encoded JSON bytes."""
+    media_type = "application/json"
+
+
+def json_response(fields, **raw):
+    """RawJSONResponse from plain `fields` plus pre-encoded `raw` members (see `render`)."""
+    return RawJSONResponse(render(fields, raw))
+
+
+# --- Precomputed Item Payloads ---
+class ItemPayloads:
+    """
+    Pre-encoded JSON for every catalog row, built once per snapshot.
+
+    List views need only the summary fields plus the resolved poster URL, so
+    those fragments are encoded eagerly; endpoints answer by joining the
+    fragments of the rows they selected. Full item details are encoded on
+    first access and memoised.
+    """
+
+    def __init__(self, df, poster_url):
+        self._df = df
+        self._poster_url = poster_url
+        columns = [df[field].tolist() for field in SUMMARY_FIELDS]
+        poster_column = SUMMARY_FIELDS.index('poster_path')
+        self.summaries = [
+            dumps({**{f: _plain(v) for f, v in zip(SUMMARY_FIELDS, values)}, 'poster_url': poster_url(values[poster_column])})
+            for values in zip(*columns)
+        ]
+        self._details = [None] * len(df)
+
+    @property
+    def nbytes(self):
+        return sum(len(s) for s in self.summaries) + sum(len(d) for d in self._details if d is not None)
+
+    def summary_list(self, rows):
+        """JSON array of the list-view payloads for `rows`, in order."""
+        summaries = self.summaries
+        return render_list([summaries[r] for r in rows])
+
+    def detail(self, row):
+        """JSON object with every column of `row` plus its poster URL."""
+        payload = self._details[row]
+        if payload is None:
+            # Per-column access keeps each column's dtype (a row Series would upcast float32 to float64)
+            item = {k: _plain(column.iat[row]) for k, column in self._df.items()}
+            item['poster_url'] = self._poster_url(item.get('poster_path'))
+            payload = self._details[row] = dumps(item) # Racing threads just encode the same bytes twice
+        return payload
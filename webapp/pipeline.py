@@ -0,0 +1,105 @@
+import logging
+import os
+
+import pandas as pd
+from sklearn.feature_extraction.text import TfidfVectorizer
+
+from catalog_store import read_catalog_table
+from embedding import EmbeddingEngine
+from metrics import build_stage
+from parallel_build import compute_neighbours_parallel, fit_tfidf_parallel, resolve_workers
+from similarity import SimilarityEngine, compute_neighbours
+
+TFIDF_PARAMS = {'stop_words': 'english'} # Shared by fitting and by artifacts rebuilding the vectorizer
+
+log = logging.getLogger(__name__)
+
+
+def index_params(max_features, neighbours_k, embedding_dims=0):
+    """Build parameters that identify a similarity index (hashed into artifact keys)."""
+    return {'max_features': max_features, 'neighbours_k': neighbours_k, 'embedding_dims': embedding_dims,
+            'tfidf': TFIDF_PARAMS}
+
+
+def read_catalog(path, columns=None):
+    """
+    Reads the content catalog (CSV, or Parquet written by catalog_store.py),
+    performs basic cleaning and builds the `tags` text used for TF-IDF.
+    Only `columns` are loaded when given (default: all).
+    """
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"Data file not found at: {path}. Run the data fetching script first.")
+
+    log.info("Loading data from %s...", path)
+    with build_stage('read'):
+        if path.endswith('.parquet'):
+            df = read_catalog_table(path, columns)
+        else:
+            df = pd.read_csv(path, usecols=None if columns is None else lambda c: c in columns)
+    with build_stage('clean'):
+        return _clean_catalog(df)
+
+
+def _clean_catalog(df):
+    """Deduplicates and drops incomplete rows, then adds the `tags` column."""
+    # --- Basic Preprocessing (simplified version from notebook) ---
+    # Drop potential duplicates based on id and type
+    df = df.drop_duplicates(subset=['id', 'type'], keep='first')
+    # Drop rows with critical missing info
+    df.dropna(subset=['overview', 'genre_names', 'title'], inplace=True)
+    # Convert columns safely
+    for col in ['overview', 'genre_names', 'title', 'poster_path']: # Added poster_path
+        if col in df.columns:
+            if isinstance(df[col].dtype, pd.CategoricalDtype):
+                continue # Dictionary-encoded Parquet column: already strings, and non-null after dropna
+            df[col] = df[col].astype(str).fillna('') # Ensure string and fillna
+
+    # Combine features for TF-IDF
+    df['tags'] = df['overview'].str.lower() + ' ' + \
+                   df['genre_names'].str.replace(',', ' ').str.lower() + ' ' + \
+                   df['title'].str.lower()
+    df['tags'] = df['tags'].str.split().str.join(' ')
+    df['tags'] = df['tags'].fillna('')
+
+    # Reset index for mapping
+    return df.reset_index(drop=True) # drop=True prevents old index becoming a column
+
+
+def build_engine(df, max_features, neighbours_k=0, embedding_dims=0, workers=1):
+    """
+    Fits TF-IDF on `df['tags']` and returns (vectorizer, engine): a sparse
+    SimilarityEngine, or an EmbeddingEngine when `embedding_dims` is set.
+
+    With `workers` other than 1 (0 = every CPU), vectorising and the
+    neighbour precomputation run in chunks across a process pool.
+    """
+    workers = resolve_workers(workers)
+    with build_stage('tfidf'):
+        if workers > 1:
+            log.info("Calculating TF-IDF matrix across %d processes...", workers)
+            tfidf_vectorizer, tfidf_matrix = fit_tfidf_parallel(df['tags'], max_features, TFIDF_PARAMS, workers)
+        else:
+            log.info("Calculating TF-IDF matrix...")
+            tfidf_vectorizer = TfidfVectorizer(max_features=max_features, **TFIDF_PARAMS)
+            tfidf_matrix = tfidf_vectorizer.fit_transform(df['tags'])
+    log.info("TF-IDF calculation complete.")
+
+    # --- Similarity Engine ---
+    # Keeps only the normalised sparse matrix; similarities are computed per query
+    with build_stage('similarity'):
+        if embedding_dims:
+            # Optional reduction to dense SVD embeddings scored with BLAS
+            log.info("Reducing to %d-dimensional embeddings (truncated SVD)...", embedding_dims)
+            engine = EmbeddingEngine(tfidf_matrix, embedding_dims)
+        else:
+            log.info("Building similarity engine...")
+            engine = SimilarityEngine(tfidf_matrix)
+    if neighbours_k:
+        log.info("Precomputing top-%d neighbours...", neighbours_k)
+        with build_stage('neighbours'):
+            if workers > 1:
+                engine.attach_neighbours(*compute_neighbours_parallel(engine, neighbours_k, workers))
+            else:
+                engine.attach_neighbours(*compute_neighbours(engine, neighbours_k))
+    log.info("Similarity engine ready (%.1f MB).", engine.nbytes / 1e6)
+    return tfidf_vectorizer, engine
@@ -0,0 +1,43 @@
+import sys
+import threading
+import time
+from collections import Counter
+
+
+# --- Sampling Profiler ---
+def _frame_stack(frame):
+    stack = []
+    while frame is not None:
+        code = frame.f_code
+        stack.append(f"{code.co_name} ({code.co_filename.rsplit('/', 1)[-1]}:{code.co_firstlineno})")
+        frame = frame.f_back
+    return ';'.join(reversed(stack))
+
+
+def sample_stacks(seconds, interval=0.005):
+    """
+    Samples the Python stack of every other thread each `interval` seconds for
+    `seconds`, returning a Counter of folded stacks ("thread;outer;...;inner"),
+    the input format of flamegraph.pl and speedscope.
+
+    Pure Python and opt-in: costs nothing unless called, and roughly one
+    stack walk per thread per interval while it runs.
+    """
+    own = threading.get_ident()
+    names = {}
+    stacks = Counter()
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        for ident, frame in sys._current_frames().items():
+            if ident == own:
+                continue
+            if ident not in names:
+                names = {thread.ident: thread.name for thread in threading.enumerate()}
+            stacks[f"{names.get(ident, ident)};{_frame_stack(frame)}"] += 1
+        time.sleep(interval)
+    return stacks
+
+
+def folded(stacks):
+    """Folded-stack text, one "stack count" line per distinct stack, most sampled first."""
+    return ''.join(f"{stack} {count}\n" for stack, count in stacks.most_common())
@@ -0,0 +1,168 @@
+import secrets
+import threading
+import time
+from collections import Counter, OrderedDict
+from dataclasses import dataclass
+from typing import Optional
+
+import numpy as np
+
+EXACT_REBUILD_UPDATES = 64 # Deltas applied to a profile vector before it is re-summed from its items
+
+
+# --- Profile Vectors ---
+def decay_factor(half_life):
+    """Weight multiplier per newer item: weights halve every `half_life` items (1.0, no decay, if unset)."""
+    return 0.5 ** (1.0 / half_life) if half_life else 1.0
+
+
+@dataclass(frozen=True)
+class ProfileState:
+    """
+    One version of a user profile: its item keys with their recency age (the
+    number of items added after each one) and snapshot row, and the
+    aggregated vector, sum(decay ** age * item vector), in the engine space
+    of that snapshot. Only items found in the catalog are kept.
+
+    Never mutated: applying a delta yields a new state stored under a new
+    token, so concurrent updates of one profile cannot interleave and an old
+    token keeps naming the list it was issued for.
+    """
+    ages: dict # item key -> age; 0 is the most recently added
+    rows: dict # item key -> row in the snapshot named by `version`
+    half_life: Optional[float]
+    version: str # Tag of the snapshot whose engine `vector` lives in
+    vector: np.ndarray # float32, not normalised
+    updates: int = 0 # Deltas applied since the vector was last summed exactly
+
+    def __len__(self):
+        return len(self.ages)
+
+
+def _weighted_sum(engine, keys, ages, rows, decay):
+    vector = np.zeros(engine.matrix.shape[1], dtype=np.float32)
+    if keys:
+        weights = np.power(decay, np.asarray([ages[k] for k in keys], dtype=np.float64)).astype(np.float32)
+        vector += weights @ engine.item_vectors([rows[k] for k in keys])
+    return vector
+
+
+def _found_rows(keys, item_row):
+    """{key: row} for the distinct `keys` found in the catalog, in order."""
+    rows = {}
+    for key in keys:
+        if key not in rows:
+            row = item_row(key)
+            if row is not None:
+                rows[key] = row
+    return rows
+
+
+def build_profile(engine, version, keys, half_life, item_row):
+    """
+    ProfileState for item `keys`, most recent first, with every row summed
+    in one weighted product. `item_row(key)` maps a key to its snapshot row,
+    or None when it is not in the catalog; such keys are left out.
+    """
+    rows = _found_rows(keys, item_row)
+    ages = {key: age for age, key in enumerate(rows)}
+    vector = _weighted_sum(engine, list(rows), ages, rows, decay_factor(half_life))
+    return ProfileState(ages, rows, half_life, version, vector)
+
+
+def update_profile(state, engine, version, added, removed, item_row):
+    """
+    Applies a delta to `state`: `removed` keys leave the profile and `added`
+    keys (most recent first; keys already present move to the front) join
+    it. Keys not in the catalog are ignored.
+
+    Only the changed items' rows are read: removed items are subtracted with
+    their current weight, the rest of the vector is scaled by one decay step
+    per added item, and added items are summed in. The vector is re-summed
+    from scratch when `version` tags another snapshot (rows and vector
+    space change on a reload; items gone from the catalog are dropped) and
+    every EXACT_REBUILD_UPDATES deltas, so float32 rounding cannot accumulate.
+    """
+    decay = decay_factor(state.half_life)
+    removed = set(removed)
+    joining = _found_rows([key for key in added if key not in removed], item_row)
+    leaving = [key for key in state.ages if key in removed or key in joining]
+    shift = len(joining)
+    ages = {key: age + shift for key, age in state.ages.items() if key not in removed and key not in joining}
+    ages.update({key: age for age, key in enumerate(joining)})
+
+    if version != state.version or state.updates + 1 >= EXACT_REBUILD_UPDATES:
+        rows = _found_rows(ages, item_row)
+        ages = {key: ages[key] for key in rows}
+        return ProfileState(ages, rows, state.half_life, version, _weighted_sum(engine, list(rows), ages, rows, decay))
+
+    rows = {key: row for key, row in state.rows.items() if key in ages}
+    rows.update(joining)
+    vector = state.vector.copy()
+    if leaving:
+        vector -= _weighted_sum(engine, leaving, state.ages, state.rows, decay)
+    if shift:
+        vector *= np.float32(decay ** shift)
+        vector += _weighted_sum(engine, list(joining), ages, rows, decay)
+    return ProfileState(ages, rows, state.half_life, version, vector, state.updates + 1)
+
+
+# --- Profile Store ---
+class ProfileStore:
+    """
+    Bounded in-process LRU of profile states by opaque token, with a TTL.
+
+    A state is stored once and never changed; `put` returns a fresh random
+    token for it. Thread-safe; `max_entries=0` keeps nothing, so every
+    token is unknown and clients must send their full list.
+    """
+
+    def __init__(self, max_entries=1024, ttl=3600.0, clock=time.monotonic):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._clock = clock
+        self._entries = OrderedDict() # token -> (expires_at, state), least recently used first
+        self._counts = Counter()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, token):
+        """The state stored under `token`, or None when unknown or expired."""
+        with self._lock:
+            entry = self._entries.get(token)
+            if entry is not None and entry[0] <= self._clock():
+                del self._entries[token]
+                self._counts['expirations'] += 1
+                entry = None
+            if entry is None:
+                self._counts['misses'] += 1
+                return None
+            self._entries.move_to_end(token)
+            self._counts['hits'] += 1
+            return entry[1]
+
+    def put(self, state):
+        token = secrets.token_urlsafe(16)
+        if self.max_entries <= 0:
+            return token
+        with self._lock:
+            self._entries[token] = (self._clock() + self.ttl, state)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._counts['evictions'] += 1
+        return token
+
+    def stats(self):
+        with self._lock:
+            counts = dict(self._counts)
+            entries = len(self._entries)
+            size = sum(state.vector.nbytes for _, state in self._entries.values())
+        return {
+            "entries": entries,
+            "bytes": size,
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl,
+            **{name: counts.get(name, 0) for name in ('hits', 'misses', 'evictions', 'expirations')},
+        }
@@ -0,0 +1,174 @@
+from dataclasses import dataclass
+from typing import Optional, Tuple
+
+import numpy as np
+
+from metrics import timed
+
+
+# --- Re-ranking Options ---
+@dataclass(frozen=True)
+class RerankOptions:
+    """
+    How one recommendation request re-ranks its candidate pool. Hashable, so
+    it can be part of a response cache key.
+
+    - `diversity` in [0, 1]: weight of the MMR redundancy penalty (0 keeps
+      the relevance order).
+    - `prior_weight` in [0, 1]: share of the popularity / vote prior in the
+      relevance score (0 is pure similarity).
+    - `content_type` ('movie' / 'tv') and `genres` (matched with `mode`
+      'any' or 'all') restrict which candidates may be returned.
+    """
+    diversity: float = 0.0
+    prior_weight: float = 0.0
+    content_type: Optional[str] = None
+    genres: Tuple[str, ...] = ()
+    mode: str = 'any'
+
+    @property
+    def active(self):
+        return bool(self.diversity or self.prior_weight or self.content_type or self.genres)
+
+
+# --- Item Features ---
+class ItemFeatures:
+    """
+    Per-item arrays the re-ranker reads, built once per snapshot:
+
+    - `prior`: float32 in [0, 1], the mean of log popularity (scaled by the
+      catalog maximum) and the vote average shrunk towards the catalog mean
+      by the median vote count (so a 10/10 from three votes does not win).
+    - `type_codes`: int8 code of each item's type.
+    - `genre_bits`: one bit per genre, packed into (n_items, words) uint64,
+      so genre filters are a bitwise AND over the candidate block.
+    """
+
+    def __init__(self, df, genres):
+        popularity = np.log1p(np.nan_to_num(df['popularity'].to_numpy(dtype=np.float64), nan=0.0).clip(min=0))
+        popularity /= max(float(popularity.max(initial=0.0)), 1e-12)
+        if 'vote_average' in df.columns and 'vote_count' in df.columns:
+            votes = np.nan_to_num(df['vote_count'].to_numpy(dtype=np.float64), nan=0.0).clip(min=0)
+            average = np.nan_to_num(df['vote_average'].to_numpy(dtype=np.float64), nan=0.0)
+            mean = float(np.average(average, weights=votes)) if votes.sum() else float(average.mean(initial=0.0))
+            m = max(float(np.median(votes)) if len(votes) else 0.0, 1.0)
+            rating = (votes * average + m * mean) / (votes + m) / 10.0
+            self.prior = ((popularity + rating) / 2).astype(np.float32)
+        else:
+            self.prior = popularity.astype(np.float32)
+
+        types = df['type'].astype(str).str.lower().to_numpy()
+        type_names = np.unique(types)
+        self._type_codes = {str(name): code for code, name in enumerate(type_names)}
+        self.type_codes = np.searchsorted(type_names, types).astype(np.int8)
+
+        # Genre postings hold popularity ranks; order.rows maps them back to rows
+        self._genres = genres
+        self._bit = {name: bit for bit, name in enumerate(genres.names)}
+        self.genre_bits = np.zeros((len(df), max(1, -(-len(genres.names) // 64))), dtype=np.uint64)
+        for name, bit in self._bit.items():
+            rows = genres.order.rows[genres.postings[name]]
+            self.genre_bits[rows, bit // 64] |= np.uint64(1 << (bit % 64))
+
+    @property
+    def nbytes(self):
+        return self.prior.nbytes + self.type_codes.nbytes + self.genre_bits.nbytes
+
+    def genre_mask(self, genres):
+        """Packed bit mask of `genres` (case-insensitive); None if any genre is unknown."""
+        mask = np.zeros(self.genre_bits.shape[1], dtype=np.uint64)
+        for genre in genres:
+            name = self._genres.canonical(genre)
+            if name is None:
+                return None
+            bit = self._bit[name]
+            mask[bit // 64] |= np.uint64(1 << (bit % 64))
+        return mask
+
+    def allowed(self, candidates, options):
+        """Boolean mask over `candidates` of the items meeting the type and genre constraints."""
+        keep = np.ones(len(candidates), dtype=bool)
+        if options.content_type:
+            code = self._type_codes.get(options.content_type.lower())
+            if code is None:
+                return np.zeros(len(candidates), dtype=bool)
+            keep &= self.type_codes[candidates] == code
+        if options.genres:
+            mask = self.genre_mask(options.genres)
+            if mask is None:
+                return np.zeros(len(candidates), dtype=bool)
+            hits = self.genre_bits[candidates] & mask
+            keep &= (hits == mask).all(axis=1) if options.mode == 'all' else hits.any(axis=1)
+        return keep
+
+
+# --- Re-ranking ---
+def minmax(values):
+    """`values` rescaled to [0, 1] (all ones when they are equal), so blend weights act as shares."""
+    values = np.asarray(values, dtype=np.float32)
+    if not len(values):
+        return values
+    low, high = float(values.min()), float(values.max())
+    if high - low <= 1e-12:
+        return np.ones_like(values)
+    return (values - low) / np.float32(high - low)
+
+
+def mmr(relevance, similarity_row, k, diversity):
+    """
+    Maximal Marginal Relevance selection: positions of `k` items, picked one
+    at a time by (1 - diversity) * relevance - diversity * (highest similarity
+    to an already picked item).
+
+    `similarity_row(i)` returns pool item i's similarities to the whole pool
+    (see `SimilarityEngine.pool_similarity`); only the k picked rows are ever
+    computed. Each step is a handful of vectorised operations over the pool
+    (one product, a running maximum, an argmax), so the cost is O(k * P)
+    with no per-candidate Python.
+    """
+    n = len(relevance)
+    k = min(k, n)
+    selected = np.empty(k, dtype=np.intp)
+    if k == 0:
+        return selected
+    gain = (1.0 - diversity) * np.asarray(relevance, dtype=np.float32)
+    redundancy = np.full(n, -np.inf, dtype=np.float32)
+    available = np.ones(n, dtype=bool)
+    for step in range(k):
+        score = gain - diversity * redundancy if step else gain.copy()
+        score[~available] = -np.inf
+        pick = int(np.argmax(score))
+        selected[step] = pick
+        available[pick] = False
+        np.maximum(redundancy, similarity_row(pick), out=redundancy)
+    return selected
+
+
+def rerank(engine, features, candidates, scores, top_n, options):
+    """
+    Re-ranks one query's candidate pool (positions and similarity scores,
+    best first) and returns its top `top_n` as (positions, relevance).
+
+    Constraints drop candidates first. The remaining similarities are then
+    min-max normalised within the pool: raw cosines of a pool span a narrow
+    band (often 0.03-0.15) while the prior and the MMR redundancy span most
+    of [0, 1], so without it a small weight would swamp similarity. The
+    prior is blended into that relevance; with `diversity`, the final order
+    is chosen by `mmr` over the pool's similarities to each picked item.
+    """
+    with timed('rerank'):
+        candidates = np.asarray(candidates, dtype=np.intp)
+        scores = np.asarray(scores, dtype=np.float32)
+        if options.content_type or options.genres:
+            keep = features.allowed(candidates, options)
+            candidates, scores = candidates[keep], scores[keep]
+        relevance = minmax(scores)
+        if options.prior_weight:
+            relevance = (1.0 - options.prior_weight) * relevance + options.prior_weight * features.prior[candidates]
+
+        if options.diversity and len(candidates) > 1:
+            order = mmr(relevance, engine.pool_similarity(candidates), top_n, options.diversity)
+        else:
+            # Stable, so equal relevance keeps the retrieval order
+            order = np.argsort(-relevance, kind='stable')[:top_n]
+        return candidates[order], relevance[order]
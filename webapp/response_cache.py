@@ -0,0 +1,86 @@
+import threading
+import time
+from collections import Counter, OrderedDict
+
+
+# --- Response Cache ---
+class ResponseCache:
+    """
+    Bounded in-process LRU of encoded response bodies with a per-entry TTL.
+
+    Keys are (endpoint, normalised params, catalog version), so an entry is
+    only ever served for the snapshot it was built from; `clear` drops all
+    entries when a new snapshot goes live. Counters for hits, misses,
+    evictions (LRU), expirations (TTL) and invalidations are kept in `stats`.
+    Thread-safe; `max_entries=0` disables caching.
+    """
+
+    def __init__(self, max_entries=4096, ttl=300.0, clock=time.monotonic):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._clock = clock
+        self._entries = OrderedDict() # key -> (expires_at, body), least recently used first
+        self._counts = Counter()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key):
+        """The cached body for `key`, or None on a miss (expired entries count as misses)."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] <= self._clock():
+                del self._entries[key]
+                self._counts['expirations'] += 1
+                entry = None
+            if entry is None:
+                self._counts['misses'] += 1
+                return None
+            self._entries.move_to_end(key)
+            self._counts['hits'] += 1
+            return entry[1]
+
+    def put(self, key, body):
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (self._clock() + self.ttl, body)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._counts['evictions'] += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._counts['invalidations'] += 1
+
+    def stats(self):
+        with self._lock:
+            counts = dict(self._counts)
+            entries = len(self._entries)
+            size = sum(len(body) for _, body in self._entries.values())
+        lookups = counts.get('hits', 0) + counts.get('misses', 0)
+        return {
+            "entries": entries,
+            "bytes": size,
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl,
+            "hit_rate": counts.get('hits', 0) / lookups if lookups else None,
+            **{name: counts.get(name, 0) for name in ('hits', 'misses', 'evictions', 'expirations', 'invalidations')},
+        }
+
+
+# --- HTTP Validators ---
+def _opaque_tag(tag):
+    return tag.strip().removeprefix('W/')
+
+
+def etag_matches(if_none_match, etag):
+    """True when an If-None-Match header value names `etag` (weak comparison, as RFC 9110 requires) or is '*'."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == '*':
+        return True
+    return _opaque_tag(etag) in {_opaque_tag(tag) for tag in if_none_match.split(',')}
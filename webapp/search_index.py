@@ -0,0 +1,192 @@
+import re
+
+import numpy as np
+import pandas as pd
+
+from similarity import top_k
+
+TOKEN_PATTERN = re.compile(r"\w+")
+TRIGRAM_WIDTH = 64 # Characters per title considered for trigrams
+TRIGRAM_CHUNK = 100000 # Titles encoded per chunk while building the trigram index
+
+# Match-quality tiers; the popularity prior is blended on top (see `search`)
+EXACT_QUALITY = 1.2
+PREFIX_QUALITY = 1.0
+TOKEN_QUALITY = 0.8
+FUZZY_QUALITY = 0.6
+FUZZY_MIN_SIMILARITY = 0.3
+POPULARITY_WEIGHT = 0.2
+
+
+def _trigram_codes(padded):
+    """
+    Encodes every character trigram of each string as one int64
+    (three 21-bit code points), returning (row, code) arrays.
+    """
+    chars = np.array(padded, dtype=f'U{TRIGRAM_WIDTH}').view(np.uint32).reshape(len(padded), TRIGRAM_WIDTH)
+    chars = chars.astype(np.int64)
+    codes = (chars[:, :-2] << 42) | (chars[:, 1:-1] << 21) | chars[:, 2:]
+    lengths = np.fromiter((min(len(p), TRIGRAM_WIDTH) for p in padded), dtype=np.intp, count=len(padded))
+    valid = np.arange(TRIGRAM_WIDTH - 2) < (lengths - 2)[:, None]
+    rows, _ = np.nonzero(valid)
+    return rows, codes[valid]
+
+
+def _group(keys, rows):
+    """Sorted unique keys plus CSR-style offsets into the rows grouped by key (deduplicated)."""
+    order = np.lexsort((rows, keys))
+    keys, rows = keys[order], rows[order]
+    keep = np.ones(len(keys), dtype=bool)
+    keep[1:] = (keys[1:] != keys[:-1]) | (rows[1:] != rows[:-1])
+    keys, rows = keys[keep], rows[keep]
+    unique_keys, offsets = np.unique(keys, return_index=True)
+    return unique_keys, np.append(offsets, len(keys)), rows
+
+
+# --- Title Search Index ---
+class TitleSearchIndex:
+    """
+    Title search structures built once per snapshot.
+
+    - a sorted array of lowercase titles for prefix lookups (binary search),
+    - a token -> rows inverted index (the last query token also matches as a prefix),
+    - a character-trigram -> rows index for typo-tolerant matching.
+
+    Results are ranked by match quality blended with a log-popularity prior.
+    """
+
+    def __init__(self, titles, popularity):
+        lower = pd.Series(titles).fillna('').astype(str).str.lower().to_numpy(dtype=object)
+        self.n_items = len(lower)
+
+        # Prefix lookups: binary search over the sorted lowercase titles
+        self.sorted_rows = np.argsort(lower, kind='stable')
+        self.sorted_titles = lower[self.sorted_rows]
+
+        # Token inverted index, stored as sorted token array + CSR postings
+        tokens = pd.Series(lower).str.findall(TOKEN_PATTERN.pattern).explode().dropna()
+        token_codes, token_vocab = pd.factorize(tokens.to_numpy())
+        codes, self.token_offsets, self.token_rows = _group(token_codes.astype(np.int64), tokens.index.to_numpy())
+        vocab = np.asarray(token_vocab, dtype=object)[codes]
+        self.token_sort = np.argsort(vocab, kind='stable') # Sorted token position -> posting list
+        self.sorted_tokens = vocab[self.token_sort]
+
+        # Trigram index over " title " (padded so word boundaries count)
+        row_chunks, code_chunks = [], []
+        for start in range(0, self.n_items, TRIGRAM_CHUNK):
+            padded = [f" {t} " for t in lower[start:start + TRIGRAM_CHUNK]]
+            rows, codes = _trigram_codes(padded)
+            row_chunks.append(rows + start)
+            code_chunks.append(codes)
+        all_rows = np.concatenate(row_chunks) if row_chunks else np.empty(0, dtype=np.intp)
+        all_codes = np.concatenate(code_chunks) if code_chunks else np.empty(0, dtype=np.int64)
+        self.trigrams, self.trigram_offsets, self.trigram_rows = _group(all_codes, all_rows)
+        self.trigram_counts = np.bincount(self.trigram_rows, minlength=self.n_items)
+
+        popularity = np.nan_to_num(np.asarray(popularity, dtype=np.float64), nan=0.0).clip(min=0)
+        top = np.log1p(popularity.max()) if len(popularity) else 1.0
+        self.prior = (np.log1p(popularity) / top if top > 0 else np.zeros_like(popularity)).astype(np.float32)
+
+    @property
+    def nbytes(self):
+        arrays = (self.sorted_rows, self.token_offsets, self.token_rows, self.token_sort, self.trigrams,
+                  self.trigram_offsets, self.trigram_rows, self.trigram_counts, self.prior)
+        strings = sum(len(t) for t in self.sorted_titles) + sum(len(t) for t in self.sorted_tokens)
+        return sum(a.nbytes for a in arrays) + strings
+
+    # --- Lookups ---
+    def _prefix_range(self, sorted_values, prefix):
+        lo = np.searchsorted(sorted_values, prefix, side='left')
+        hi = np.searchsorted(sorted_values, prefix + '\U0010ffff', side='left')
+        return lo, hi
+
+    def prefix_rows(self, prefix):
+        """Rows whose lowercase title starts with `prefix`."""
+        lo, hi = self._prefix_range(self.sorted_titles, prefix)
+        return self.sorted_rows[lo:hi]
+
+    def _token_postings(self, token, prefix=False):
+        if prefix:
+            lo, hi = self._prefix_range(self.sorted_tokens, token)
+            codes = self.token_sort[lo:hi]
+        else:
+            i = np.searchsorted(self.sorted_tokens, token)
+            found = i < len(self.sorted_tokens) and self.sorted_tokens[i] == token
+            codes = self.token_sort[i:i + 1] if found else self.token_sort[:0]
+        if not len(codes):
+            return np.empty(0, dtype=np.intp)
+        return np.unique(np.concatenate([self.token_rows[self.token_offsets[c]:self.token_offsets[c + 1]] for c in codes]))
+
+    def token_matches(self, query):
+        """(rows, fraction of query tokens matched); the last token also matches as a prefix."""
+        query_tokens = TOKEN_PATTERN.findall(query)
+        if not query_tokens:
+            return np.empty(0, dtype=np.intp), np.empty(0, dtype=np.float32)
+        postings = [self._token_postings(t, prefix=(i == len(query_tokens) - 1))
+                    for i, t in enumerate(query_tokens)]
+        rows, counts = np.unique(np.concatenate(postings), return_counts=True)
+        return rows, (counts / len(query_tokens)).astype(np.float32)
+
+    def fuzzy_matches(self, query):
+        """(rows, trigram Jaccard similarity) for titles sharing enough trigrams with `query`."""
+        _, codes = _trigram_codes([f" {query} "])
+        codes = np.unique(codes)
+        positions = np.searchsorted(self.trigrams, codes)
+        found = positions < len(self.trigrams)
+        found[found] = self.trigrams[positions[found]] == codes[found]
+        positions = positions[found]
+        if not len(positions):
+            return np.empty(0, dtype=np.intp), np.empty(0, dtype=np.float32)
+        postings = [self.trigram_rows[self.trigram_offsets[p]:self.trigram_offsets[p + 1]] for p in positions]
+        rows, shared = np.unique(np.concatenate(postings), return_counts=True)
+        similarity = shared / (len(codes) + self.trigram_counts[rows] - shared)
+        keep = similarity >= FUZZY_MIN_SIMILARITY
+        return rows[keep], similarity[keep].astype(np.float32)
+
+    # --- Ranked Search ---
+    def search(self, query, limit=50):
+        """
+        Ranked title search, returning (rows, scores), best first.
+
+        Each candidate's match quality is the best of exact title, title
+        prefix and token match (fraction of query tokens), plus trigram
+        similarity (computed only when fewer than `limit` titles match as a
+        prefix or on every token).
+        The score adds POPULARITY_WEIGHT x a log-popularity prior.
+        """
+        query = query.strip().lower()
+        if not query or not self.n_items:
+            return np.empty(0, dtype=np.intp), np.empty(0, dtype=np.float32)
+
+        lo, hi = self._prefix_range(self.sorted_titles, query)
+        prefix = self.sorted_rows[lo:hi]
+        prefix_quality = np.where(self.sorted_titles[lo:hi] == query, EXACT_QUALITY, PREFIX_QUALITY).astype(np.float32)
+        token_rows, token_fraction = self.token_matches(query)
+        fuzzy_rows = np.empty(0, dtype=np.intp)
+        fuzzy_quality = np.empty(0, dtype=np.float32)
+        # Trigram matching is the expensive tier: skip it when enough titles
+        # already match as a prefix or contain every query token
+        if len(np.union1d(prefix, token_rows[token_fraction == 1])) < limit:
+            fuzzy_rows, similarity = self.fuzzy_matches(query)
+            fuzzy_quality = FUZZY_QUALITY * similarity
+
+        strong_rows = np.concatenate([prefix, token_rows]).astype(np.intp)
+        rows, inverse = np.unique(np.concatenate([strong_rows, fuzzy_rows]), return_inverse=True)
+        if not len(rows):
+            return rows, np.empty(0, dtype=np.float32)
+
+        # Quality per row: the best exact/prefix/token tier, plus trigram
+        # similarity as extra evidence (so a typo in one token still ranks
+        # titles matching the other tokens first)
+        quality = np.zeros(len(rows), dtype=np.float32)
+        np.maximum.at(quality, inverse[:len(strong_rows)], np.concatenate([prefix_quality, TOKEN_QUALITY * token_fraction]))
+        np.add.at(quality, inverse[len(strong_rows):], fuzzy_quality)
+
+        scores = quality + POPULARITY_WEIGHT * self.prior[rows]
+        best = top_k(scores, limit)
+        return rows[best], scores[best]
+
+    def best_match(self, query):
+        """Row of the highest-ranked match for `query`, or None."""
+        rows, _ = self.search(query, limit=1)
+        return int(rows[0]) if len(rows) else None
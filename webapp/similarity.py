@@ -0,0 +1,302 @@
+import numpy as np
+from sklearn.preprocessing import normalize
+
+from metrics import timed
+
+SCORE_BLOCK_ELEMENTS = 1 << 24 # Dense scores materialised at once when scoring many queries (64 MB of float32)
+ANN_MIN_CANDIDATES = 10 # ANN candidates needed per requested result; a sparser candidate set is scored exactly instead
+
+
+# --- Top-K Selection ---
+def top_k_batch(scores, k, exclude=None):
+    """
+    Row-wise top-k over a 2-D score block: returns a list of position arrays,
+    best first, one per row.
+
+    Uses `np.argpartition` along each row so only the selected block is sorted
+    (O(N + k log k) per row). `exclude` is an optional sequence with one
+    collection of positions per row, masked out before selection. Equal scores
+    within the selection are ordered by position.
+    """
+    scores = np.asarray(scores)
+    n_rows, n_items = scores.shape
+    if exclude is not None:
+        row_ids = [np.full(len(e), r, dtype=np.intp) for r, e in enumerate(exclude) if len(e)]
+        if row_ids:
+            cols = [np.fromiter(e, dtype=np.intp, count=len(e)) for e in exclude if len(e)]
+            scores = scores.copy()
+            scores[np.concatenate(row_ids), np.concatenate(cols)] = -np.inf
+
+    k = min(k, n_items)
+    if k <= 0:
+        return [np.empty(0, dtype=np.intp) for _ in range(n_rows)]
+
+    if k < n_items:
+        candidates = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+    else:
+        candidates = np.broadcast_to(np.arange(n_items), (n_rows, n_items))
+    values = np.take_along_axis(scores, candidates, axis=1)
+    order = np.lexsort((candidates, -values), axis=-1)
+    selected = np.take_along_axis(candidates, order, axis=1)
+    finite = np.isfinite(np.take_along_axis(values, order, axis=1))
+    # Excluded positions only surface when k exceeds the remaining items
+    return [row[mask] for row, mask in zip(selected, finite)]
+
+
+def top_k(scores, k, exclude=None):
+    """Positions of the `k` highest entries of a 1-D score array, best first (see `top_k_batch`)."""
+    return top_k_batch(np.asarray(scores)[np.newaxis], k, None if exclude is None else [exclude])[0]
+
+
+# --- Sparse Similarity Engine ---
+class SimilarityEngine:
+    """
+    Answers cosine-similarity queries straight from the sparse TF-IDF matrix.
+
+    Only the L2-normalised CSR matrix (and its transpose, used as a term ->
+    items inverted index) is kept in memory, so the footprint grows with the
+    number of non-zero terms instead of with N x N.
+    """
+
+    def __init__(self, tfidf_matrix):
+        matrix = tfidf_matrix.tocsr().astype(np.float32)
+        # Rows are unit length, so a dot product is the cosine similarity
+        self.matrix = normalize(matrix, norm='l2', copy=False)
+        # Term -> items postings: scoring a query only touches the items that
+        # share at least one term with it
+        self.term_index = self.matrix.T.tocsr()
+        self.neighbours = None
+        self.neighbour_scores = None
+        self.ann = None
+
+    @classmethod
+    def from_arrays(cls, matrix, term_index):
+        """Wraps an already-normalised matrix and its term index (e.g. memory-mapped) without copying."""
+        engine = cls.__new__(cls)
+        engine.matrix = matrix
+        engine.term_index = term_index
+        engine.neighbours = None
+        engine.neighbour_scores = None
+        engine.ann = None
+        return engine
+
+    def attach_neighbours(self, neighbours, neighbour_scores):
+        """Attaches precomputed (n_items, k) neighbour positions and scores (see `compute_neighbours`)."""
+        self.neighbours = neighbours
+        self.neighbour_scores = neighbour_scores
+
+    def attach_ann(self, ann):
+        """Attaches an approximate candidate index (see ann.py) used instead of scoring the whole catalog."""
+        self.ann = ann
+
+    @property
+    def n_items(self):
+        return self.matrix.shape[0]
+
+    @property
+    def nbytes(self):
+        """Bytes held by the engine's arrays."""
+        total = 0
+        for m in (self.matrix, self.term_index):
+            total += m.data.nbytes + m.indices.nbytes + m.indptr.nbytes
+        if self.neighbours is not None:
+            total += self.neighbours.nbytes + self.neighbour_scores.nbytes
+        if self.ann is not None:
+            total += self.ann.nbytes
+        return total
+
+    def scores(self, idx):
+        """Returns the cosine similarity of item `idx` against every item as a dense 1-D array."""
+        query = self.matrix[idx]
+        return (query @ self.term_index).toarray().ravel()
+
+    def scores_batch(self, rows):
+        """Returns a (len(rows), n_items) dense block of similarities in one sparse product."""
+        queries = self.matrix[np.asarray(rows, dtype=np.intp)]
+        return (queries @ self.term_index).toarray()
+
+    def candidate_scores(self, rows, candidates):
+        """Returns a (len(rows), len(candidates)) dense block of similarities against `candidates` only."""
+        # Densified queries keep this a sparse x dense product (no sparse transpose of the candidates)
+        queries = self.matrix[np.asarray(rows, dtype=np.intp)].toarray().T
+        return np.ascontiguousarray((self.matrix[candidates] @ queries).T)
+
+    def item_vectors(self, rows):
+        """Returns the (len(rows), n_features) dense block of the items' normalised vectors."""
+        return self.matrix[np.asarray(rows, dtype=np.intp)].toarray()
+
+    def vector_scores(self, vector):
+        """Returns the similarity of every item to a dense query `vector` in the engine space (one mat-vec)."""
+        return self.matrix @ np.asarray(vector, dtype=np.float32)
+
+    def pool_similarity(self, rows):
+        """
+        Returns a function mapping a position in `rows` to that item's
+        similarities against all of `rows` (one CSR mat-vec per call), for
+        re-rankers that only need the rows of the items they pick.
+        """
+        block = self.matrix[np.asarray(rows, dtype=np.intp)]
+        return lambda i: block @ block.getrow(i).toarray().ravel()
+
+    def _ann_candidates(self, idx, excluded):
+        candidates = self.ann.candidates(self.matrix[idx])
+        return np.setdiff1d(candidates, np.fromiter(excluded, dtype=np.intp, count=len(excluded)))
+
+    def recommend(self, idx, top_n=10, exclude=None):
+        """
+        Top `top_n` items most similar to item `idx`, as (positions, scores).
+
+        The item itself is always excluded by position; `exclude` is an optional
+        collection of further positions to filter out inside the selection.
+        Served from the precomputed neighbour lists when they hold enough
+        candidates, then from the exact scores of the ANN index's candidates
+        (when one is attached and finds enough), otherwise by scoring the
+        whole catalog.
+        """
+        return self.recommend_many([(idx, top_n, exclude)])[0]
+
+    def recommend_many(self, queries):
+        """
+        Answers independent `recommend` queries, given as (idx, top_n, exclude)
+        tuples, together; returns one (positions, scores) pair per query.
+
+        Queries the neighbour lists or ANN index can answer are served from
+        them; all the rest are scored against the catalog with one matrix
+        product per block of SCORE_BLOCK_ELEMENTS scores and a single batched
+        top-k, instead of one product and one selection each.
+        """
+        results = [None] * len(queries)
+        exact = []
+        with timed('neighbours'):
+            for i, (idx, top_n, exclude) in enumerate(queries):
+                excluded = {int(idx)}
+                if exclude is not None:
+                    excluded.update(int(e) for e in exclude)
+                results[i] = self._recommend_indexed(int(idx), top_n, excluded)
+                if results[i] is None:
+                    exact.append((i, int(idx), top_n, excluded))
+
+        block = max(1, SCORE_BLOCK_ELEMENTS // max(self.n_items, 1))
+        for start in range(0, len(exact), block):
+            chunk = exact[start:start + block]
+            with timed('score'):
+                scores = self.scores_batch([idx for _, idx, _, _ in chunk])
+            k = max(top_n for _, _, top_n, _ in chunk)
+            with timed('topk'):
+                positions = top_k_batch(scores, k, exclude=[excluded for _, _, _, excluded in chunk])
+            for row, ((i, _, top_n, _), p) in enumerate(zip(chunk, positions)):
+                # Each row is best first, so a shorter list is a prefix of the batch's k
+                p = p[:top_n]
+                results[i] = (p, scores[row, p])
+        return results
+
+    def _recommend_indexed(self, idx, top_n, excluded):
+        """
+        `recommend` from the neighbour lists or ANN candidates, or None when
+        neither has enough. A query whose ANN candidates number fewer than
+        ANN_MIN_CANDIDATES * top_n fell into sparse buckets / clusters, where
+        the exact top-n is likely missed, so it is scored exactly instead.
+        """
+        if self.neighbours is not None and top_n <= self.neighbours.shape[1]:
+            row = self.neighbours[idx]
+            keep = (row >= 0) & ~np.isin(row, np.fromiter(excluded, dtype=np.intp, count=len(excluded)))
+            if keep.sum() >= top_n:
+                return row[keep][:top_n].astype(np.intp), self.neighbour_scores[idx][keep][:top_n]
+
+        if self.ann is not None:
+            candidates = self._ann_candidates(idx, excluded)
+            if len(candidates) >= ANN_MIN_CANDIDATES * top_n:
+                scores = self.candidate_scores([idx], candidates)[0]
+                best = top_k(scores, top_n)
+                return candidates[best], scores[best]
+        return None
+
+    def recommend_batch(self, rows, top_n=10, exclude=None, blend=False):
+        """
+        Recommendations for many seed items at once.
+
+        Scores the seeds with one matrix product and one batched top-k per
+        block of SCORE_BLOCK_ELEMENTS scores, so memory stays bounded however
+        many seeds are given. Returns (per_seed, blended), where per_seed
+        is a list of (positions, scores) and blended is the top `top_n` of the
+        mean seed scores excluding every seed (None unless `blend` is set).
+        With an ANN index attached, each seed is answered by `recommend` and
+        the blend is scored over the union of the seeds' candidates.
+        """
+        rows = [int(r) for r in rows]
+        shared = set() if exclude is None else {int(i) for i in exclude}
+        if self.ann is not None:
+            return self._recommend_batch_ann(rows, top_n, shared, blend)
+
+        # Seeds are scored SCORE_BLOCK_ELEMENTS at a time; the blend accumulates across blocks
+        per_seed = []
+        total = np.zeros(self.n_items, dtype=np.float32) if blend else None
+        block = max(1, SCORE_BLOCK_ELEMENTS // max(self.n_items, 1))
+        for start in range(0, len(rows), block):
+            chunk = rows[start:start + block]
+            with timed('score'):
+                scores = self.scores_batch(chunk)
+            with timed('topk'):
+                positions = top_k_batch(scores, top_n, exclude=[shared | {r} for r in chunk])
+            per_seed.extend((p, scores[i, p]) for i, p in enumerate(positions))
+            if blend:
+                total += scores.sum(axis=0)
+
+        blended = None
+        if blend:
+            mean_scores = total / len(rows)
+            p = top_k(mean_scores, top_n, exclude=shared.union(rows))
+            blended = (p, mean_scores[p])
+        return per_seed, blended
+
+    def _mean_scores(self, rows):
+        """Mean similarity of `rows` to every item, scored SCORE_BLOCK_ELEMENTS at a time."""
+        total = np.zeros(self.n_items, dtype=np.float32)
+        block = max(1, SCORE_BLOCK_ELEMENTS // max(self.n_items, 1))
+        for start in range(0, len(rows), block):
+            total += self.scores_batch(rows[start:start + block]).sum(axis=0)
+        return total / len(rows)
+
+    def _recommend_batch_ann(self, rows, top_n, shared, blend):
+        per_seed = [self.recommend(r, top_n, exclude=shared) for r in rows]
+        blended = None
+        if blend:
+            excluded = shared.union(rows)
+            candidates = np.unique(np.concatenate([self._ann_candidates(r, excluded) for r in rows]))
+            if len(candidates) >= ANN_MIN_CANDIDATES * top_n:
+                mean_scores = self.candidate_scores(rows, candidates).mean(axis=0)
+                best = top_k(mean_scores, top_n)
+                blended = (candidates[best], mean_scores[best])
+            else:
+                mean_scores = self._mean_scores(rows)
+                p = top_k(mean_scores, top_n, exclude=excluded)
+                blended = (p, mean_scores[p])
+        return per_seed, blended
+
+
+def neighbour_block(engine, rows, k):
+    """Top-k neighbours (self excluded) of `rows` as (n_rows, k) int32 / float32 arrays padded with -1 / 0."""
+    neighbours = np.full((len(rows), k), -1, dtype=np.int32)
+    neighbour_scores = np.zeros((len(rows), k), dtype=np.float32)
+    scores = engine.scores_batch(rows)
+    for i, positions in enumerate(top_k_batch(scores, k, exclude=[[r] for r in rows])):
+        neighbours[i, :len(positions)] = positions
+        neighbour_scores[i, :len(positions)] = scores[i, positions]
+    return neighbours, neighbour_scores
+
+
+def compute_neighbours(engine, k, block_size=1024):
+    """
+    Precomputes every item's top-k neighbours (self excluded) block by block.
+
+    Returns (neighbours, scores) arrays of shape (n_items, k); unused slots
+    hold -1. Peak memory is bounded by `block_size` x n_items scores.
+    """
+    n_items = engine.n_items
+    k = max(0, min(k, n_items - 1))
+    neighbours = np.full((n_items, k), -1, dtype=np.int32)
+    neighbour_scores = np.zeros((n_items, k), dtype=np.float32)
+    for start in range(0, n_items, block_size):
+        rows = np.arange(start, min(start + block_size, n_items))
+        neighbours[rows], neighbour_scores[rows] = neighbour_block(engine, rows, k)
+    return neighbours, neighbour_scores
@@ -0,0 +1,205 @@
+import hashlib
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Optional
+
+import pandas as pd
+
+from catalog_frame import CatalogFrame, column_nbytes
+
+log = logging.getLogger(__name__)
+
+
+# --- Catalog Snapshot ---
+@dataclass(frozen=True)
+class CatalogSnapshot:
+    """
+    Everything a request needs from the loaded catalog, built together and
+    never mutated afterwards.
+
+    Handlers read `CatalogManager.current` once and use that object for the
+    whole request, so a reload swapping in a new snapshot never changes data
+    under an in-flight request.
+    """
+    content_df: pd.DataFrame # Compact dtypes, no `tags` (see catalog_frame.compact_catalog)
+    engine: Any # SimilarityEngine, or None when no data is loaded
+    catalog: CatalogFrame # Typed accessors over content_df, including title -> row
+    version: str # Content hash of the source file and build parameters
+    source_signature: Optional[tuple] = None # (mtime_ns, size) of the data file when it was read
+    loaded_at: float = field(default_factory=time.time)
+    popularity: Any = None # catalog_index.PopularityOrder
+    views: Optional[dict] = None # 'all' / 'movie' / 'tv' -> catalog_index.PopularityView
+    genres: Any = None # catalog_index.GenreIndex
+    search: Any = None # search_index.TitleSearchIndex
+    payloads: Any = None # payloads.ItemPayloads
+    items: Any = None # catalog_index.ItemIndex
+    features: Any = None # rerank.ItemFeatures
+    vectorizer: Any = None # Fitted TfidfVectorizer, reused to vectorise rows on incremental updates
+    drift: float = 0.0 # Share of rows vectorised since the last full fit (see incremental.py)
+    update: Optional[dict] = None # How this snapshot was built: mode ('artifact' / 'full' / 'incremental') and diff counts
+    lineage: str = '' # '' when fitted from `version` alone; else a hash of the snapshot chain it was applied on
+
+    @property
+    def tag(self):
+        """
+        Identifies what this snapshot serves: `version` alone says which file
+        was loaded, but an incremental update of that file on top of an older
+        snapshot can score differently from a full fit of it, so the build
+        lineage is part of the tag (ETags, cache keys, profile vectors).
+        """
+        return f"{self.version}.{self.lineage}" if self.lineage else self.version
+
+    def derived_lineage(self):
+        """Lineage of a snapshot built incrementally on top of this one."""
+        return hashlib.sha256(self.tag.encode()).hexdigest()[:16]
+
+    @property
+    def empty(self):
+        return self.content_df.empty or self.engine is None
+
+    def memory_report(self):
+        """Bytes held by each catalog column and by each index structure of this snapshot."""
+        columns = column_nbytes(self.content_df)
+        indexes = {'title_index': self.catalog.titles.nbytes}
+        for name in ('items', 'popularity', 'genres', 'search', 'payloads', 'features'):
+            structure = getattr(self, name)
+            if structure is not None:
+                indexes[name] = int(structure.nbytes)
+        for name, view in (self.views or {}).items():
+            indexes[f'view_{name}'] = int(view.nbytes)
+        engine = self.engine
+        if engine is not None:
+            # Memory-mapped artifact arrays are counted in full although pages load on demand
+            neighbours = 0 if engine.neighbours is None else engine.neighbours.nbytes + engine.neighbour_scores.nbytes
+            ann = 0 if engine.ann is None else engine.ann.nbytes
+            indexes.update(engine=int(engine.nbytes - neighbours - ann), neighbours=int(neighbours), ann=int(ann))
+        return {
+            "version": self.version,
+            "items": len(self.content_df),
+            "columns": columns,
+            "indexes": indexes,
+            "total": sum(columns.values()) + sum(indexes.values()),
+        }
+
+    @classmethod
+    def empty_snapshot(cls):
+        df = pd.DataFrame()
+        return cls(content_df=df, engine=None, catalog=CatalogFrame(df), version='empty')
+
+
+def file_signature(path):
+    """(mtime_ns, size) of `path`, or None if it does not exist."""
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return (stat.st_mtime_ns, stat.st_size)
+
+
+# --- Snapshot Manager ---
+class CatalogManager:
+    """
+    Holds the current CatalogSnapshot and rebuilds it off the request path.
+
+    Rebuilds run on a single background thread; when one finishes, the new
+    snapshot replaces the old one with a single reference assignment. Readers
+    never take a lock: they just read `current`.
+    """
+
+    def __init__(self, builder, path):
+        self.builder = builder # Callable: (path, previous snapshot) -> CatalogSnapshot
+        self.path = path
+        self.current = CatalogSnapshot.empty_snapshot()
+        self.last_error = None
+        self.last_reload_seconds = None
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='catalog-reload')
+        self._pending = None
+        self._lock = threading.Lock() # Guards _pending only; never taken by readers
+        self._watcher = None
+        self._listeners = [] # Called with each new snapshot once it is live
+
+    def add_listener(self, callback):
+        """Registers `callback(snapshot)`, run on the reload thread after every swap (e.g. to drop caches)."""
+        self._listeners.append(callback)
+
+    @property
+    def reloading(self):
+        pending = self._pending
+        return pending is not None and not pending.done()
+
+    def reload(self, wait=False):
+        """
+        Schedules a rebuild from `path` and returns its Future.
+
+        Requests arriving while a rebuild is already running share it instead
+        of queueing another one. With `wait=True`, blocks until the new
+        snapshot is live and re-raises any build error.
+        """
+        with self._lock:
+            if not self.reloading:
+                self._pending = self._executor.submit(self._rebuild)
+            future = self._pending
+        if wait:
+            future.result()
+        return future
+
+    def _rebuild(self):
+        start = time.perf_counter()
+        try:
+            snapshot = self.builder(self.path, self.current)
+        except Exception as e:
+            self.last_error = f"{type(e).__name__}: {e}"
+            log.error("Catalog reload failed, keeping version %s: %s", self.current.version, self.last_error)
+            raise
+        self.current = snapshot # Atomic swap; in-flight requests keep their old reference
+        for callback in self._listeners:
+            callback(snapshot)
+        self.last_error = None
+        self.last_reload_seconds = time.perf_counter() - start
+        log.info("Catalog version %s live (%d items, built in %.1fs).",
+                 snapshot.version, len(snapshot.content_df), self.last_reload_seconds)
+        return snapshot
+
+    def watch(self, interval):
+        """
+        Starts a daemon thread polling the data file every `interval` seconds
+        and reloading once a change has been stable for one full interval
+        (so a file still being written is not picked up half-way).
+        """
+        if self._watcher is not None:
+            return
+
+        def poll():
+            previous = attempted = file_signature(self.path)
+            while True:
+                time.sleep(interval)
+                signature = file_signature(self.path)
+                stable = signature is not None and signature == previous
+                # `attempted` stops a file that fails to build from being retried every poll
+                changed = signature not in (self.current.source_signature, attempted)
+                if stable and changed and not self.reloading:
+                    log.info("Detected change in %s; reloading catalog...", self.path)
+                    attempted = signature
+                    self.reload()
+                previous = signature
+
+        self._watcher = threading.Thread(target=poll, name='catalog-watcher', daemon=True)
+        self._watcher.start()
+
+    def status(self):
+        snapshot = self.current
+        return {
+            "version": snapshot.version,
+            "tag": snapshot.tag,
+            "items": len(snapshot.content_df),
+            "loaded_at": snapshot.loaded_at,
+            "reloading": self.reloading,
+            "last_reload_seconds": self.last_reload_seconds,
+            "last_error": self.last_error,
+            "last_update": snapshot.update,
+            "drift": snapshot.drift,
+        }